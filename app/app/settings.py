@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     "rest_framework",
     "rest_framework.authtoken",
@@ -47,6 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so their timings cover every other middleware
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.QueryTimingMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,17 +85,80 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# In-process connection pool shared by the threads of a worker, disabled
+# when DB_POOL_SIZE is 0. Use with DB_CONN_MAX_AGE=0 so connections go back
+# to the pool after each request.
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 0))
+
 DATABASES = {
     'default': {
-        "ENGINE": "django.db.backends.postgresql",
+        # PostgreSQL with connection health checks and pooling
+        "ENGINE": "core.db.backends.postgresql",
         # Environment arguments from app container in docker-compose.yml
         "HOST": os.environ.get("DB_HOST"),
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
-        "PASSWORD": os.environ.get("DB_PASS")
+        "PASSWORD": os.environ.get("DB_PASS"),
+        # Seconds a connection is kept open for later requests of the same
+        # thread, 0 closes it after every request
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        # Check kept connections still work before reusing them
+        "CONN_HEALTH_CHECKS": os.environ.get(
+            "DB_CONN_HEALTH_CHECKS", "true"
+        ).lower() == "true",
+        "POOL": {
+            "MAX_SIZE": DB_POOL_SIZE,
+            # Extra connections opened when the pool is exhausted
+            "MAX_OVERFLOW": int(os.environ.get("DB_POOL_MAX_OVERFLOW", 0)),
+            # Seconds to wait for a free connection
+            "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        } if DB_POOL_SIZE else None,
     }
 }
 
+# Add a Server-Timing header with db, serialize and total phases
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "true").lower() == "true"
+# Requests over either limit are logged with their query fingerprints
+SLOW_REQUEST_QUERY_COUNT = int(os.environ.get("SLOW_REQUEST_QUERY_COUNT", 20))
+SLOW_REQUEST_DB_MS = float(os.environ.get("SLOW_REQUEST_DB_MS", 200))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# The shared tier must be seen by every worker process, as it holds the
+# versions that make stale entries unreachable. Set CACHE_LOCATION to the
+# memcached server(s), e.g. "memcached:11211". Without it caching is off, a
+# per process cache would keep serving entries other processes invalidated.
+CACHE_LOCATION = os.environ.get("CACHE_LOCATION", "")
+
+CACHES = {
+    # Shared tier
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.memcached.PyMemcacheCache"
+            if CACHE_LOCATION
+            else "django.core.cache.backends.dummy.DummyCache"
+        ),
+        "LOCATION": CACHE_LOCATION,
+    },
+    # Per process LRU tier in front of the shared tier
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "local",
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("LOCAL_CACHE_MAX_ENTRIES", 1000)),
+        },
+    },
+}
+
+# Seconds an authentication token and its user stay in cache
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get("AUTH_TOKEN_CACHE_TIMEOUT", 60))
+
+# Seconds a serialized page of user recipes stays in cache
+RECIPE_CACHE_TIMEOUT = int(os.environ.get("RECIPE_CACHE_TIMEOUT", 300))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -130,6 +198,11 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# OpenAPI schema documents prebuilt by the build_schema command
+SCHEMA_CACHE_DIR = os.environ.get(
+    "SCHEMA_CACHE_DIR", str(BASE_DIR / "schema")
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -139,4 +212,53 @@ AUTH_USER_MODEL = 'core.CustomUser'
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-}
\ No newline at end of file
+}
+
+# Default number of items per page for paginated list endpoints
+API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", 50))
+# Upper bound for the page size a client may request with ?page_size=
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", 500))
+
+# Unfiltered listings of tables the planner estimates at this many rows or
+# more report the estimate instead of running COUNT(*)
+ESTIMATED_COUNT_MIN_ROWS = int(
+    os.environ.get("ESTIMATED_COUNT_MIN_ROWS", 100000)
+)
+
+# Render recipe listings from values_list() rows instead of model instances
+RECIPE_FAST_SERIALIZER = os.environ.get(
+    "RECIPE_FAST_SERIALIZER", "true"
+).lower() == "true"
+
+# Rows fetched per round trip when streaming recipe listings with ?stream=
+RECIPE_STREAM_CHUNK_SIZE = int(os.environ.get("RECIPE_STREAM_CHUNK_SIZE", 2000))
+# Rows streamed by one ?stream= response, the rest is behind a next link
+RECIPE_STREAM_MAX_ROWS = int(os.environ.get("RECIPE_STREAM_MAX_ROWS", 10000))
+
+# Maximum number of recipes accepted by one bulk create/update/delete request
+RECIPE_BULK_MAX_ITEMS = int(os.environ.get("RECIPE_BULK_MAX_ITEMS", 1000))
+# Rows written per INSERT/UPDATE statement by bulk endpoints
+RECIPE_BULK_BATCH_SIZE = int(os.environ.get("RECIPE_BULK_BATCH_SIZE", 500))
+
+# Rows validated and loaded per transaction by recipe imports
+RECIPE_IMPORT_BATCH_SIZE = int(
+    os.environ.get("RECIPE_IMPORT_BATCH_SIZE", 5000)
+)
+# Rejected rows reported in detail by an import, the others are only counted
+RECIPE_IMPORT_MAX_ERRORS = int(os.environ.get("RECIPE_IMPORT_MAX_ERRORS", 100))
+# Uploaded import files wait here for run_worker, which must read the same
+# directory. Files are deleted once imported.
+RECIPE_IMPORT_DIR = os.environ.get(
+    "RECIPE_IMPORT_DIR", os.path.join(tempfile.gettempdir(), "recipe-imports")
+)
+
+# Background jobs (core/jobs.py), run by the run_worker command
+# Attempts of a failing job before it is marked failed
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+# Seconds before the first retry, doubled on every further attempt
+JOB_RETRY_BACKOFF = float(os.environ.get("JOB_RETRY_BACKOFF", 10))
+JOB_RETRY_MAX_DELAY = float(os.environ.get("JOB_RETRY_MAX_DELAY", 3600))
+# Seconds after which a running job is assumed lost with its worker
+JOB_TIMEOUT = float(os.environ.get("JOB_TIMEOUT", 3600))
+# Seconds idle workers wait before looking for due jobs again
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", 1))
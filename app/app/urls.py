@@ -13,18 +13,26 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from core.metrics import metrics_view
+from core.schema import CachedSpectacularAPIView
 from django.contrib import admin
 from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
+    path(
+        "api/schema/",
+        CachedSpectacularAPIView.as_view(),
+        name="api-schema"
+        ),
     path(
         "api/docs/",
         SpectacularSwaggerView.as_view(url_name="api-schema"),
         name="api-docs"
         ),
     path('api/user/', include('user.urls')),
-    path("api/recipe/", include("recipe.urls"))
+    path("api/recipe/", include("recipe.urls")),
+    path("api/", include("core.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -2,14 +2,22 @@
 Django Admin Dashboard Customisation
 """
 from core import models
+from core.paginator import EstimatedCountPaginator
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as translate
+from recipe import cache
 
 
 class CustomUserAdmin(BaseUserAdmin):
     """Define custom user admin page layout""" # noqa
     ordering = ["id"]
+    # Avoid COUNT(*) over the whole table on every changelist load
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Prefix match, uses the UPPER(email) index of migration 0008
+    search_fields = ["^email"]
     list_display = [
         "email",
         "first_name",
@@ -52,6 +60,14 @@ class RecipeAdmin(admin.ModelAdmin):
         "title",
         "user"
     ]
+    # Load owners with a join instead of a query per row
+    list_select_related = ["user"]
+    # Search users instead of rendering every user in a <select>
+    autocomplete_fields = ["user"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Prefix match, uses the UPPER(title) index of migration 0008
+    search_fields = ["^title"]
     fieldsets = (
         (translate("User"), {"fields": ("user",)}),
         (translate("Recipe Details"), {"fields": (
@@ -81,5 +97,42 @@ class RecipeAdmin(admin.ModelAdmin):
         })
     )
 
+    def save_model(self, request, obj, form, change):
+        """Also invalidate cached recipes of previous owner on transfer"""
+        if change:
+            obj.last_modified = timezone.now()
+        super().save_model(request, obj, form, change)
+        if change and "user" in form.changed_data:
+            cache.invalidate_user_recipes(form.initial["user"])
+
 
 admin.site.register(models.Recipe, RecipeAdmin)
+
+
+class JobAdmin(admin.ModelAdmin):
+    ordering = ["-id"]
+    list_display = [
+        "name",
+        "status",
+        "attempts",
+        "user",
+        "run_at",
+        "finished_at"
+    ]
+    list_filter = ["status"]
+    list_select_related = ["user"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = [
+        "attempts",
+        "result",
+        "error",
+        "worker",
+        "created_at",
+        "started_at",
+        "finished_at"
+    ]
+    raw_id_fields = ["user"]
+
+
+admin.site.register(models.Job, JobAdmin)
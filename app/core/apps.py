@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Register tasks of every app for enqueue() and workers
+        from core import jobs
+        jobs.autodiscover()
+
+        # Count queries of every connection for QueryTimingMiddleware
+        from core.middleware import install_query_recorder
+        from django.db.backends.signals import connection_created
+        connection_created.connect(install_query_recorder)
@@ -0,0 +1,65 @@
+"""
+ASGI handler streaming responses that read the database lazily
+
+Django 3.2 iterates the content of a StreamingHttpResponse on the event
+loop, so a generator running queries while it is consumed, like recipe
+streaming and exports, raises SynchronousOnlyOperation under ASGI. This
+handler pulls every part of streaming content with sync_to_async() on
+the thread that ran the view, so the database cursor stays on its
+connection and parts are still sent as soon as they are produced.
+"""
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """ASGIHandler producing streaming content off the event loop"""
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": self.get_response_headers(response),
+        })
+        # Access __iter__ and not streaming_content, like ASGIHandler
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await next_part(parts, None)
+            if part is None:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": True,
+                })
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+    def get_response_headers(self, response):
+        """Return headers and cookies of response as ASGI expects them"""
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append((
+                b"Set-Cookie",
+                cookie.output(header="").encode("ascii").strip()
+            ))
+
+        return headers
+
+
+def get_asgi_application():
+    """Set up Django and return the ASGI application of the project"""
+    django.setup(set_prefix=False)
+    return StreamingASGIHandler()
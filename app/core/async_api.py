@@ -0,0 +1,87 @@
+"""
+Helpers for native async API views
+
+Django 3.2 runs ``async def`` views on the event loop but has no async
+ORM, so async views make their database round trips with
+``sync_to_async()``. A worker thread is then only held while queries run,
+not while the request is read or the response is written.
+"""
+import functools
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+from user.authentication import CachedTokenAuthentication
+
+RENDERER = JSONRenderer()
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    """Return response of data rendered like the DRF JSON renderer"""
+    return HttpResponse(
+        b"" if data is None else RENDERER.render(data),
+        content_type=RENDERER.media_type,
+        status=status,
+    )
+
+
+def error_response(exc):
+    """Return response of an API exception, like DRF views do"""
+    if isinstance(
+        exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+    ):
+        exc.auth_header = CachedTokenAuthentication.keyword
+
+    response = exception_handler(exc, {})
+    if response is None:
+        return None
+
+    error = json_response(response.data, response.status_code)
+    # Headers like WWW-Authenticate or Retry-After set by the handler
+    for header, value in response.items():
+        if header.lower() != "content-type":
+            error[header] = value
+
+    return error
+
+
+def async_api_view(methods):
+    """Turn an async function into an API view accepting methods
+
+    The view receives a DRF Request, so serializers, filters and
+    paginators read query parameters and JSON bodies as usual. Token
+    authentication runs first, anonymous requests get AnonymousUser.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            api_request = Request(request, parsers=[JSONParser()])
+            api_request.accepted_renderer = RENDERER
+            try:
+                if request.method not in methods:
+                    raise exceptions.MethodNotAllowed(request.method)
+
+                authentication = CachedTokenAuthentication()
+                result = await authentication.authenticate_async(request)
+                api_request.user = (
+                    result[0] if result else AnonymousUser()
+                )
+
+                return await view(api_request, *args, **kwargs)
+            except Exception as exc:
+                response = error_response(exc)
+                if response is None:
+                    raise
+
+                return response
+
+        # Token authenticated, no session cookie to protect
+        wrapper.csrf_exempt = True
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,47 @@
+"""
+Version numbers making groups of cache entries stale at once
+
+Cache keys of a group embed the current version, stored in the shared
+cache. Bumping it makes every entry of the group unreachable in all
+processes, without having to know their keys.
+"""
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+SHARED_CACHE = "default"
+
+
+def _new_version():
+    # Time based so that a version evicted from the cache is never reused
+    return time.time_ns()
+
+
+def get_version(key):
+    """Return current version stored under key, creating it if missing"""
+    shared = caches[SHARED_CACHE]
+    version = shared.get(key)
+    if version is None:
+        version = _new_version()
+        # Another process may have set the version in the meantime
+        if not shared.add(key, version, timeout=None):
+            version = shared.get(key, version)
+
+    return version
+
+
+def bump_version(key):
+    """Replace version stored under key, now and when the transaction ends
+
+    Until the transaction commits other requests still read the old rows
+    and may cache them under the new version, so it is bumped again on
+    commit.
+    """
+    _set_new_version(key)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _set_new_version(key))
+
+
+def _set_new_version(key):
+    caches[SHARED_CACHE].set(key, _new_version(), timeout=None)
@@ -0,0 +1,107 @@
+"""
+PostgreSQL database backend reusing connections
+
+Extends Django's PostgreSQL backend with settings read from the
+DATABASES entry:
+
+* CONN_HEALTH_CHECKS: check a persistent connection still works before
+  its first use in each request, backported from Django 4.1
+* POOL: dict with MAX_SIZE, MAX_OVERFLOW and TIMEOUT of an in-process
+  pool shared by the threads of a worker, see core.db.pool
+
+Opened, reused and closed connections are counted in core.db.pool and
+exposed on /metrics.
+"""
+from functools import partial
+
+from core.db import pool
+from core.db.backends.postgresql.creation import DatabaseCreation
+from django.db.backends.postgresql import base
+
+
+def is_connection_usable(connection):
+    """Return True if DB-API connection answers a trivial query"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except base.Database.Error:
+        return False
+
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL connection with health checks and optional pooling"""
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Pool the current connection was taken from
+        self.connection_pool = None
+        self.health_check_enabled = self.settings_dict.get(
+            "CONN_HEALTH_CHECKS", False
+        )
+        self.health_check_done = False
+
+    def get_pool(self, conn_params):
+        """Return pool of this database, or None if pooling is disabled"""
+        options = self.settings_dict.get("POOL")
+        if not options:
+            return None
+
+        return pool.get_pool(self.alias, conn_params, options)
+
+    def get_new_connection(self, conn_params):
+        connect = partial(super().get_new_connection, conn_params)
+        connection_pool = self.connection_pool = self.get_pool(conn_params)
+        if connection_pool is None:
+            connection = connect()
+            pool.record(self.alias, "opened")
+            return connection
+
+        connection = connection_pool.acquire(
+            connect,
+            is_connection_usable if self.health_check_enabled else None
+        )
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    def connect(self):
+        super().connect()
+        # New and pooled connections were just opened or checked
+        self.health_check_done = True
+
+    def _close(self):
+        if self.connection is None:
+            return None
+
+        if self.connection_pool is not None:
+            return self.connection_pool.release(self.connection)
+
+        pool.record(self.alias, "closed")
+        return super()._close()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Check the connection again before the next request uses it
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        """Close persistent connection if it stopped working"""
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+        ):
+            return
+
+        if not self.is_usable():
+            pool.record(self.alias, "health_check_failed")
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
@@ -0,0 +1,13 @@
+"""
+Test database creation for the pooling PostgreSQL backend
+"""
+from core.db import pool
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would make DROP DATABASE fail
+        pool.close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
@@ -0,0 +1,199 @@
+"""
+In-process database connection pool and connection churn counters
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+
+import psycopg2
+from psycopg2 import extensions
+
+_stats = defaultdict(Counter)
+_stats_lock = threading.Lock()
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No pooled connection became available within the timeout"""
+
+
+def record(alias, event, count=1):
+    """Count a connection event of database alias"""
+    with _stats_lock:
+        _stats[alias][event] += count
+
+
+def get_stats():
+    """Return connection events and pool sizes by database alias
+
+    Events are ``opened``, ``closed``, ``reused``, ``health_check_failed``,
+    ``pool_waits`` and ``pool_timeouts``.
+    """
+    with _stats_lock:
+        stats = {alias: dict(events) for alias, events in _stats.items()}
+
+    with _pools_lock:
+        pools = list(_pools.items())
+    for (alias, _), pool in pools:
+        alias_stats = stats.setdefault(alias, {})
+        alias_stats["pool_size"] = alias_stats.get("pool_size", 0) + pool.size
+        alias_stats["pool_idle"] = (
+            alias_stats.get("pool_idle", 0) + len(pool.idle)
+        )
+
+    return stats
+
+
+def reset_stats():
+    """Forget counted connection events"""
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_pool(alias, conn_params, options):
+    """Return pool shared by connections of alias with the same params"""
+    key = (alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                alias,
+                max_size=options.get("MAX_SIZE", 10),
+                max_overflow=options.get("MAX_OVERFLOW", 0),
+                timeout=options.get("TIMEOUT", 30),
+            )
+
+    return pool
+
+
+def close_pools(alias=None):
+    """Close pools of alias, or every pool, and forget them
+
+    Connections in use are closed once released.
+    """
+    with _pools_lock:
+        keys = [key for key in _pools if alias in (None, key[0])]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
+
+
+class ConnectionPool:
+    """Thread safe pool of DB-API connections
+
+    Keeps up to ``max_size`` idle connections. Up to ``max_overflow``
+    more may be opened when every connection is in use; those are closed
+    once returned. When ``max_size + max_overflow`` connections are in
+    use, acquire() waits up to ``timeout`` seconds for one to be released.
+    """
+
+    def __init__(self, alias, max_size=10, max_overflow=0, timeout=30):
+        self.alias = alias
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        # Connections opened by the pool, idle or in use
+        self.size = 0
+        self.idle = []
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def acquire(self, connect, validate=None):
+        """Return idle connection, or a new one made by connect()
+
+        Idle connections failing validate() are closed and replaced.
+        """
+        while True:
+            connection = self._checkout()
+            if connection is None:
+                try:
+                    connection = connect()
+                except BaseException:
+                    self._forget()
+                    raise
+                record(self.alias, "opened")
+                return connection
+
+            if connection.closed or (validate and not validate(connection)):
+                record(self.alias, "health_check_failed")
+                self._discard(connection)
+                continue
+
+            record(self.alias, "reused")
+            return connection
+
+    def release(self, connection):
+        """Return connection to the pool, or close it if not reusable"""
+        if not connection.closed and (
+            connection.get_transaction_status()
+            != extensions.TRANSACTION_STATUS_IDLE
+        ):
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                pass
+
+        with self.condition:
+            reusable = (
+                not self.closed
+                and not connection.closed
+                and connection.get_transaction_status()
+                == extensions.TRANSACTION_STATUS_IDLE
+                and len(self.idle) < self.max_size
+            )
+            if reusable:
+                self.idle.append(connection)
+                self.condition.notify()
+                return
+
+        self._discard(connection)
+
+    def close(self):
+        """Close idle connections, and others once released"""
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            self._discard(connection)
+
+    def _checkout(self):
+        """Return idle connection, or None after reserving a new one"""
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            waited = False
+            while (
+                not self.idle
+                and self.size >= self.max_size + self.max_overflow
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    record(self.alias, "pool_timeouts")
+                    raise PoolTimeout(
+                        f"No connection to database '{self.alias}' became "
+                        f"available within {self.timeout} seconds"
+                    )
+                if not waited:
+                    record(self.alias, "pool_waits")
+                    waited = True
+                self.condition.wait(remaining)
+
+            if self.idle:
+                # Most recently used connection is the most likely alive
+                return self.idle.pop()
+
+            self.size += 1
+            return None
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        record(self.alias, "closed")
+        self._forget()
+
+    def _forget(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
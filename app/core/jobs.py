@@ -0,0 +1,181 @@
+"""
+Database backed background jobs
+
+Tasks are plain functions registered by name with @task, usually in a
+tasks.py module of an app. enqueue() stores a Job row, which is run by
+the run_worker management command. Workers claim jobs with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of them can poll the
+same table without running a job twice or waiting on each other.
+
+A failing job is queued again with exponential backoff until it has been
+attempted max_attempts times. A job left running by a worker that died
+is queued again once it has been running for JOB_TIMEOUT seconds.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from core.models import Job
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+# Task functions by name
+registry = {}
+
+
+def task(name):
+    """Register decorated function as the task called name"""
+    def register(function):
+        if name in registry and registry[name] is not function:
+            raise ValueError(f"Task {name} is already registered")
+
+        registry[name] = function
+        return function
+
+    return register
+
+
+def autodiscover():
+    """Import tasks.py of every installed app to register their tasks"""
+    autodiscover_modules("tasks")
+
+
+def enqueue(name, payload=None, user=None, run_at=None, max_attempts=None):
+    """Store a job running task name with payload as keyword arguments
+
+    Inside a transaction, workers only see the job once it commits.
+    """
+    if name not in registry:
+        raise ValueError(f"Unknown task {name}")
+
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        user=user,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim(worker):
+    """Mark the next due job as running by worker and return it
+
+    Returns None if no job is due. Rows locked by other workers are
+    skipped instead of waited for.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.QUEUED, run_at__lte=now
+        ).order_by("run_at", "id").first()
+        if job is None:
+            return None
+
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.worker = worker
+        job.started_at = now
+        job.finished_at = None
+        job.save(update_fields=[
+            "status", "attempts", "worker", "started_at", "finished_at"
+        ])
+
+    return job
+
+
+def retry_delay(attempts):
+    """Return seconds to wait before attempt number attempts + 1"""
+    delay = settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1)
+
+    return min(delay, settings.JOB_RETRY_MAX_DELAY)
+
+
+def run(job):
+    """Run claimed job and store its outcome
+
+    The task runs outside of any transaction, so the job shows as running
+    meanwhile and long tasks do not hold row locks.
+    """
+    try:
+        function = registry[job.name]
+    except KeyError:
+        return finish(job, Job.FAILED, error=f"Unknown task {job.name}")
+
+    try:
+        result = function(**job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.id, job.name)
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            return retry(job, error)
+
+        return finish(job, Job.FAILED, error=error)
+
+    return finish(job, Job.SUCCEEDED, result=result)
+
+
+def retry(job, error):
+    """Queue job again after its backoff delay"""
+    return store(
+        job,
+        status=Job.QUEUED,
+        error=error,
+        run_at=timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+    )
+
+
+def finish(job, status, result=None, error=""):
+    """Store final status of job"""
+    return store(
+        job,
+        status=status,
+        result=result,
+        error=error,
+        finished_at=timezone.now(),
+    )
+
+
+def store(job, **changes):
+    """Write changes of running job, unless it was taken from the worker
+
+    A job requeued by requeue_stale() may already run elsewhere, the
+    outcome of the attempt that timed out is then dropped.
+    """
+    updated = Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, attempts=job.attempts
+    ).update(**changes)
+    if not updated:
+        logger.warning("Dropped outcome of stale job %s", job.id)
+
+    for field, value in changes.items():
+        setattr(job, field, value)
+
+    return job
+
+
+def requeue_stale():
+    """Queue again jobs running for longer than JOB_TIMEOUT
+
+    Their worker is assumed dead. Jobs out of attempts fail instead.
+    Returns the number of jobs changed.
+    """
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        started_at__lt=timezone.now() - timedelta(
+            seconds=settings.JOB_TIMEOUT
+        ),
+    )
+    error = "Worker stopped responding"
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED, error=error, finished_at=timezone.now()
+    )
+    requeued = stale.update(
+        status=Job.QUEUED, error=error, run_at=timezone.now()
+    )
+
+    return failed + requeued
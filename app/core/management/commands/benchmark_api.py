@@ -0,0 +1,330 @@
+"""
+Django command to load test a running recipe and user API over HTTP
+"""
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from core.management.commands.seed_data import seed_email
+from django.core.management.base import BaseCommand, CommandError
+
+RECIPE_PATH = "/api/recipe/recipe/"
+TOKEN_PATH = "/api/user/token/"
+ACCOUNT_PATH = "/api/user/account/"
+SCENARIOS = [
+    "list",
+    "retrieve",
+    "create",
+    "update",
+    "fetch_user_recipes",
+    "token",
+    "account",
+]
+DELETE_BATCH_SIZE = 500
+
+
+def percentile(ordered, percent):
+    """Return percentile of sorted latencies"""
+    if len(ordered) == 1:
+        return ordered[0]
+
+    return statistics.quantiles(ordered, n=100)[percent - 1]
+
+
+class Client:
+    """HTTP client keeping one connection per thread"""
+
+    def __init__(self, base_url, timeout):
+        url = urlsplit(base_url)
+        self.connection_class = (
+            http.client.HTTPSConnection if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.netloc = url.netloc
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+
+    def request(self, method, path, data=None, authorization=None):
+        """Send request, return status and decoded JSON body"""
+        headers = {"Accept": "application/json"}
+        body = None
+        if data is not None:
+            body = json.dumps(data)
+            headers["Content-Type"] = "application/json"
+        if authorization is not None:
+            headers["Authorization"] = authorization
+
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = self.connection_class(
+                self.netloc, timeout=self.timeout
+            )
+            with self.connections_lock:
+                self.connections.append(connection)
+        try:
+            connection.request(method, self.prefix + path, body, headers)
+            response = connection.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, OSError):
+            # Reconnect on the next request
+            connection.close()
+            self.local.connection = None
+            raise
+
+        if response.getheader("Connection", "").lower() == "close":
+            connection.close()
+            self.local.connection = None
+
+        is_json = "json" in response.getheader("Content-Type", "")
+        if content and is_json:
+            return response.status, json.loads(content)
+
+        return response.status, None
+
+    def close(self):
+        """Close connections opened by every thread"""
+        with self.connections_lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections.clear()
+
+
+class Command(BaseCommand):
+    """Django Command to measure throughput and latency of API endpoints"""
+    help = (
+        "Drive recipe and user endpoints of a running server at a fixed "
+        "concurrency and print requests/s and p50/p95/p99 latency of each "
+        "scenario as JSON. Logs in as users created by seed_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument(
+            "--scenario", action="append", choices=SCENARIOS,
+            dest="scenarios",
+            help="Scenario to run, may be repeated (default: all)",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=500,
+            help="Measured requests per scenario",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=10,
+            help="Requests in flight at once",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=20,
+            help="Unmeasured requests sent before each scenario",
+        )
+        parser.add_argument(
+            "--users", type=int, default=10,
+            help="Seeded users to send authenticated requests as",
+        )
+        parser.add_argument("--email-prefix", default="seed-user-")
+        parser.add_argument("--password", default="password123")
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Seed of the random choices made by requests",
+        )
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument(
+            "--output", help="Write JSON report to file instead of stdout",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        self.options = options
+        self.client = Client(options["base_url"], options["timeout"])
+        try:
+            self.prepare()
+            try:
+                results = {
+                    name: self.run_scenario(name)
+                    for name in options["scenarios"] or SCENARIOS
+                }
+            finally:
+                self.delete_created_recipes()
+        finally:
+            self.client.close()
+
+        report = json.dumps({
+            "base_url": options["base_url"],
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "seed": options["seed"],
+            "scenarios": results,
+        }, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(report + "\n")
+        else:
+            self.stdout.write(report)
+
+    def prepare(self):
+        """Log in as seeded users and collect recipe ids to work on"""
+        self.users = []
+        # Recipes of the users, edited in turn by the update scenario
+        self.owned_recipes = []
+        for index in range(self.options["users"]):
+            email = seed_email(self.options["email_prefix"], index)
+            status, data = self.client.request("POST", TOKEN_PATH, {
+                "email": email, "password": self.options["password"],
+            })
+            if status != 200:
+                raise CommandError(
+                    f"Cannot log in as {email}, run seed_data first"
+                )
+
+            user = {"email": email, "token": f"Token {data['token']}"}
+            status, data = self.client.request(
+                "GET",
+                RECIPE_PATH + "fetch_user_recipes/?page_size=100",
+                authorization=user["token"]
+            )
+            self.users.append(user)
+            self.owned_recipes.extend(
+                (user, recipe["id"]) for recipe in data["results"]
+            )
+        if (
+            "update" in (self.options["scenarios"] or SCENARIOS)
+            and len(self.owned_recipes) < self.options["concurrency"]
+        ):
+            # Requests in flight would otherwise edit the same recipe and
+            # fail with 412 when another one wins
+            raise CommandError(
+                "The update scenario needs a recipe per concurrent request, "
+                "seed more recipes or lower --concurrency"
+            )
+
+        status, data = self.client.request(
+            "GET", RECIPE_PATH + "?page_size=500"
+        )
+        self.recipe_ids = [recipe["id"] for recipe in data["results"]]
+        if not self.recipe_ids:
+            raise CommandError("No recipes found, run seed_data first")
+
+        # Recipes made by the create scenario, deleted at the end
+        self.created = []
+        self.created_lock = threading.Lock()
+
+    def make_request(self, name, index, user, rng):
+        """Return method, path, body and authorization of a request"""
+        if name == "list":
+            return "GET", RECIPE_PATH, None, None
+        if name == "retrieve":
+            recipe_id = rng.choice(self.recipe_ids)
+            return "GET", f"{RECIPE_PATH}{recipe_id}/", None, None
+        if name == "create":
+            return "POST", RECIPE_PATH, {
+                "title": "Benchmark recipe",
+                "time_needed": rng.randint(5, 240),
+                "cost": f"{rng.randint(100, 9999) / 100:.2f}",
+            }, user["token"]
+        if name == "update":
+            # Requests are sent in index order, so the ones in flight at
+            # once each get a different recipe
+            owner, recipe_id = self.owned_recipes[
+                index % len(self.owned_recipes)
+            ]
+            return "PATCH", f"{RECIPE_PATH}{recipe_id}/", {
+                "time_needed": rng.randint(5, 240),
+            }, owner["token"]
+        if name == "fetch_user_recipes":
+            return (
+                "GET", RECIPE_PATH + "fetch_user_recipes/", None,
+                user["token"]
+            )
+        if name == "token":
+            return "POST", TOKEN_PATH, {
+                "email": user["email"], "password": self.options["password"],
+            }, None
+
+        return "GET", ACCOUNT_PATH, None, user["token"]
+
+    def send(self, name, index):
+        """Send request number index of scenario, return its outcome"""
+        # Seeded per request, independent of thread scheduling
+        rng = random.Random(f"{self.options['seed']}:{name}:{index}")
+        user = rng.choice(self.users)
+        method, path, data, authorization = self.make_request(
+            name, index, user, rng
+        )
+
+        start = time.perf_counter()
+        try:
+            status, body = self.client.request(
+                method, path, data, authorization
+            )
+        except (http.client.HTTPException, OSError) as error:
+            return type(error).__name__, time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+
+        if name == "create" and status == 201:
+            with self.created_lock:
+                self.created.append((user["token"], body["id"]))
+
+        return status, elapsed
+
+    def run_scenario(self, name):
+        """Send requests of scenario concurrently and summarize them"""
+        for index in range(self.options["warmup"]):
+            self.send(name, -1 - index)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=self.options["concurrency"]
+        ) as executor:
+            outcomes = list(executor.map(
+                lambda index: self.send(name, index),
+                range(self.options["requests"])
+            ))
+        seconds = time.perf_counter() - start
+
+        statuses = Counter(str(status) for status, _ in outcomes)
+        latencies = sorted(elapsed for _, elapsed in outcomes)
+        errors = sum(
+            count for status, count in statuses.items()
+            if not status.startswith("2")
+        )
+        summary = {
+            "requests": len(outcomes),
+            "errors": errors,
+            "statuses": dict(statuses),
+            "seconds": round(seconds, 3),
+            "throughput": round(len(outcomes) / seconds, 1),
+        }
+        for percent in [50, 95, 99]:
+            summary[f"p{percent}_ms"] = round(
+                percentile(latencies, percent) * 1000, 2
+            )
+
+        self.stderr.write(
+            f"{name}: {summary['throughput']} requests/s, "
+            f"p50 {summary['p50_ms']} ms, p99 {summary['p99_ms']} ms, "
+            f"{errors} errors"
+        )
+        return summary
+
+    def delete_created_recipes(self):
+        """Delete recipes made by the create scenario"""
+        by_token = {}
+        for token, recipe_id in self.created:
+            by_token.setdefault(token, []).append(recipe_id)
+
+        # Bulk deletes only accept token authentication
+        for token, ids in by_token.items():
+            # Stay below the bulk request size limit of the API
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                self.client.request(
+                    "DELETE", RECIPE_PATH + "bulk/",
+                    {"ids": ids[start:start + DELETE_BATCH_SIZE]}, token
+                )
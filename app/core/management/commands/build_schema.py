@@ -0,0 +1,40 @@
+"""
+Django command to prebuild the OpenAPI schema served by /api/schema/
+"""
+from pathlib import Path
+
+from core import schema
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django Command to write rendered schema documents to disk"""
+    help = (
+        "Render the OpenAPI schema in every served format, with gzip "
+        "variants, so /api/schema/ does not generate it on first request. "
+        "Run at build time of each deploy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            help="Directory to write to (default: SCHEMA_CACHE_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        directory = Path(options["output_dir"] or settings.SCHEMA_CACHE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for schema_format in schema.SCHEMA_RENDERERS:
+            content = schema.render_schema(schema_format)
+            path = schema.schema_path(schema_format, directory)
+            gzip_content = schema.compress(content)
+            path.write_bytes(content)
+            path.with_name(path.name + ".gz").write_bytes(gzip_content)
+
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {path} ({len(content)} bytes, "
+                f"{len(gzip_content)} gzipped)"
+            ))
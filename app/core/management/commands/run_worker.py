@@ -0,0 +1,131 @@
+"""
+Django command to run queued background jobs
+"""
+import logging
+import os
+import signal
+import socket
+import threading
+
+from core import jobs
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+# Longest wait in seconds between retries while the database is unavailable
+MAX_ERROR_BACKOFF = 60
+
+
+class Command(BaseCommand):
+    """Django Command to poll the job table and run due jobs"""
+    help = (
+        "Run queued jobs until stopped with SIGTERM or Ctrl+C, letting "
+        "running jobs finish. Any number of workers can run at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=1,
+            help="Jobs run at the same time, each in its own thread",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help="Seconds to wait when no job is due",
+        )
+        parser.add_argument(
+            "--burst", action="store_true",
+            help="Exit once no job is due instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        if options["concurrency"] < 1:
+            raise CommandError("Concurrency must be at least 1")
+
+        self.stop = threading.Event()
+        self.poll_interval = options["poll_interval"]
+        self.burst = options["burst"]
+        handlers = {
+            signum: signal.signal(signum, lambda *args: self.stop.set())
+            for signum in [signal.SIGINT, signal.SIGTERM]
+        }
+        try:
+            counts = self.run_workers(options["concurrency"])
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {sum(counts)} jobs"))
+
+    def run_workers(self, concurrency):
+        """Run workers and return the number of jobs each one ran"""
+        name = f"{socket.gethostname()}:{os.getpid()}"
+        counts = [0] * concurrency
+        if concurrency == 1:
+            self.work(f"{name}:0", counts, 0)
+            return counts
+
+        threads = [
+            threading.Thread(
+                target=self.work_in_thread,
+                args=(f"{name}:{index}", counts, index),
+            )
+            for index in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return counts
+
+    def work(self, worker, counts, index):
+        """Claim and run jobs until stopped
+
+        Like a request, each cycle starts and ends with
+        close_old_connections(), so broken connections and ones older
+        than CONN_MAX_AGE are not kept by long running workers. Database
+        errors are logged and retried after a growing delay, so a database
+        restart does not stop the worker.
+        """
+        failures = 0
+        while not self.stop.is_set():
+            job = requeued = None
+            failed = False
+            close_old_connections()
+            try:
+                job = jobs.claim(worker)
+                if job is not None:
+                    jobs.run(job)
+                    counts[index] += 1
+                else:
+                    requeued = jobs.requeue_stale()
+            except DatabaseError:
+                logger.exception("Worker %s lost the database", worker)
+                failed = True
+            finally:
+                close_old_connections()
+
+            if failed:
+                failures += 1
+                self.stop.wait(min(
+                    self.poll_interval * 2 ** failures, MAX_ERROR_BACKOFF
+                ))
+                continue
+
+            failures = 0
+            if job is not None or requeued:
+                continue
+            if self.burst:
+                break
+            self.stop.wait(self.poll_interval)
+
+    def work_in_thread(self, worker, counts, index):
+        try:
+            self.work(worker, counts, index)
+        finally:
+            # Every thread opened its own connection
+            connection.close()
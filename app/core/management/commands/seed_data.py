@@ -0,0 +1,116 @@
+"""
+Django command to create a synthetic dataset of users and recipes
+"""
+import random
+import time
+from decimal import Decimal
+
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+TITLE_WORDS = [
+    "Chicken", "Tomato", "Spicy", "Garlic", "Lemon", "Beef", "Mushroom",
+    "Curry", "Soup", "Salad", "Pasta", "Stew", "Roast", "Cake", "Pie",
+]
+
+
+def seed_email(prefix, index):
+    """Return email of seeded user number index"""
+    return f"{prefix}{index}@example.com"
+
+
+class Command(BaseCommand):
+    """Django Command to bulk create users and recipes for benchmarks"""
+    help = (
+        "Create N users sharing one password and M recipes spread over "
+        "them, using bulk inserts. The same --seed gives the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--recipes", type=int, default=10000)
+        parser.add_argument(
+            "--password", default="password123",
+            help="Password of every seeded user",
+        )
+        parser.add_argument(
+            "--email-prefix", default="seed-user-",
+            help="Seeded users get emails <prefix><number>@example.com",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--clear", action="store_true",
+            help="Delete users seeded with the same prefix first",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        if options["users"] < 1:
+            raise CommandError("At least one user is needed")
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            seeded = get_user_model().objects.filter(
+                email__startswith=options["email_prefix"]
+            )
+            if options["clear"]:
+                seeded.delete()
+            elif seeded.exists():
+                raise CommandError(
+                    f"Users starting with {options['email_prefix']} were "
+                    "seeded already, rerun with --clear to replace them"
+                )
+
+            user_ids = self.create_users(options)
+            recipe_count = self.create_recipes(user_ids, options)
+
+        seconds = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(user_ids)} users and {recipe_count} recipes "
+            f"in {seconds:.1f} seconds"
+        ))
+
+    def create_users(self, options):
+        # Hashing is slow on purpose, every user shares one hash
+        password = make_password(options["password"])
+        users = [
+            get_user_model()(
+                email=seed_email(options["email_prefix"], index),
+                password=password,
+            )
+            for index in range(options["users"])
+        ]
+        get_user_model().objects.bulk_create(
+            users, batch_size=options["batch_size"]
+        )
+
+        return list(get_user_model().objects.filter(
+            email__in=[user.email for user in users]
+        ).order_by("id").values_list("id", flat=True))
+
+    def create_recipes(self, user_ids, options):
+        rng = random.Random(options["seed"])
+        remaining = options["recipes"]
+        while remaining > 0:
+            batch_size = min(remaining, options["batch_size"])
+            Recipe.objects.bulk_create([
+                self.make_recipe(rng, user_ids) for _ in range(batch_size)
+            ])
+            remaining -= batch_size
+
+        return options["recipes"]
+
+    def make_recipe(self, rng, user_ids):
+        title = " ".join(rng.sample(TITLE_WORDS, 3))
+        return Recipe(
+            user_id=rng.choice(user_ids),
+            title=title,
+            time_needed=rng.randint(5, 240),
+            cost=Decimal(rng.randint(100, 99999)) / 100,
+            description=f"{title} made with {rng.choice(TITLE_WORDS)}",
+            link=f"http://example.com/{rng.randint(1, 10 ** 6)}",
+        )
@@ -1,32 +1,122 @@
 """
 Django command to wait for database to full load before running app services
 """
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.db.utils import OperationalError
 from psycopg2 import OperationalError as Psycopg2Error
 
 
 class Command(BaseCommand):
     """Django Command to wait for database to be ready"""
+    help = (
+        "Wait until the databases accept connections and answer a query, "
+        "retrying with exponential backoff. Fails after --timeout seconds."
+    )
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", action="append", dest="databases",
+            help="Database alias to wait for, may be repeated "
+                 "(default: default)",
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=60,
+            help="Seconds to wait before failing (default: 60)",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=0.1,
+            help="Seconds to wait after the first failed attempt, doubled "
+                 "after every further failure (default: 0.1)",
+        )
+        parser.add_argument(
+            "--max-interval", type=float, default=5,
+            help="Longest wait between attempts (default: 5)",
+        )
+
+    def handle(self, *args, **options):
         """Entry point for command"""
+        # Unique aliases in the given order
+        aliases = list(dict.fromkeys(options["databases"] or ["default"]))
+        unknown = [alias for alias in aliases if alias not in connections]
+        if unknown:
+            raise CommandError(
+                f"Unknown database alias: {', '.join(unknown)}"
+            )
 
         # Message to display on console as command is executed
         self.stdout.write("Waiting for database...")
-        db_up = False
+        deadline = time.monotonic() + options["timeout"]
+
+        # Every database is polled by its own thread
+        with ThreadPoolExecutor(max_workers=len(aliases)) as executor:
+            results = executor.map(
+                lambda alias: self.wait(
+                    alias,
+                    deadline,
+                    options["interval"],
+                    options["max_interval"]
+                ),
+                aliases
+            )
+            unavailable = [
+                alias for alias, ready in zip(aliases, results) if not ready
+            ]
+
+        if unavailable:
+            raise CommandError(
+                f"Database unavailable after {options['timeout']} seconds: "
+                f"{', '.join(unavailable)}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Database is ready!"))
 
-        while db_up is False:
+    def wait(self, alias, deadline, interval, max_interval):
+        """Probe database until it is ready, return False on timeout"""
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
             try:
-                # Will throw exception Psycopg2Error or OperationalError if not ready # noqa:
-                self.check(databases=['default'])
-                db_up = True
+                self.probe(alias, remaining)
+                return True
             except (Psycopg2Error, OperationalError):
-                self.stdout.write(self.style.WARNING(
-                    "Database still unavailable, waitin 1 second before trying..." # noqa
-                ))
-                time.sleep(1)
+                pass
 
-        self.stdout.write(self.style.SUCCESS("Database is ready!"))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+
+            # Exponential backoff with full jitter, so restarting app
+            # containers do not hit the database in lockstep
+            delay = random.uniform(
+                0, min(interval * 2 ** attempt, max_interval)
+            )
+            delay = min(delay, remaining)
+            self.stdout.write(self.style.WARNING(
+                f"Database '{alias}' unavailable, waiting {delay:.2f} "
+                "seconds before trying again..."
+            ))
+            time.sleep(delay)
+            attempt += 1
+
+    def probe(self, alias, timeout):
+        """Open a plain connection to database and run SELECT 1
+
+        Skips Django's connection setup and system checks. Raises the
+        driver's OperationalError if the database is not ready.
+        """
+        connection = connections[alias]
+        params = connection.get_connection_params()
+        # libpq waits at least 2 seconds for a connection
+        params["connect_timeout"] = max(2, int(timeout))
+
+        raw_connection = connection.Database.connect(**params)
+        try:
+            with raw_connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        finally:
+            raw_connection.close()
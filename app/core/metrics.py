@@ -0,0 +1,125 @@
+"""
+Prometheus metrics of API requests
+
+Counters and histograms are labelled by route (the URL pattern name,
+e.g. recipe:recipe-list), never by raw path, to keep their number
+bounded. When PROMETHEUS_MULTIPROC_DIR is set before the workers start,
+prometheus_client keeps values in mmap-backed files in that directory
+and /metrics aggregates the files of every worker process. The
+directory must be emptied before the server starts.
+
+Connection churn and pool sizes counted by core.db.pool are collected
+from the process serving /metrics when it is scraped.
+"""
+import os
+
+from core.db import pool
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Route label of requests not matching any URL pattern
+UNMATCHED_ROUTE = "unmatched"
+
+REQUESTS = Counter(
+    "http_requests",
+    "Requests handled, by route, method and response status",
+    ["route", "method", "status"],
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling requests, by route and method",
+    ["route", "method"],
+    buckets=[
+        0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5,
+        10,
+    ],
+)
+
+
+# Values of core.db.pool.get_stats() exposed as gauges, not as events
+POOL_GAUGES = {
+    "pool_size": (
+        "db_pool_connections",
+        "Connections opened by the pools of a database, idle or in use",
+    ),
+    "pool_idle": (
+        "db_pool_idle_connections",
+        "Idle connections in the pools of a database",
+    ),
+}
+
+
+class DatabasePoolCollector:
+    """Collect connection events and pool sizes of core.db.pool
+
+    Values are those of the process serving /metrics, they are not
+    aggregated over workers in multiprocess mode.
+    """
+
+    def collect(self):
+        events = CounterMetricFamily(
+            "db_connection_events",
+            "Database connections opened, reused and closed, and pool "
+            "waits and timeouts, by database alias",
+            labels=["alias", "event"],
+        )
+        gauges = {
+            key: GaugeMetricFamily(name, documentation, labels=["alias"])
+            for key, (name, documentation) in POOL_GAUGES.items()
+        }
+        for alias, stats in sorted(pool.get_stats().items()):
+            for event, value in sorted(stats.items()):
+                if event in gauges:
+                    gauges[event].add_metric([alias], value)
+                else:
+                    events.add_metric([alias, event], value)
+
+        yield events
+        yield from gauges.values()
+
+
+DATABASE_POOL_COLLECTOR = DatabasePoolCollector()
+REGISTRY.register(DATABASE_POOL_COLLECTOR)
+
+
+def get_route(request):
+    """Return route label of request"""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNMATCHED_ROUTE
+
+    return match.view_name
+
+
+def observe_request(request, response, seconds):
+    """Record request in the counters and histograms"""
+    route = get_route(request)
+    REQUESTS.labels(route, request.method, response.status_code).inc()
+    LATENCY.labels(route, request.method).observe(seconds)
+
+
+def get_registry():
+    """Return registry to expose, merging every worker in multiprocess mode"""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(DATABASE_POOL_COLLECTOR)
+    return registry
+
+
+def metrics_view(request):
+    """Expose metrics in the Prometheus text format"""
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
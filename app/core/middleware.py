@@ -0,0 +1,209 @@
+"""
+Per request instrumentation
+
+QueryTimingMiddleware counts the statements each request runs and the
+time spent in them through database execute wrappers, so it also works
+with DEBUG off. Phases are reported in a Server-Timing header and slow
+requests are logged with the fingerprints of their queries.
+MetricsMiddleware feeds the Prometheus metrics served at /metrics.
+
+Both run in sync and async mode, so async views served under ASGI are
+not moved to the single thread running sync code.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import markcoroutinefunction
+from core import metrics
+from django.conf import settings
+from django.utils.regex_helper import _lazy_re_compile
+
+logger = logging.getLogger(__name__)
+
+string_literal = _lazy_re_compile(r"'(?:[^']|'')*'")
+number_literal = _lazy_re_compile(r"\b\d+(?:\.\d+)?\b")
+value_list = _lazy_re_compile(r"\((?:\s*(?:\?|%s)\s*,)+\s*(?:\?|%s)\s*\)")
+whitespace = _lazy_re_compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Return sql with literals and parameter lists replaced
+
+    Queries differing only by their values share a fingerprint, so
+    SELECT ... WHERE id IN (%s, %s) and one with 50 ids count as one.
+    """
+    sql = string_literal.sub("?", sql)
+    sql = number_literal.sub("?", sql)
+    sql = value_list.sub("(...)", sql)
+    return whitespace.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """Execute wrapper counting statements and their duration"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+
+# Recorder of the request being handled. Context variables follow the
+# request into the threads sync_to_async() runs its queries in, and stay
+# apart for requests handled concurrently by the same thread.
+current_recorder = ContextVar("current_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper passing statements to the recorder of the request"""
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """Add record_query() to connection, on connection_created
+
+    Connections belong to the thread that opened them, so the wrapper is
+    added to every connection once instead of around each request. It
+    goes first so that execute_wrapper() blocks can still pop their own.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class QueryTimingMiddleware:
+    """Add Server-Timing header and log requests running slow queries
+
+    Phases are db (time in SQL statements), serialize (rendering the
+    response body) and total. Queries run while a streaming response is
+    consumed happen after this middleware returns and are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        request.render_started = None
+        start = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+
+        return self.add_timings(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        request.render_started = None
+        start = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+
+        return self.add_timings(request, response, recorder, start)
+
+    def add_timings(self, request, response, recorder, start):
+        """Add Server-Timing header and log the request if it was slow"""
+        end = time.perf_counter()
+        timings = [("db", recorder.duration, f"{recorder.count} queries")]
+        if request.render_started is not None:
+            timings.append(("serialize", end - request.render_started, None))
+        timings.append(("total", end - start, None))
+
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = ", ".join(
+                self.format_timing(*timing) for timing in timings
+            )
+        self.log_slow_request(request, response, recorder, end - start)
+
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before DRF renders the response data
+        request.render_started = time.perf_counter()
+        return response
+
+    def format_timing(self, name, seconds, description):
+        timing = f"{name};dur={seconds * 1000:.1f}"
+        if description:
+            timing += f';desc="{description}"'
+
+        return timing
+
+    def log_slow_request(self, request, response, recorder, total):
+        """Log request if it exceeded query count or database time"""
+        db_ms = recorder.duration * 1000
+        if (
+            recorder.count <= settings.SLOW_REQUEST_QUERY_COUNT
+            and db_ms <= settings.SLOW_REQUEST_DB_MS
+        ):
+            return
+
+        queries = "\n".join(
+            f"  {count} x {sql}"
+            for sql, count in recorder.fingerprints.most_common()
+        )
+        logger.warning(
+            "Slow request %s %s (%s): %d queries, %.1f ms in database, "
+            "%.1f ms total\n%s",
+            request.method, request.path, response.status_code,
+            recorder.count, db_ms, total * 1000, queries,
+        )
+
+
+class MetricsMiddleware:
+    """Count requests and observe their latency by route"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        metrics.observe_request(
+            request, response, time.perf_counter() - start
+        )
+
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        metrics.observe_request(
+            request, response, time.perf_counter() - start
+        )
+
+        return response
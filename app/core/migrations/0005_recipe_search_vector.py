@@ -0,0 +1,82 @@
+# Generated by Django 3.2.25 on 2026-10-18 12:27
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}title, '')), 'A')
+    || setweight(
+        to_tsvector('pg_catalog.english', coalesce({row}description, '')), 'B'
+    )
+"""
+
+CREATE_TRIGGER_SQL = """
+CREATE FUNCTION core_recipe_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {vector};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipe_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, search_vector
+    ON core_recipe
+    FOR EACH ROW EXECUTE FUNCTION core_recipe_search_vector_update();
+""".format(vector=SEARCH_VECTOR_SQL.format(row="NEW."))
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER core_recipe_search_vector_trigger ON core_recipe;
+DROP FUNCTION core_recipe_search_vector_update();
+"""
+
+BACKFILL_SQL = """
+UPDATE core_recipe SET search_vector = {vector}
+WHERE id >= %s AND id < %s
+""".format(vector=SEARCH_VECTOR_SQL.format(row=""))
+
+# Rows of existing recipes updated per statement by the backfill
+BACKFILL_BATCH_SIZE = 10000
+
+
+def backfill_search_vector(apps, schema_editor):
+    """Fill search_vector of existing recipes, one id range at a time
+
+    The migration is not atomic, so every range commits on its own and
+    rows are only locked while their batch is updated.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(id), max(id) FROM core_recipe")
+        low, high = cursor.fetchone()
+        if low is None:
+            return
+
+        for start in range(low, high + 1, BACKFILL_BATCH_SIZE):
+            cursor.execute(BACKFILL_SQL, [start, start + BACKFILL_BATCH_SIZE])
+
+
+class Migration(migrations.Migration):
+
+    # Build GIN index without locking core_recipe against writes
+    atomic = False
+
+    dependencies = [
+        ('core', '0004_recipe_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER_SQL, DROP_TRIGGER_SQL),
+        migrations.RunPython(
+            backfill_search_vector, migrations.RunPython.noop
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector_idx'),
+        ),
+    ]
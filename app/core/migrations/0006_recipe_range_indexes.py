@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 12:28
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Build indexes without locking core_recipe against writes
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_recipe_search_vector'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['cost', 'id'], name='recipe_cost_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['time_needed', 'id'], name='recipe_time_needed_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['last_modified', 'id'], name='recipe_modified_id_idx'),
+        ),
+    ]
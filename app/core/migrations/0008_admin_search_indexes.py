@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:02
+
+from django.db import migrations
+
+# Admin searches filter on UPPER(column::text) LIKE 'TERM%', which these
+# expression indexes answer. text_pattern_ops supports LIKE prefixes
+# whatever the database collation.
+CREATE_INDEX_SQL = (
+    "CREATE INDEX CONCURRENTLY {name} ON {table} "
+    "(UPPER({column}::text) text_pattern_ops);"
+)
+DROP_INDEX_SQL = "DROP INDEX CONCURRENTLY {name};"
+
+SEARCH_INDEXES = [
+    ("customuser_email_upper_idx", "core_customuser", "email"),
+    ("recipe_title_upper_idx", "core_recipe", "title"),
+]
+
+
+class Migration(migrations.Migration):
+
+    # Build indexes without locking tables against writes
+    atomic = False
+
+    dependencies = [
+        ('core', '0007_recipe_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_INDEX_SQL.format(name=name, table=table, column=column),
+            DROP_INDEX_SQL.format(name=name),
+        )
+        for name, table, column in SEARCH_INDEXES
+    ]
@@ -1,10 +1,17 @@
+from functools import reduce
+from operator import or_
+
 from django.conf import settings
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
 
 
 class CustomUserManager(BaseUserManager):
@@ -61,6 +68,181 @@ class Recipe(models.Model):
     link = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now_add=True)
+    # Weighted title and description lexemes, kept up to date by a database
+    # trigger (see migration 0005_recipe_search_vector)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Incremented on every write, used by ETags and optimistic concurrency
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        indexes = [
+            # User specific recipes ordered by id (fetch_user_recipes)
+            models.Index(fields=["user", "id"], name="recipe_user_id_idx"),
+            models.Index(
+                fields=["user", "last_modified"],
+                name="recipe_user_modified_idx"
+            ),
+            # Default ordering of recipe listing
+            models.Index(
+                fields=["created_at", "id"],
+                name="recipe_created_id_idx"
+            ),
+            # Range filters and orderings of recipe listing
+            models.Index(fields=["cost", "id"], name="recipe_cost_id_idx"),
+            models.Index(
+                fields=["time_needed", "id"],
+                name="recipe_time_needed_id_idx"
+            ),
+            models.Index(
+                fields=["last_modified", "id"],
+                name="recipe_modified_id_idx"
+            ),
+            # Full text search over title and description
+            GinIndex(
+                fields=["search_vector"],
+                name="recipe_search_vector_idx"
+            ),
+            # Admin title search uses an UPPER(title) expression index, see
+            # migration 0008_admin_search_indexes
+        ]
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        "Save recipe, moving existing recipes to their next version"
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version"}
+
+        super().save(*args, **kwargs)
+
+    def save_changes(self, changes):
+        """Write changed fields in a single conditional UPDATE
+
+        Only the given fields, last_modified and version are written, and
+        only if the row is still at the version this instance was read at.
+        Returns False without writing if another request changed it since.
+        """
+        now = timezone.now()
+        updated = Recipe.objects.filter(
+            pk=self.pk, version=self.version
+        ).update(**changes, last_modified=now, version=F("version") + 1)
+        if not updated:
+            return False
+
+        for field, value in changes.items():
+            setattr(self, field, value)
+        self.last_modified = now
+        self.version += 1
+
+        return True
+
+    @classmethod
+    def bulk_save_changes(cls, changes, batch_size=None):
+        """Write changed fields of many recipes in conditional UPDATEs
+
+        changes maps recipe instances to the fields to write, like
+        save_changes(). Each batch is one UPDATE setting every column with
+        a CASE on the id, matching only rows still at the version their
+        instance was read at. Returns the number of rows written, lower
+        than the number of instances if another request changed some of
+        them since, in which case the caller should roll back.
+        """
+        now = timezone.now()
+        items = list(changes.items())
+        batch_size = batch_size or len(items)
+        updated = 0
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            fields = sorted({field for _, values in batch for field in values})
+            columns = {
+                field: Case(
+                    *[
+                        When(pk=recipe.pk, then=Value(
+                            values[field],
+                            output_field=cls._meta.get_field(field)
+                        ))
+                        for recipe, values in batch if field in values
+                    ],
+                    default=F(field)
+                )
+                for field in fields
+            }
+            updated += cls.objects.filter(reduce(or_, [
+                Q(pk=recipe.pk, version=recipe.version)
+                for recipe, _ in batch
+            ])).update(
+                **columns, last_modified=now, version=F("version") + 1
+            )
+
+        if updated == len(items):
+            for recipe, values in items:
+                for field, value in values.items():
+                    setattr(recipe, field, value)
+                recipe.last_modified = now
+                recipe.version += 1
+
+        return updated
+
+
+class Job(models.Model):
+    """Background job run by the run_worker management command"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    # Name the task was registered under, see core/jobs.py
+    name = models.CharField(max_length=255)
+    # Keyword arguments of the task
+    payload = models.JSONField(default=dict, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=1)
+    # Not picked up by workers before this time, pushed back on retries
+    run_at = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    # Worker running the job, or that ran it last
+    worker = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Only jobs waiting to run are scanned by workers
+            models.Index(
+                fields=["run_at", "id"],
+                name="job_queued_run_at_idx",
+                condition=Q(status="queued"),
+            ),
+            # Jobs of a user, latest first (status API)
+            models.Index(fields=["user", "id"], name="job_user_id_idx"),
+            # Running jobs whose worker may have died
+            models.Index(
+                fields=["started_at"],
+                name="job_running_started_at_idx",
+                condition=Q(status="running"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.id}, {self.status})"
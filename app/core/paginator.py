@@ -0,0 +1,85 @@
+"""
+Paginators avoiding COUNT(*) over large tables
+
+PostgreSQL counts rows by reading the whole table. For querysets without
+filters the planner's row estimate kept in pg_class.reltuples by
+autovacuum and ANALYZE is used instead, once it is large enough that
+an approximate total is acceptable. Filtered querysets can be estimated
+from the row count of their EXPLAIN plan, which is cheaper but less
+accurate.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_table_rows(model, using="default"):
+    """Return planner estimate of rows in table of model, None if unknown"""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+
+    # reltuples is -1 until the table is first analyzed
+    if row is None or row[0] < 0:
+        return None
+
+    return int(row[0])
+
+
+def explain_rows(queryset):
+    """Return planner estimate of rows returned by queryset, None if unknown"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_count(queryset, explain=False):
+    """Return estimated rows of queryset, None if not possible
+
+    Only unfiltered querysets are estimated, unless explain is True.
+    """
+    query = queryset.query
+    if query.is_sliced or query.distinct or query.combinator:
+        return None
+    if not query.where:
+        return estimate_table_rows(queryset.model, queryset.db)
+    if explain:
+        return explain_rows(queryset)
+
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator using estimated counts of large unfiltered querysets
+
+    Filtered querysets and tables estimated below ESTIMATED_COUNT_MIN_ROWS
+    are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimate_count(self.object_list)
+            if (
+                estimate is not None
+                and estimate >= settings.ESTIMATED_COUNT_MIN_ROWS
+            ):
+                return estimate
+
+        return super().count
@@ -0,0 +1,152 @@
+"""
+Precomputed OpenAPI schema
+
+Generating the schema introspects every view and serializer, so it is
+rendered once per deploy and served from memory with an ETag and a gzip
+variant. Documents written by the build_schema command at image build
+time are loaded from SCHEMA_CACHE_DIR, others are generated on first
+request. Deploying starts new processes, which drops the cached copies.
+"""
+import gzip
+import hashlib
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_vary_headers,
+    quote_etag,
+)
+from django.utils.regex_helper import _lazy_re_compile
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.views import SpectacularAPIView
+
+# Renderer of each schema format served by SpectacularAPIView
+SCHEMA_RENDERERS = {
+    "yaml": OpenApiYamlRenderer,
+    "json": OpenApiJsonRenderer,
+}
+
+accepts_gzip = _lazy_re_compile(r"\bgzip\b")
+
+SchemaDocument = namedtuple(
+    "SchemaDocument", ["content", "etag", "gzip_content", "gzip_etag"]
+)
+
+_documents = {}
+_documents_lock = threading.Lock()
+
+
+def render_schema(schema_format):
+    """Generate schema and return it rendered in format"""
+    generator = SpectacularAPIView.generator_class(
+        urlconf=SpectacularAPIView.urlconf
+    )
+    schema = generator.get_schema(
+        request=None, public=SpectacularAPIView.serve_public
+    )
+
+    return SCHEMA_RENDERERS[schema_format]().render(
+        schema, renderer_context={}
+    )
+
+
+def schema_path(schema_format, directory=None):
+    """Return path of prebuilt schema document in format"""
+    return Path(directory or settings.SCHEMA_CACHE_DIR) / (
+        f"openapi.{schema_format}"
+    )
+
+
+def compress(content):
+    # Fixed mtime keeps the compressed bytes and their ETag reproducible
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def make_schema_document(content, gzip_content=None):
+    """Return document of rendered schema with its gzip variant"""
+    if gzip_content is None:
+        gzip_content = compress(content)
+
+    return SchemaDocument(
+        content,
+        quote_etag(hashlib.md5(content).hexdigest()),
+        gzip_content,
+        quote_etag(hashlib.md5(gzip_content).hexdigest()),
+    )
+
+
+def load_schema_document(schema_format):
+    """Return prebuilt schema document, or None if it was not built"""
+    path = schema_path(schema_format)
+    gzip_path = path.with_name(path.name + ".gz")
+    if not path.exists():
+        return None
+
+    return make_schema_document(
+        path.read_bytes(),
+        gzip_path.read_bytes() if gzip_path.exists() else None
+    )
+
+
+def get_schema_document(schema_format, lang=None):
+    """Return cached schema document, generating it on first use"""
+    key = (schema_format, lang)
+    document = _documents.get(key)
+    if document is not None:
+        return document
+
+    # Generate each document once, even if requested concurrently
+    with _documents_lock:
+        document = _documents.get(key)
+        if document is None:
+            if lang is None:
+                document = load_schema_document(schema_format)
+            if document is None:
+                document = make_schema_document(render_schema(schema_format))
+            _documents[key] = document
+
+    return document
+
+
+def clear_schema_cache():
+    """Forget schema documents cached by this process"""
+    with _documents_lock:
+        _documents.clear()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """SpectacularAPIView serving the schema generated once per deploy"""
+
+    def _get_schema_response(self, request):
+        renderer = request.accepted_renderer
+        lang = request.GET.get("lang") if settings.USE_I18N else None
+        # Only cache translations to configured languages
+        if lang not in dict(settings.LANGUAGES):
+            lang = None
+        document = get_schema_document(renderer.format, lang)
+
+        use_gzip = accepts_gzip.search(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        if use_gzip:
+            content, etag = document.gzip_content, document.gzip_etag
+        else:
+            content, etag = document.content, document.etag
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type += f"; charset={renderer.charset}"
+            response = HttpResponse(content, content_type=content_type)
+            if use_gzip:
+                response["Content-Encoding"] = "gzip"
+
+        response["ETag"] = etag
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+
+        return response
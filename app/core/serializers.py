@@ -0,0 +1,27 @@
+"""
+Serializers for the Job status API
+"""
+from core.models import Job
+from rest_framework import serializers
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for Job"""
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "name",
+            "payload",
+            "status",
+            "attempts",
+            "max_attempts",
+            "run_at",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
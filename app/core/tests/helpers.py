@@ -0,0 +1,195 @@
+"""
+Helpers shared by tests: data factories, query count and query plan
+assertions and requests sent through the ASGI handler
+"""
+import asyncio
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from core.asgi import StreamingASGIHandler
+from core.models import Recipe
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+DATASET_SIZES = [1, 10, 100, 250]
+
+# Caching is off unless a shared cache is configured, tests of cached code
+# paths run with a local memory shared tier
+LOCMEM_CACHES = {
+    **settings.CACHES,
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shared",
+    },
+}
+
+
+def create_users(count, prefix="user", password="testpass123"):
+    """Bulk create users sharing one password hash"""
+    password = make_password(password)
+    return get_user_model().objects.bulk_create([
+        get_user_model()(email=f"{prefix}{index}@example.com",
+                         password=password)
+        for index in range(count)
+    ])
+
+
+def recipe_detail_url(recipe_id):
+    """Create dynamic recipe detail URL"""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    """Create and return a recipe of user, params override the defaults"""
+    default_recipe = {
+        "title": "Sample Recipe",
+        "time_needed": 60,
+        "cost": Decimal("5.99"),
+    }
+    default_recipe.update(params)
+    return Recipe.objects.create(user=user, **default_recipe)
+
+
+def create_recipes(users, count):
+    """Bulk create count recipes spread over users"""
+    return Recipe.objects.bulk_create([
+        Recipe(
+            user=users[index % len(users)],
+            title=f"Recipe {index}",
+            time_needed=index + 1,
+            cost=Decimal("5.99"),
+            description="Recipe description",
+        )
+        for index in range(count)
+    ])
+
+
+def explain(sql, sort=True):
+    """Return query plan of sql as text
+
+    Sequential scans are disabled so that the planner picks an index
+    whenever one can answer the query, even though the test tables are
+    tiny. A plan that still contains a sequential scan has no usable index.
+    With sort=False, sorts are disabled too, for queries that must read
+    rows in order from an index: on a few rows a sort is cheaper.
+    """
+    settings = ["enable_seqscan"] + ([] if sort else ["enable_sort"])
+    with connection.cursor() as cursor:
+        for setting in settings:
+            cursor.execute(f"SET LOCAL {setting} = off")
+        cursor.execute(f"EXPLAIN {sql}")
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        for setting in settings:
+            cursor.execute(f"SET LOCAL {setting} = on")
+
+    return plan
+
+
+class QueryCountMixin:
+    """TestCase mixin asserting query counts do not grow with data size"""
+    dataset_sizes = DATASET_SIZES
+
+    def assertConstantQueries(self, populate, request):
+        """Assert request runs as many queries at every dataset size
+
+        populate(size) is called before each measured request and should
+        grow the data the request reads or writes to size rows. request()
+        sends the request and returns its response. Caches are cleared
+        before each measurement so cached endpoints are measured cold.
+        """
+        counts = {}
+        captured = {}
+        for size in self.dataset_sizes:
+            populate(size)
+            for cache in caches.all():
+                cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = request()
+
+            self.assertLess(
+                response.status_code, 400,
+                f"Request failed at size {size}: {response.status_code}"
+            )
+            counts[size] = len(context.captured_queries)
+            captured[size] = context.captured_queries
+
+        if len(set(counts.values())) > 1:
+            largest = self.dataset_sizes[-1]
+            queries = "\n".join(
+                f"{index}. {query['sql']}"
+                for index, query in enumerate(captured[largest], start=1)
+            )
+            self.fail(
+                f"Query count grows with data size {counts}. Queries at "
+                f"size {largest}:\n{queries}"
+            )
+
+        return counts[self.dataset_sizes[0]]
+
+
+class ASGIResponse:
+    """Status, headers and complete body of a response sent over ASGI"""
+
+    def __init__(self, messages):
+        start = messages[0]
+        self.status_code = start["status"]
+        self.headers = {
+            name.decode("latin1").lower(): value.decode("latin1")
+            for name, value in start["headers"]
+        }
+        self.content = b"".join(
+            message.get("body", b"") for message in messages[1:]
+        )
+
+    def __getitem__(self, header):
+        return self.headers[header.lower()]
+
+
+async def asgi_request(path, method="GET", query_string="", headers=None):
+    """Send request through the project's ASGI handler, return response"""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query_string.encode("latin1"),
+        # Host allowed by the test runner
+        "server": ("testserver", 80),
+        "headers": [
+            (name.lower().encode("latin1"), value.encode("latin1"))
+            for name, value in (headers or {}).items()
+        ],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await StreamingASGIHandler()(scope, receive, send)
+    return ASGIResponse(messages)
+
+
+def run_asgi(*requests):
+    """Run asgi_request() coroutines concurrently and return responses
+
+    Like the test client, connections are not closed at the end of the
+    requests, so that they see the data of the test transaction.
+    """
+    async def gather():
+        return await asyncio.gather(*requests)
+
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        return async_to_sync(gather)()
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
@@ -2,8 +2,17 @@
 Test Django Admin interface
 """
 
+from core.models import Recipe
+from core.tests.helpers import (
+    QueryCountMixin,
+    create_recipes,
+    create_users,
+    explain,
+)
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 
@@ -49,3 +58,85 @@ class AdminSiteTest(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class AdminScalabilityTest(QueryCountMixin, TestCase):
+    """Test admin pages do not slow down as tables grow"""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="testpassword",
+        )
+        self.client.force_login(self.admin_user)
+        self.users = []
+
+    def populate(self, size):
+        """Grow users and their recipes to size"""
+        self.users += create_users(
+            size - len(self.users), prefix=f"user-{size}-"
+        )
+        create_recipes(self.users, size - Recipe.objects.count())
+
+    def test_recipe_changelist_queries(self):
+        """Test owners of listed recipes are loaded with a join"""
+        url = reverse("admin:core_recipe_changelist")
+
+        self.assertConstantQueries(self.populate, lambda: self.client.get(url))
+
+    def test_user_changelist_queries(self):
+        """Test user changelist runs a constant number of queries"""
+        url = reverse("admin:core_customuser_changelist")
+
+        self.assertConstantQueries(self.populate, lambda: self.client.get(url))
+
+    def test_recipe_form_user_widget(self):
+        """Test recipe form does not list every user"""
+        self.populate(3)
+
+        res = self.client.get(reverse("admin:core_recipe_add"))
+
+        self.assertContains(res, "admin-autocomplete")
+        for user in self.users:
+            self.assertNotContains(res, user.email)
+
+    def test_user_autocomplete(self):
+        """Test owners are searched by email prefix"""
+        self.populate(3)
+
+        res = self.client.get(reverse("admin:autocomplete"), {
+            "term": self.users[1].email[:12],
+            "app_label": "core",
+            "model_name": "recipe",
+            "field_name": "user",
+        })
+
+        self.assertEqual(
+            [result["id"] for result in res.json()["results"]],
+            [str(self.users[1].id)],
+        )
+
+    def test_search_uses_index(self):
+        """Test admin searches filter with an index"""
+        self.populate(3)
+        searches = [
+            ("admin:core_customuser_changelist", "customuser_email_upper_idx"),
+            ("admin:core_recipe_changelist", "recipe_title_upper_idx"),
+        ]
+
+        for url_name, index in searches:
+            with CaptureQueriesContext(connection) as context:
+                res = self.client.get(reverse(url_name), {"q": "Recipe 1"})
+            self.assertEqual(res.status_code, 200)
+            search_sql = [
+                query["sql"] for query in context.captured_queries
+                if "LIKE" in query["sql"]
+            ]
+
+            self.assertTrue(search_sql)
+            for sql in search_sql:
+                self.assertIn(index, explain(sql))
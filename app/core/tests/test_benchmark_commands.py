@@ -0,0 +1,130 @@
+"""
+Test seed_data and benchmark_api commands
+"""
+import json
+from io import StringIO
+
+from core.management.commands.benchmark_api import SCENARIOS
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.core.servers.basehttp import ThreadedWSGIServer
+from django.db import connections
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.test.testcases import LiveServerThread, QuietWSGIRequestHandler
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+class ClosingWSGIServer(ThreadedWSGIServer):
+    """Server closing database connections of its request threads"""
+
+    def process_request_thread(self, request, client_address):
+        # Persistent connections would otherwise outlive the test database
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            connections.close_all()
+
+
+class ClosingLiveServerThread(LiveServerThread):
+
+    def _create_server(self):
+        return ClosingWSGIServer(
+            (self.host, self.port), QuietWSGIRequestHandler,
+            allow_reuse_address=False
+        )
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class SeedDataCommandTests(TestCase):
+    """Test synthetic dataset generator"""
+
+    def test_seed_data(self):
+        """Test users sharing a password and recipes are created"""
+        call_command(
+            "seed_data", "--users", "3", "--recipes", "25",
+            "--batch-size", "10", "--password", "secret123",
+            stdout=StringIO()
+        )
+
+        users = get_user_model().objects.filter(
+            email__startswith="seed-user-"
+        )
+        self.assertEqual(users.count(), 3)
+        self.assertEqual(Recipe.objects.filter(user__in=users).count(), 25)
+        for user in users:
+            self.assertTrue(user.check_password("secret123"))
+
+    def test_seed_is_reproducible(self):
+        """Test the same seed creates the same recipes"""
+        rows = []
+        for _ in range(2):
+            call_command(
+                "seed_data", "--users", "2", "--recipes", "5", "--clear",
+                stdout=StringIO()
+            )
+            rows.append(list(Recipe.objects.order_by("id").values_list(
+                "title", "time_needed", "cost"
+            )))
+
+        self.assertEqual(rows[0], rows[1])
+
+    def test_clear(self):
+        """Test --clear replaces previously seeded users"""
+        for _ in range(2):
+            call_command(
+                "seed_data", "--users", "2", "--recipes", "4", "--clear",
+                stdout=StringIO()
+            )
+
+        self.assertEqual(get_user_model().objects.count(), 2)
+        self.assertEqual(Recipe.objects.count(), 4)
+
+    def test_rerun_without_clear(self):
+        """Test seeding again without --clear fails with a clear message"""
+        call_command(
+            "seed_data", "--users", "2", "--recipes", "4", stdout=StringIO()
+        )
+
+        with self.assertRaisesMessage(CommandError, "--clear"):
+            call_command(
+                "seed_data", "--users", "2", "--recipes", "4",
+                stdout=StringIO()
+            )
+        self.assertEqual(Recipe.objects.count(), 4)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BenchmarkApiCommandTests(LiveServerTestCase):
+    """Test load test command against a live server"""
+    server_thread_class = ClosingLiveServerThread
+
+    def test_benchmark_api(self):
+        """Test every scenario runs and created recipes are cleaned up"""
+        call_command(
+            "seed_data", "--users", "2", "--recipes", "10", stdout=StringIO()
+        )
+        out = StringIO()
+
+        call_command(
+            "benchmark_api", "--base-url", self.live_server_url,
+            "--users", "2", "--requests", "6", "--concurrency", "2",
+            "--warmup", "1", stdout=out, stderr=StringIO()
+        )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(list(report["scenarios"]), SCENARIOS)
+        for name, summary in report["scenarios"].items():
+            self.assertEqual(summary["requests"], 6)
+            self.assertEqual(summary["errors"], 0, (name, summary))
+            self.assertLessEqual(summary["p50_ms"], summary["p99_ms"])
+        self.assertEqual(Recipe.objects.count(), 10)
+
+    def test_benchmark_api_without_seed(self):
+        """Test command fails when seeded users are missing"""
+        with self.assertRaises(CommandError):
+            call_command(
+                "benchmark_api", "--base-url", self.live_server_url,
+                stdout=StringIO()
+            )
@@ -0,0 +1,155 @@
+"""
+Test database connection pool and health checks
+"""
+import threading
+
+from core.db import pool
+from django.db import connections
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TestCase
+from psycopg2 import extensions
+
+
+class FakeConnection:
+    """DB-API connection stand in"""
+
+    def __init__(self):
+        self.closed = 0
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.rolled_back = False
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rolled_back = True
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test ConnectionPool"""
+
+    def setUp(self):
+        pool.reset_stats()
+        self.pool = pool.ConnectionPool("test", max_size=1, timeout=0.05)
+
+    def test_reuse(self):
+        """Test released connections are handed out again"""
+        first = self.pool.acquire(FakeConnection)
+        self.pool.release(first)
+
+        self.assertIs(self.pool.acquire(FakeConnection), first)
+        self.assertEqual(pool.get_stats()["test"]["opened"], 1)
+        self.assertEqual(pool.get_stats()["test"]["reused"], 1)
+
+    def test_timeout(self):
+        """Test acquire gives up when every connection stays in use"""
+        self.pool.acquire(FakeConnection)
+
+        with self.assertRaises(pool.PoolTimeout):
+            self.pool.acquire(FakeConnection)
+        self.assertEqual(pool.get_stats()["test"]["pool_timeouts"], 1)
+
+    def test_wait_for_release(self):
+        """Test acquire waits for a connection released by another thread"""
+        self.pool.timeout = 5
+        first = self.pool.acquire(FakeConnection)
+        threading.Timer(0.05, self.pool.release, [first]).start()
+
+        self.assertIs(self.pool.acquire(FakeConnection), first)
+        self.assertEqual(pool.get_stats()["test"]["pool_waits"], 1)
+
+    def test_overflow(self):
+        """Test overflow connections are closed once released"""
+        self.pool.max_overflow = 1
+        first = self.pool.acquire(FakeConnection)
+        second = self.pool.acquire(FakeConnection)
+
+        self.pool.release(first)
+        self.pool.release(second)
+
+        self.assertFalse(first.closed)
+        self.assertTrue(second.closed)
+        self.assertEqual(self.pool.size, 1)
+
+    def test_release_rolls_back(self):
+        """Test connections are returned without an open transaction"""
+        conn = self.pool.acquire(FakeConnection)
+        conn.status = extensions.TRANSACTION_STATUS_INTRANS
+
+        self.pool.release(conn)
+
+        self.assertTrue(conn.rolled_back)
+        self.assertEqual(self.pool.idle, [conn])
+
+    def test_validate_replaces_broken(self):
+        """Test idle connections failing validation are replaced"""
+        broken = self.pool.acquire(FakeConnection)
+        self.pool.release(broken)
+
+        conn = self.pool.acquire(FakeConnection, validate=lambda conn: False)
+
+        self.assertIsNot(conn, broken)
+        self.assertTrue(broken.closed)
+        self.assertEqual(self.pool.size, 1)
+        self.assertEqual(
+            pool.get_stats()["test"]["health_check_failed"], 1
+        )
+
+    def test_connect_error(self):
+        """Test failed connects do not use up the pool"""
+        def connect():
+            raise OperationalError("unreachable")
+
+        with self.assertRaises(OperationalError):
+            self.pool.acquire(connect)
+        self.assertEqual(self.pool.size, 0)
+
+
+class DatabaseWrapperTests(TestCase):
+    """Test connection reuse of the PostgreSQL backend"""
+
+    def make_connection(self, **settings):
+        default = connections["default"]
+        settings_dict = {**default.settings_dict, **settings}
+        # Separate connection, the alias must exist for connection signals
+        wrapper = default.__class__(settings_dict, alias="default")
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def setUp(self):
+        pool.reset_stats()
+        self.addCleanup(pool.close_pools, "default")
+
+    def test_pooled_connection_reused(self):
+        """Test closing a pooled connection keeps it open for reuse"""
+        wrapper = self.make_connection(POOL={"MAX_SIZE": 1})
+        wrapper.ensure_connection()
+        first = wrapper.connection
+        wrapper.close()
+
+        wrapper.ensure_connection()
+
+        self.assertIs(wrapper.connection, first)
+        self.assertEqual(pool.get_stats()["default"]["reused"], 1)
+
+    def test_health_check_reconnects(self):
+        """Test broken persistent connections are replaced before use"""
+        wrapper = self.make_connection(
+            CONN_MAX_AGE=60, CONN_HEALTH_CHECKS=True
+        )
+        wrapper.ensure_connection()
+        wrapper.connection.close()
+
+        # New request starts
+        wrapper.close_if_unusable_or_obsolete()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            self.assertEqual(cursor.fetchone(), (1,))
+
+        stats = pool.get_stats()["default"]
+        self.assertEqual(stats["health_check_failed"], 1)
+        self.assertEqual(stats["opened"], 2)
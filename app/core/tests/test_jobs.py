@@ -0,0 +1,327 @@
+"""
+Test database backed background jobs
+"""
+import io
+import threading
+from datetime import timedelta
+from itertools import chain, repeat
+from unittest.mock import DEFAULT, patch
+
+from core import jobs
+from core.models import Job
+from core.tests.helpers import QueryCountMixin, create_users
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+JOBS_URL = reverse("core:job-list")
+
+
+def job_detail_url(job_id):
+    return reverse("core:job-detail", args=[job_id])
+
+
+@jobs.task("tests.add")
+def add(a, b):
+    return a + b
+
+
+@jobs.task("tests.fail")
+def fail():
+    raise RuntimeError("Task failed")
+
+
+def make_running(job, started_at):
+    """Mark job as claimed at started_at"""
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.RUNNING, attempts=1, started_at=started_at
+    )
+    job.refresh_from_db()
+    return job
+
+
+@patch("core.jobs.logger")
+@override_settings(
+    JOB_MAX_ATTEMPTS=3, JOB_RETRY_BACKOFF=10, JOB_RETRY_MAX_DELAY=25
+)
+class JobQueueTests(TestCase):
+    """Test enqueueing, claiming and running jobs"""
+
+    def test_enqueue_unknown_task(self, logger):
+        with self.assertRaises(ValueError):
+            jobs.enqueue("tests.unknown")
+
+    def test_run_job(self, logger):
+        """Test claimed job runs and stores its result"""
+        queued = jobs.enqueue("tests.add", {"a": 1, "b": 2})
+
+        job = jobs.claim("worker-1")
+        self.assertEqual(job.id, queued.id)
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        jobs.run(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, 3)
+        self.assertEqual(job.worker, "worker-1")
+        self.assertIsNotNone(job.finished_at)
+        self.assertIsNone(jobs.claim("worker-1"))
+
+    def test_claim_order(self, logger):
+        """Test due jobs are claimed oldest first, later ones are left"""
+        later = jobs.enqueue(
+            "tests.add", {"a": 1, "b": 1},
+            run_at=timezone.now() + timedelta(minutes=1),
+        )
+        first = jobs.enqueue("tests.add", {"a": 1, "b": 1})
+        second = jobs.enqueue("tests.add", {"a": 1, "b": 1})
+
+        claimed = [jobs.claim("worker-1") for _ in range(3)]
+
+        self.assertEqual(claimed, [first, second, None])
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.QUEUED)
+
+    def test_retry_with_backoff(self, logger):
+        """Test failing jobs are retried later until out of attempts"""
+        job = jobs.enqueue("tests.fail")
+        delays = []
+
+        for _ in range(3):
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            job = jobs.claim("worker-1")
+            before = timezone.now()
+            jobs.run(job)
+            job.refresh_from_db()
+            delays.append(round((job.run_at - before).total_seconds()))
+
+        self.assertEqual(delays[:2], [10, 20])
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertIn("RuntimeError: Task failed", job.error)
+        self.assertEqual(jobs.retry_delay(3), 25)
+
+    def test_requeue_stale(self, logger):
+        """Test jobs of dead workers are queued again or failed"""
+        old = timezone.now() - timedelta(hours=2)
+        stale = make_running(jobs.enqueue("tests.add", {"a": 1, "b": 1}), old)
+        exhausted = make_running(
+            jobs.enqueue("tests.add", {"a": 1, "b": 1}, max_attempts=1), old
+        )
+        fresh = make_running(
+            jobs.enqueue("tests.add", {"a": 1, "b": 1}), timezone.now()
+        )
+
+        self.assertEqual(jobs.requeue_stale(), 2)
+
+        for job in [stale, exhausted, fresh]:
+            job.refresh_from_db()
+        self.assertEqual(stale.status, Job.QUEUED)
+        self.assertEqual(exhausted.status, Job.FAILED)
+        self.assertEqual(fresh.status, Job.RUNNING)
+
+    def test_stale_outcome_dropped(self, logger):
+        """Test outcome of an attempt taken over by another worker is lost"""
+        jobs.enqueue("tests.add", {"a": 1, "b": 1})
+        job = jobs.claim("worker-1")
+        # Requeued as stale and claimed again by a second worker
+        Job.objects.filter(pk=job.pk).update(attempts=2)
+
+        jobs.run(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+        logger.warning.assert_called_once()
+
+
+class RunWorkerCommandTests(TestCase):
+    """Test run_worker management command"""
+
+    def setUp(self):
+        # Closing connections would end the test transaction
+        patcher = patch(
+            "core.management.commands.run_worker.close_old_connections"
+        )
+        self.close_old_connections = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst(self):
+        """Test due jobs are run and the worker exits when none is left"""
+        queued = [
+            jobs.enqueue("tests.add", {"a": index, "b": 1})
+            for index in range(3)
+        ]
+        stdout = io.StringIO()
+
+        call_command("run_worker", burst=True, stdout=stdout)
+
+        self.assertIn("Ran 3 jobs", stdout.getvalue())
+        self.assertEqual(
+            list(Job.objects.filter(
+                id__in=[job.id for job in queued]
+            ).order_by("id").values_list("status", "result")),
+            [(Job.SUCCEEDED, 1), (Job.SUCCEEDED, 2), (Job.SUCCEEDED, 3)],
+        )
+
+    def test_old_connections_closed(self):
+        """Test connections are checked before and after every cycle"""
+        for index in range(2):
+            jobs.enqueue("tests.add", {"a": index, "b": 1})
+
+        call_command("run_worker", burst=True, stdout=io.StringIO())
+
+        # Two cycles running a job, then one finding nothing due
+        self.assertEqual(self.close_old_connections.call_count, 6)
+
+    def test_database_error_retried(self):
+        """Test a database error is logged and the cycle retried"""
+        job = jobs.enqueue("tests.add", {"a": 1, "b": 1})
+        claim = patch.object(
+            jobs, "claim", wraps=jobs.claim,
+            side_effect=chain(
+                [OperationalError("server closed")], repeat(DEFAULT)
+            ),
+        )
+
+        with claim, self.assertLogs(
+            "core.management.commands.run_worker", "ERROR"
+        ):
+            call_command(
+                "run_worker", burst=True, poll_interval=0,
+                stdout=io.StringIO()
+            )
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        # The failed cycle also closed broken connections
+        self.assertEqual(self.close_old_connections.call_count, 6)
+
+    def test_invalid_concurrency(self):
+        with self.assertRaises(CommandError):
+            call_command("run_worker", burst=True, concurrency=0)
+
+
+class ConcurrentWorkerTests(TransactionTestCase):
+    """Test workers in separate connections never share a job"""
+
+    def test_locked_job_skipped(self):
+        """Test a job locked by another transaction is not waited for"""
+        first = jobs.enqueue("tests.add", {"a": 1, "b": 1})
+        second = jobs.enqueue("tests.add", {"a": 1, "b": 1})
+        locked = threading.Event()
+        release = threading.Event()
+
+        def lock_first():
+            with transaction.atomic():
+                Job.objects.select_for_update().get(pk=first.pk)
+                locked.set()
+                release.wait(10)
+            connection.close()
+
+        thread = threading.Thread(target=lock_first)
+        thread.start()
+        locked.wait(10)
+        try:
+            self.assertEqual(jobs.claim("worker-1"), second)
+            self.assertIsNone(jobs.claim("worker-1"))
+        finally:
+            release.set()
+            thread.join()
+
+    def test_concurrency(self):
+        """Test every job runs exactly once with several worker threads"""
+        Job.objects.bulk_create([
+            Job(name="tests.add", payload={"a": i, "b": 0}, max_attempts=1)
+            for i in range(40)
+        ])
+
+        call_command(
+            "run_worker", burst=True, concurrency=4, stdout=io.StringIO()
+        )
+
+        jobs_run = Job.objects.all()
+        self.assertEqual(
+            sorted(job.result for job in jobs_run), list(range(40))
+        )
+        self.assertTrue(all(job.attempts == 1 for job in jobs_run))
+
+
+class JobApiTests(QueryCountMixin, TestCase):
+    """Test job status API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=self.user)}"
+        )
+        self.job = jobs.enqueue("tests.add", {"a": 1, "b": 1}, user=self.user)
+        self.other_job = jobs.enqueue(
+            "tests.add", {"a": 1, "b": 1}, user=self.other_user
+        )
+
+    def test_authentication_required(self):
+        res = APIClient().get(JOBS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_own_jobs(self):
+        """Test users only see their jobs, latest first"""
+        newer = jobs.enqueue("tests.add", {"a": 2, "b": 2}, user=self.user)
+
+        res = self.client.get(JOBS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [job["id"] for job in res.data["results"]],
+            [newer.id, self.job.id],
+        )
+        self.assertEqual(res.data["results"][1]["status"], Job.QUEUED)
+
+    def test_status_filter(self):
+        jobs.run(jobs.claim("worker-1"))
+
+        res = self.client.get(JOBS_URL, {"status": Job.SUCCEEDED})
+
+        self.assertEqual(res.data["results"][0]["id"], self.job.id)
+        self.assertEqual(res.data["results"][0]["result"], 2)
+        res = self.client.get(JOBS_URL, {"status": "lost"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve(self):
+        """Test jobs of other users are not found"""
+        res = self.client.get(job_detail_url(self.job.id))
+        self.assertEqual(res.data["name"], "tests.add")
+
+        res = self.client.get(job_detail_url(self.other_job.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_staff_sees_every_job(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.get(JOBS_URL)
+
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_list_query_count(self):
+        def populate(size):
+            users = create_users(size, prefix=f"job-{size}-")
+            Job.objects.bulk_create([
+                Job(name="tests.add", payload={}, user=user)
+                for user in users + [self.user] * size
+            ])
+
+        self.assertConstantQueries(populate, lambda: self.client.get(JOBS_URL))
@@ -0,0 +1,163 @@
+"""
+Test Prometheus metrics endpoint
+"""
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from core.db import pool
+from core.tests.helpers import asgi_request, run_asgi
+from core.tests.urls import ASYNC_VIEW_DELAY
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY, Counter, values
+from prometheus_client.parser import text_string_to_metric_families
+from rest_framework import status
+from rest_framework.test import APIClient
+
+METRICS_URL = reverse("metrics")
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def request_count(route, method="GET", status_code="200"):
+    """Return requests recorded by this process for route"""
+    return REGISTRY.get_sample_value("http_requests_total", {
+        "route": route, "method": method, "status": status_code,
+    }) or 0
+
+
+class MetricsTests(TestCase):
+    """Test request metrics and their exposition"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_requests_counted_by_route(self):
+        """Test requests are counted under their URL pattern name"""
+        before = request_count("recipe:recipe-list")
+
+        self.client.get(RECIPE_URL)
+        self.client.get(RECIPE_URL, {"page_size": 5})
+
+        self.assertEqual(request_count("recipe:recipe-list"), before + 2)
+
+    def test_status_label(self):
+        """Test responses are counted by status code"""
+        before = request_count("user:account", status_code="401")
+
+        self.client.get(reverse("user:account"))
+
+        self.assertEqual(
+            request_count("user:account", status_code="401"), before + 1
+        )
+
+    def test_unmatched_route(self):
+        """Test unknown paths share one label instead of their path"""
+        before = request_count("unmatched", status_code="404")
+
+        self.client.get("/no/such/path/1/")
+        self.client.get("/no/such/path/2/")
+
+        self.assertEqual(
+            request_count("unmatched", status_code="404"), before + 2
+        )
+
+    def test_latency_histogram(self):
+        """Test latency is observed by route"""
+        labels = {"route": "recipe:recipe-list", "method": "GET"}
+        before = REGISTRY.get_sample_value(
+            "http_request_duration_seconds_count", labels
+        ) or 0
+
+        self.client.get(RECIPE_URL)
+
+        self.assertEqual(REGISTRY.get_sample_value(
+            "http_request_duration_seconds_count", labels
+        ), before + 1)
+
+    def test_metrics_endpoint(self):
+        """Test metrics are served in the Prometheus text format"""
+        self.client.get(RECIPE_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        families = {
+            family.name: family
+            for family in text_string_to_metric_families(res.content.decode())
+        }
+        self.assertIn("http_requests", families)
+        self.assertIn("http_request_duration_seconds", families)
+
+    def test_database_pool_metrics(self):
+        """Test connection events and pool sizes are exposed"""
+        with patch.object(pool, "get_stats", return_value={
+            "default": {"opened": 2, "reused": 5, "pool_size": 2,
+                        "pool_idle": 1},
+        }):
+            res = self.client.get(METRICS_URL)
+
+        content = res.content.decode()
+        self.assertIn(
+            'db_connection_events_total{alias="default",event="opened"} 2.0',
+            content
+        )
+        self.assertIn(
+            'db_connection_events_total{alias="default",event="reused"} 5.0',
+            content
+        )
+        self.assertIn('db_pool_connections{alias="default"} 2.0', content)
+        self.assertIn('db_pool_idle_connections{alias="default"} 1.0', content)
+        self.assertNotIn('event="pool_size"', content)
+
+    def test_multiprocess(self):
+        """Test values written by every worker are aggregated"""
+        with tempfile.TemporaryDirectory() as directory, patch.dict(
+            os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}
+        ), patch.object(values, "ValueClass", values.MultiProcessValue(
+            process_identifier=lambda: 4242
+        )):
+            # Metric of another worker, stored in its mmap file
+            worker_counter = Counter(
+                "worker_jobs", "Jobs", ["kind"], registry=None
+            )
+            worker_counter.labels("import").inc(3)
+
+            res = self.client.get(METRICS_URL)
+
+        self.assertIn(
+            'worker_jobs_total{kind="import"} 3.0', res.content.decode()
+        )
+        self.assertIn("db_connection_events", res.content.decode())
+
+
+@override_settings(ROOT_URLCONF="core.tests.urls")
+class AsyncMetricsTests(TestCase):
+    """Test metrics of async views served under ASGI"""
+
+    def test_concurrent_requests_observed(self):
+        """Test project middleware handles async requests concurrently"""
+        labels = {"route": "async-view", "method": "GET"}
+        before = request_count("async-view")
+        seconds_before = REGISTRY.get_sample_value(
+            "http_request_duration_seconds_sum", labels
+        ) or 0
+
+        start = time.perf_counter()
+        responses = run_asgi(*[asgi_request("/async/") for _ in range(5)])
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(
+            [res.status_code for res in responses], [status.HTTP_200_OK] * 5
+        )
+        self.assertLess(elapsed, ASYNC_VIEW_DELAY * 3)
+        self.assertEqual(request_count("async-view"), before + 5)
+        # Latency covers the time the view waited on the event loop
+        self.assertGreaterEqual(
+            REGISTRY.get_sample_value(
+                "http_request_duration_seconds_sum", labels
+            ) - seconds_before,
+            5 * ASYNC_VIEW_DELAY
+        )
@@ -0,0 +1,149 @@
+"""
+Test per request SQL instrumentation middleware
+"""
+import re
+import time
+from unittest.mock import patch
+
+from core import middleware
+from core.middleware import fingerprint
+from core.tests.helpers import (
+    asgi_request,
+    create_recipe,
+    recipe_detail_url,
+    run_asgi,
+)
+from core.tests.urls import ASYNC_VIEW_DELAY
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+TIMING = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?')
+
+
+def parse_server_timing(header):
+    """Return phases of Server-Timing header by name"""
+    return {
+        name: (float(duration), description)
+        for name, duration, description in TIMING.findall(header)
+    }
+
+
+class FingerprintTests(TestCase):
+    """Test SQL normalization"""
+
+    def test_literals_replaced(self):
+        """Test string and number literals become placeholders"""
+        self.assertEqual(
+            fingerprint("SELECT  *\nFROM t WHERE a = 'x''y' AND b > 10.5"),
+            "SELECT * FROM t WHERE a = ? AND b > ?",
+        )
+
+    def test_parameter_lists_collapsed(self):
+        """Test IN lists of any length share one fingerprint"""
+        self.assertEqual(
+            fingerprint('SELECT "id" FROM t WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT "id" FROM t WHERE "id" IN (%s, %s)'),
+        )
+
+    def test_identifiers_kept(self):
+        """Test digits inside identifiers are not replaced"""
+        self.assertEqual(
+            fingerprint('SELECT "t1"."id" FROM "t1" LIMIT 21'),
+            'SELECT "t1"."id" FROM "t1" LIMIT ?',
+        )
+
+
+class QueryTimingMiddlewareTests(TestCase):
+    """Test Server-Timing header and slow request logging"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.recipe = create_recipe(self.user)
+
+    def test_server_timing_header(self):
+        """Test header has db, serialize and total phases"""
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        timings = parse_server_timing(res["Server-Timing"])
+        self.assertEqual(list(timings), ["db", "serialize", "total"])
+        self.assertRegex(timings["db"][1], r"^[1-9]\d* queries$")
+        self.assertLessEqual(timings["db"][0], timings["total"][0])
+
+    def test_query_count(self):
+        """Test statements counted by the header match those executed"""
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(
+            parse_server_timing(res["Server-Timing"])["db"][1],
+            f"{len(context.captured_queries)} queries",
+        )
+
+    @override_settings(SERVER_TIMING=False)
+    def test_header_disabled(self):
+        """Test header is omitted when SERVER_TIMING is off"""
+        res = self.client.get(RECIPE_URL)
+
+        self.assertNotIn("Server-Timing", res)
+
+    @override_settings(SLOW_REQUEST_QUERY_COUNT=0)
+    def test_slow_request_logged(self):
+        """Test requests over the query limit are logged with fingerprints"""
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            self.client.get(recipe_detail_url(self.recipe.id))
+
+        url = recipe_detail_url(self.recipe.id)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn(f"GET {url}", logs.output[0])
+        self.assertIn('FROM "core_recipe" WHERE', logs.output[0])
+
+    def test_fast_request_not_logged(self):
+        """Test requests under both limits are not logged"""
+        with patch.object(middleware.logger, "warning") as patched_warning:
+            self.client.get(RECIPE_URL)
+
+        patched_warning.assert_not_called()
+
+
+@override_settings(
+    ROOT_URLCONF="core.tests.urls",
+    MIDDLEWARE=["core.middleware.QueryTimingMiddleware"],
+)
+class AsyncMiddlewareTests(TestCase):
+    """Test instrumentation of async views served under ASGI"""
+
+    def test_concurrent_requests(self):
+        """Test concurrent async requests are not handled one at a time"""
+        start = time.perf_counter()
+        responses = run_asgi(*[asgi_request("/async/") for _ in range(5)])
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(
+            [res.status_code for res in responses], [status.HTTP_200_OK] * 5
+        )
+        self.assertLess(elapsed, ASYNC_VIEW_DELAY * 3)
+
+    def test_queries_counted_per_request(self):
+        """Test queries of concurrent requests are counted apart"""
+        responses = run_asgi(
+            asgi_request("/async/", query_string="queries=1"),
+            asgi_request("/async/", query_string="queries=3"),
+        )
+
+        self.assertEqual(
+            [
+                parse_server_timing(res["Server-Timing"])["db"][1]
+                for res in responses
+            ],
+            ["1 queries", "3 queries"],
+        )
@@ -0,0 +1,76 @@
+"""
+Test paginator using planner row estimates
+"""
+from unittest.mock import patch
+
+from core.models import Recipe
+from core.paginator import (
+    EstimatedCountPaginator,
+    estimate_count,
+    estimate_table_rows,
+)
+from core.tests.helpers import create_recipes, create_users
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+
+class EstimateTests(TestCase):
+    """Test row estimates read from planner statistics"""
+
+    def test_estimate_table_rows(self):
+        """Test estimate comes from pg_class after ANALYZE"""
+        Token.objects.bulk_create([
+            Token(key=Token.generate_key(), user=user)
+            for user in create_users(7)
+        ])
+        # Statistics are updated in place and outlive the test transaction,
+        # so only analyze a table no query plan test depends on
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE authtoken_token")
+
+        self.assertEqual(estimate_table_rows(Token), 7)
+
+    def test_filtered_queryset_not_estimated(self):
+        """Test filtered or sliced querysets have no estimate"""
+        self.assertIsNone(estimate_count(Recipe.objects.filter(user_id=1)))
+        self.assertIsNone(estimate_count(Recipe.objects.all()[:5]))
+
+
+@patch("core.paginator.estimate_table_rows", return_value=30)
+class EstimatedCountPaginatorTests(TestCase):
+    """Test counts of large unfiltered querysets are estimated"""
+
+    def setUp(self):
+        self.users = create_users(2)
+        create_recipes(self.users, 20)
+
+    @override_settings(ESTIMATED_COUNT_MIN_ROWS=10)
+    def test_large_table_estimated(self, patched_estimate):
+        """Test unfiltered count uses the estimate instead of COUNT(*)"""
+        paginator = EstimatedCountPaginator(
+            Recipe.objects.order_by("id"), 10
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 30)
+
+        self.assertEqual(paginator.num_pages, 3)
+        patched_estimate.assert_called_once_with(Recipe, "default")
+
+    @override_settings(ESTIMATED_COUNT_MIN_ROWS=100)
+    def test_small_table_counted(self, patched_estimate):
+        """Test tables estimated below the threshold are counted exactly"""
+        paginator = EstimatedCountPaginator(Recipe.objects.order_by("id"), 10)
+
+        self.assertEqual(paginator.count, 20)
+
+    @override_settings(ESTIMATED_COUNT_MIN_ROWS=10)
+    def test_filtered_counted(self, patched_estimate):
+        """Test filtered querysets are counted exactly"""
+        paginator = EstimatedCountPaginator(
+            Recipe.objects.filter(user=self.users[0]).order_by("id"), 10
+        )
+
+        self.assertEqual(paginator.count, 10)
+        patched_estimate.assert_not_called()
@@ -0,0 +1,89 @@
+"""
+Test cached OpenAPI schema view
+"""
+import gzip
+import json
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from core import schema
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework import status
+
+SCHEMA_URL = reverse("api-schema")
+
+
+@override_settings(SCHEMA_CACHE_DIR="/nonexistent")
+class SchemaViewTests(TestCase):
+    """Test /api/schema/ serves a schema generated once"""
+
+    def setUp(self):
+        schema.clear_schema_cache()
+        self.addCleanup(schema.clear_schema_cache)
+
+    def test_same_document_as_spectacular(self):
+        """Test cached schema equals the one generated per request"""
+        for schema_format in ["yaml", "json"]:
+            request = RequestFactory().get(
+                SCHEMA_URL, {"format": schema_format}
+            )
+            expected = SpectacularAPIView.as_view()(request).render()
+
+            res = self.client.get(SCHEMA_URL, {"format": schema_format})
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.content, expected.content)
+            self.assertEqual(res["Content-Type"], expected["Content-Type"])
+
+    def test_generated_once(self):
+        """Test schema is only generated by the first request"""
+        with patch.object(
+            SchemaGenerator, "get_schema", wraps=SchemaGenerator().get_schema
+        ) as patched_get_schema:
+            first = self.client.get(SCHEMA_URL)
+            second = self.client.get(SCHEMA_URL)
+
+        patched_get_schema.assert_called_once()
+        self.assertEqual(first.content, second.content)
+
+    def test_not_modified(self):
+        """Test matching ETag returns 304 without a body"""
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_gzip(self):
+        """Test gzip variant is served to clients accepting it"""
+        plain = self.client.get(SCHEMA_URL)
+
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotEqual(res["ETag"], plain["ETag"])
+        self.assertIn("Accept-Encoding", res["Vary"])
+
+    def test_prebuilt_schema(self):
+        """Test documents written by build_schema are served as is"""
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "build_schema", output_dir=directory, stdout=StringIO()
+            )
+            with open(f"{directory}/openapi.json", "rb") as document:
+                content = document.read()
+
+            with override_settings(SCHEMA_CACHE_DIR=directory), \
+                    patch.object(SchemaGenerator, "get_schema") as patched:
+                res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        patched.assert_not_called()
+        self.assertEqual(res.content, content)
+        self.assertIn("paths", json.loads(content))
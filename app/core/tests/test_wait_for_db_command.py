@@ -1,41 +1,87 @@
 """
 Test wait_for_db command
 """
-from unittest.mock import patch
+from unittest.mock import call, patch
 
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
 from psycopg2 import OperationalError as Psycopg2Error
 
 
-@patch("core.management.commands.wait_for_db.Command.check")
+@patch("core.management.commands.wait_for_db.Command.probe")
 class CommandTests(SimpleTestCase):
 
-    def test_wait_for_db_readiness(self, patched_check):
+    def test_wait_for_db_readiness(self, patched_probe):
         """Test to check if database is ready"""
-        # Return true value when command check is called
-        patched_check.return_value = True
+        # Return true value when command probe is called
+        patched_probe.return_value = True
 
         # Simulate calling the command "wait_for_db"
         # located in the commands folder in command line
         call_command("wait_for_db")
 
-        patched_check.assert_called_once_with(databases=['default'])
+        self.assertEqual(patched_probe.call_count, 1)
+        self.assertEqual(patched_probe.call_args[0][0], "default")
 
     @patch("time.sleep")
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
+    def test_wait_for_db_delay(self, patched_sleep, patched_probe):
         """Check if database is ready if not delay and try again"""
 
         # Raise expectional error in the order they are called in when starting postgresql # noqa: E501
         # First two times (2) it will raise the Psycopg2Error
         # Next three times (3) it will raise the OperationalError
         # Before lastly returning True.
-        patched_check.side_effect = [Psycopg2Error] * 2 + \
+        patched_probe.side_effect = [Psycopg2Error] * 2 + \
             [OperationalError] * 3 + [True]
 
         call_command("wait_for_db")
 
         # Check the number of calls
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=['default'])
+        self.assertEqual(patched_probe.call_count, 6)
+        self.assertEqual(patched_sleep.call_count, 5)
+
+    @patch("random.uniform", side_effect=lambda low, high: high)
+    @patch("time.sleep")
+    def test_wait_for_db_backoff(
+        self, patched_sleep, patched_uniform, patched_probe
+    ):
+        """Check delays between attempts grow up to the maximum"""
+        patched_probe.side_effect = [OperationalError] * 4 + [True]
+
+        call_command(
+            "wait_for_db", "--interval", "1", "--max-interval", "5"
+        )
+
+        patched_sleep.assert_has_calls(
+            [call(1), call(2), call(4), call(5)]
+        )
+
+    def test_wait_for_db_timeout(self, patched_probe):
+        """Check command fails once timeout is reached"""
+        patched_probe.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "wait_for_db", "--timeout", "0.05", "--interval", "0.01"
+            )
+
+    def test_wait_for_db_unknown_database(self, patched_probe):
+        """Check unknown database aliases are rejected"""
+        with self.assertRaises(CommandError):
+            call_command("wait_for_db", "--database", "missing")
+
+        patched_probe.assert_not_called()
+
+
+class ProbeTests(TestCase):
+
+    def test_probe_database(self):
+        """Check probe connects to the running database"""
+        with patch.object(
+            connection.Database, "connect", wraps=connection.Database.connect
+        ) as patched_connect:
+            call_command("wait_for_db", "--timeout", "5")
+
+        patched_connect.assert_called_once()
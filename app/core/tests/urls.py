@@ -0,0 +1,27 @@
+"""
+URLconf of views used by middleware tests, see ROOT_URLCONF overrides
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from core.models import Recipe
+from django.http import HttpResponse
+from django.urls import path
+
+# Slow async view, one request takes about ASYNC_VIEW_DELAY seconds
+ASYNC_VIEW_DELAY = 0.2
+
+
+def run_queries(count):
+    for _ in range(count):
+        Recipe.objects.exists()
+
+
+async def async_view(request):
+    """Run ?queries= queries, then wait without blocking the event loop"""
+    await sync_to_async(run_queries)(int(request.GET.get("queries", 0)))
+    await asyncio.sleep(ASYNC_VIEW_DELAY)
+    return HttpResponse("done")
+
+
+urlpatterns = [path("async/", async_view, name="async-view")]
@@ -0,0 +1,15 @@
+"""
+URL mapping for Job status API
+"""
+from core import views
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter
+
+router = SimpleRouter()
+router.register("jobs", views.JobViewSet)
+
+app_name = "core"
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -0,0 +1,45 @@
+"""
+Views for the Job status API
+"""
+from core.models import Job
+from core.serializers import JobSerializer
+from django.conf import settings
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from user.authentication import CachedTokenAuthentication
+
+
+class JobCursorPagination(CursorPagination):
+    """Latest jobs first"""
+    ordering = "-id"
+    page_size = settings.API_PAGE_SIZE
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status of background jobs of the user, of every user for staff
+
+    Listings can be filtered with ?status=queued|running|succeeded|failed.
+    """
+    serializer_class = JobSerializer
+    queryset = Job.objects.all()
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = JobCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+
+        status = self.request.query_params.get("status")
+        if status:
+            choices = dict(Job.STATUS_CHOICES)
+            if status not in choices:
+                raise ValidationError({
+                    "status": f"Must be one of: {', '.join(choices)}"
+                })
+            queryset = queryset.filter(status=status)
+
+        return queryset
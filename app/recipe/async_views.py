@@ -0,0 +1,148 @@
+"""
+Async views for Recipe API
+
+Same behaviour as the matching RecipeViewSets actions, served natively
+under ASGI. Only database round trips leave the event loop.
+"""
+from asgiref.sync import sync_to_async
+from core.async_api import async_api_view, json_response
+from core.models import Recipe
+from django.shortcuts import get_object_or_404
+from recipe import cache, conditional, pagination, serializers
+from recipe.views import RecipeViewSets, can_modify_recipe
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
+
+
+def fetch_recipe_page(request, paginator, row_serializer):
+    """Return rows of the requested page of recipes"""
+    queryset = Recipe.objects.all()
+    for backend in RecipeViewSets.filter_backends:
+        queryset = backend().filter_queryset(request, queryset, None)
+
+    queryset = queryset.values_list(
+        *row_serializer.columns(
+            *paginator.get_ordering_names(queryset), "id", "last_modified"
+        ),
+        named=True
+    )
+    return paginator.paginate_queryset(queryset, request)
+
+
+def get_recipe(recipe_id):
+    """Return recipe or raise Http404"""
+    return get_object_or_404(
+        Recipe.objects.defer("search_vector"), pk=recipe_id
+    )
+
+
+def save_recipe_changes(recipe, changes):
+    """Write changes of recipe, see RecipeViewSets.perform_update()"""
+    if not recipe.save_changes(changes):
+        raise conditional.PreconditionFailed()
+    cache.invalidate_user_recipes(recipe.user_id)
+
+
+def recipe_response(request, recipe, data, status=status.HTTP_200_OK):
+    """Return response of a single recipe with its validators"""
+    etag, timestamp = conditional.recipe_validators(
+        recipe.pk, recipe.version, recipe.last_modified
+    )
+    return conditional.set_validators(
+        json_response(data, status), etag, timestamp
+    )
+
+
+@async_api_view(["GET", "POST"])
+async def recipe_list(request):
+    """List recipes a page at a time, or create a recipe"""
+    if request.method == "POST":
+        return await create_recipe(request)
+
+    fields = serializers.RecipeSerializer.fields_from_request(request)
+    row_serializer = serializers.get_row_serializer(
+        serializers.RecipeSerializer,
+        tuple(fields) if fields is not None else None
+    )
+    paginator = pagination.RecipeCursorPagination()
+    page = await sync_to_async(fetch_recipe_page)(
+        request, paginator, row_serializer
+    )
+
+    etag = conditional.collection_etag_for_rows(
+        request, paginator.window_rows
+    )
+    not_modified = conditional.not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    data = paginator.get_paginated_response(row_serializer.many(page)).data
+    return conditional.set_validators(json_response(data), etag)
+
+
+async def create_recipe(request):
+    """Create recipe owned by the request user"""
+    if not request.user.is_authenticated:
+        raise PermissionDenied(
+            "You would need to register an account to create recipes"
+        )
+
+    serializer = serializers.RecipeDetailSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    recipe = await sync_to_async(serializer.save)(user=request.user)
+
+    return recipe_response(
+        request, recipe, serializer.data, status.HTTP_201_CREATED
+    )
+
+
+@async_api_view(["GET", "PUT", "PATCH", "DELETE"])
+async def recipe_detail(request, pk):
+    """Retrieve, update or delete a recipe"""
+    recipe = await sync_to_async(get_recipe)(pk)
+
+    if request.method == "GET":
+        etag, timestamp = conditional.recipe_validators(
+            recipe.pk, recipe.version, recipe.last_modified
+        )
+        not_modified = conditional.not_modified_response(
+            request, etag, timestamp
+        )
+        if not_modified is not None:
+            return not_modified
+
+        serializer = serializers.RecipeDetailSerializer(
+            recipe,
+            fields=serializers.RecipeDetailSerializer.fields_from_request(
+                request
+            )
+        )
+        return recipe_response(request, recipe, serializer.data)
+
+    if request.method == "DELETE":
+        if not can_modify_recipe(request.user, recipe.user_id):
+            raise PermissionDenied(
+                "You do not have permission to delete the recipe"
+            )
+
+        await sync_to_async(recipe.delete)()
+        return json_response(None, status.HTTP_204_NO_CONTENT)
+
+    if not can_modify_recipe(request.user, recipe.user_id):
+        raise PermissionDenied(
+            "You do not have permission to edit the recipe"
+        )
+
+    serializer = serializers.RecipeDetailSerializer(
+        recipe, data=request.data, partial=request.method == "PATCH"
+    )
+    serializer.is_valid(raise_exception=True)
+    etag, timestamp = conditional.recipe_validators(
+        recipe.pk, recipe.version, recipe.last_modified
+    )
+    conditional.check_precondition(request, etag, timestamp)
+    await sync_to_async(save_recipe_changes)(
+        recipe, serializer.validated_data
+    )
+
+    return recipe_response(request, recipe, serializer.data)
@@ -0,0 +1,58 @@
+"""
+Versioned per-user cache of serialized Recipe listings
+
+Entries are looked up in a small per process cache first and in the shared
+cache second. Every entry key contains the owner's current version number,
+which lives in the shared cache only. Bumping the version makes every
+cached page of that user unreachable in all processes at once.
+"""
+import hashlib
+
+from core.cache import SHARED_CACHE, bump_version, get_version
+from django.conf import settings
+from django.core.cache import caches
+
+LOCAL_CACHE = "local"
+
+
+def _version_key(user_id):
+    return f"recipe:user:{user_id}:version"
+
+
+def get_user_version(user_id):
+    """Return current cache version of user's recipes"""
+    return get_version(_version_key(user_id))
+
+
+def invalidate_user_recipes(user_id):
+    """Make every cached page of user's recipes stale"""
+    bump_version(_version_key(user_id))
+
+
+def user_recipes_key(request, user_id):
+    """Return cache key of the page of user recipes requested"""
+    variant = ":".join([
+        request.accepted_renderer.format,
+        request.build_absolute_uri(),
+    ])
+    digest = hashlib.md5(variant.encode("utf-8")).hexdigest()
+
+    return f"recipe:user:{user_id}:{get_user_version(user_id)}:{digest}"
+
+
+def get_entry(key):
+    """Return cached value from local tier, falling back to shared tier"""
+    local = caches[LOCAL_CACHE]
+    value = local.get(key)
+    if value is None:
+        value = caches[SHARED_CACHE].get(key)
+        if value is not None:
+            local.set(key, value, settings.RECIPE_CACHE_TIMEOUT)
+
+    return value
+
+
+def set_entry(key, value):
+    """Store value in both cache tiers"""
+    caches[SHARED_CACHE].set(key, value, settings.RECIPE_CACHE_TIMEOUT)
+    caches[LOCAL_CACHE].set(key, value, settings.RECIPE_CACHE_TIMEOUT)
@@ -0,0 +1,130 @@
+"""
+Conditional request support (ETag / Last-Modified) for Recipe API
+"""
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+CONDITIONAL_HEADERS = ["HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE"]
+
+
+class PreconditionFailed(APIException):
+    """Recipe changed since the client read the version it is editing"""
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "Recipe was modified by another request."
+    default_code = "precondition_failed"
+
+
+def is_conditional(request):
+    """Return True if client sent validators from an earlier response"""
+    return any(header in request.META for header in CONDITIONAL_HEADERS)
+
+
+def hash_etag(*parts):
+    """Return quoted ETag hashing parts"""
+    value = ":".join(str(part) for part in parts)
+
+    return quote_etag(hashlib.md5(value.encode("utf-8")).hexdigest())
+
+
+def make_etag(request, *parts):
+    """Return quoted ETag for the representation of parts
+
+    The requested format and query string are part of the tag because they
+    change the representation of the same rows. Only used for collections,
+    see recipe_validators() for single recipes.
+    """
+    return hash_etag(
+        *parts,
+        request.accepted_renderer.format,
+        request.query_params.urlencode(),
+    )
+
+
+def recipe_validators(recipe_id, version, last_modified):
+    """Return (etag, last_modified timestamp) of a single recipe
+
+    The ETag only depends on the state of the recipe, not on the format
+    or fields requested, so an ETag read from any representation can be
+    sent back in If-Match to edit the recipe.
+    """
+    timestamp = timegm(last_modified.utctimetuple())
+
+    etag = hash_etag(recipe_id, version, last_modified.isoformat())
+
+    return etag, timestamp
+
+
+def collection_etag(request, count, id_sum, latest):
+    """Return ETag of a collection from aggregates over its rows"""
+    return make_etag(
+        request,
+        count,
+        id_sum or 0,
+        latest.isoformat() if latest else "",
+    )
+
+
+def collection_etag_for_rows(request, rows):
+    """Return ETag of a collection from already fetched rows"""
+    return collection_etag(
+        request,
+        len(rows),
+        sum(row.id for row in rows),
+        max((row.last_modified for row in rows), default=None),
+    )
+
+
+def collection_etag_for_queryset(request, queryset):
+    """Return ETag of a collection using a single aggregate query
+
+    Same value as collection_etag_for_rows() but without fetching or
+    serializing the rows. Only ``id`` and ``last_modified`` are read.
+    """
+    aggregates = queryset.model.objects.filter(
+        pk__in=queryset.values("pk")
+    ).aggregate(
+        count=Count("id"),
+        id_sum=Sum("id"),
+        latest=Max("last_modified"),
+    )
+
+    return collection_etag(request, **aggregates)
+
+
+def not_modified_response(request, etag, last_modified=None):
+    """Return 304 response if client copy is still fresh, otherwise None"""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+
+    return response
+
+
+def check_precondition(request, etag, last_modified=None):
+    """Raise PreconditionFailed if If-Match / If-Unmodified-Since fail"""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+    if response is not None:
+        raise PreconditionFailed()
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add ETag and Last-Modified headers to response"""
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+
+    return response
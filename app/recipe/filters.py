@@ -0,0 +1,153 @@
+"""
+Filters for Recipe API
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+class RecipeFilterSerializer(serializers.Serializer):
+    """Validate filter query parameters of recipe listings"""
+    cost_min = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False
+    )
+    cost_max = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False
+    )
+    time_needed_min = serializers.IntegerField(required=False)
+    time_needed_max = serializers.IntegerField(required=False)
+    user = serializers.IntegerField(min_value=1, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    modified_after = serializers.DateTimeField(required=False)
+    modified_before = serializers.DateTimeField(required=False)
+
+    # Query parameter -> queryset lookup
+    lookups = {
+        "cost_min": "cost__gte",
+        "cost_max": "cost__lte",
+        "time_needed_min": "time_needed__gte",
+        "time_needed_max": "time_needed__lte",
+        "user": "user_id",
+        "created_after": "created_at__gte",
+        "created_before": "created_at__lt",
+        "modified_after": "last_modified__gte",
+        "modified_before": "last_modified__lt",
+    }
+    ranges = [
+        ("cost_min", "cost_max"),
+        ("time_needed_min", "time_needed_max"),
+        ("created_after", "created_before"),
+        ("modified_after", "modified_before"),
+    ]
+
+    def validate(self, attrs):
+        """Reject ranges whose lower bound is above the upper bound"""
+        for lower, upper in self.ranges:
+            if lower not in attrs or upper not in attrs:
+                continue
+            if attrs[lower] > attrs[upper]:
+                raise serializers.ValidationError(
+                    {lower: f"Must not be greater than {upper}"}
+                )
+
+        return attrs
+
+
+class RecipeRangeFilter(BaseFilterBackend):
+    """Filter recipes by cost, time needed, owner and date ranges
+
+    Every filter maps onto an indexed column of core_recipe.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        serializer = RecipeFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        return queryset.filter(**{
+            serializer.lookups[name]: value
+            for name, value in serializer.validated_data.items()
+        })
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": f"Filter on {lookup.replace('__', ' ')}.",
+                "schema": {"type": "string"},
+            }
+            for name, lookup in RecipeFilterSerializer.lookups.items()
+        ]
+
+
+class RecipeOrderingFilter(OrderingFilter):
+    """Order recipes by one of the indexed columns
+
+    Unlike OrderingFilter unknown fields are rejected instead of ignored.
+    """
+    ordering_fields = [
+        "id",
+        "created_at",
+        "last_modified",
+        "cost",
+        "time_needed",
+    ]
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid_fields = [name for name, label in self.get_valid_fields(
+            queryset, view, {"request": request}
+        )]
+        invalid = [
+            field for field in fields if field.lstrip("-") not in valid_fields
+        ]
+        if invalid:
+            raise ValidationError({
+                self.ordering_param: (
+                    f"Invalid ordering {', '.join(invalid)}. Must be one of: "
+                    f"{', '.join(valid_fields)}"
+                )
+            })
+
+        return fields
+
+
+class RecipeSearchFilter(BaseFilterBackend):
+    """Full text search over recipe title and description
+
+    Matches use the GIN index on ``search_vector`` and are ordered by rank,
+    best match first.
+    """
+    search_param = "search"
+    search_config = "english"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms:
+            return queryset
+
+        query = SearchQuery(
+            terms, config=self.search_config, search_type="websearch"
+        )
+        # ts_rank returns real, cast to double precision so that the rank
+        # survives a round trip through a pagination cursor unchanged
+        rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+
+        return queryset.annotate(rank=rank).filter(
+            search_vector=query
+        ).order_by("-rank", "-id")
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Full text search over title and description.",
+                "schema": {"type": "string"},
+            },
+        ]
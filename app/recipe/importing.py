@@ -0,0 +1,206 @@
+"""
+Bulk import of recipes from CSV and NDJSON files
+
+Rows are read one at a time from a text stream and validated with the
+rules of RecipeDetailSerializer, the same ones applied to POSTed recipes.
+Valid rows are loaded batch by batch, each batch in its own transaction,
+with PostgreSQL COPY FROM STDIN, or with bulk_create on other databases.
+Invalid rows are rejected without stopping the import.
+"""
+import csv
+import io
+import json
+import os
+import time
+
+from core.models import Recipe
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from recipe import cache
+from recipe.serializers import RecipeDetailSerializer
+from rest_framework.exceptions import ValidationError
+
+NDJSON = "ndjson"
+CSV = "csv"
+IMPORT_FORMATS = [NDJSON, CSV]
+# Filled by a database trigger, see migration 0005_recipe_search_vector
+SKIPPED_COLUMNS = ["id", "search_vector"]
+
+
+def get_import_format(filename, requested=None):
+    """Return format requested, or guessed from extension of filename"""
+    import_format = requested or os.path.splitext(filename)[1].lstrip(".")
+    if import_format.lower() not in IMPORT_FORMATS:
+        raise ValueError(
+            f"Unknown format {import_format!r}. Must be one of: "
+            f"{', '.join(IMPORT_FORMATS)}"
+        )
+
+    return import_format.lower()
+
+
+def iter_csv(stream):
+    """Yield rows of CSV with a header as dicts
+
+    Empty cells, and cells missing from rows shorter than the header, are
+    left out so that fields get their default value.
+    """
+    for row in csv.DictReader(stream):
+        yield {
+            name: value for name, value in row.items()
+            if value is not None and value != ""
+        }
+
+
+def iter_ndjson(stream):
+    """Yield rows of newline delimited JSON, None for undecodable lines"""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def iter_records(stream, import_format):
+    """Yield rows of text stream in the given format"""
+    if import_format == CSV:
+        return iter_csv(stream)
+
+    return iter_ndjson(stream)
+
+
+class ImportResult:
+    """Counts and first errors of an import"""
+
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        # (row number, errors) of the first RECIPE_IMPORT_MAX_ERRORS rows
+        self.errors = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        if not self.seconds:
+            return 0.0
+
+        return (self.imported + self.rejected) / self.seconds
+
+    def reject(self, row_number, errors):
+        self.rejected += 1
+        if len(self.errors) < settings.RECIPE_IMPORT_MAX_ERRORS:
+            self.errors.append((row_number, errors))
+
+    def as_dict(self):
+        return {
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "errors": [
+                {"row": row_number, "errors": errors}
+                for row_number, errors in self.errors
+            ],
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+class RecipeImporter:
+    """Validate rows in batches and load the valid ones for one user"""
+
+    def __init__(self, user_id, batch_size=None, using="default"):
+        self.user_id = user_id
+        self.batch_size = batch_size or settings.RECIPE_IMPORT_BATCH_SIZE
+        self.using = using
+        # One serializer validates every row, as ListSerializer does
+        self.serializer = RecipeDetailSerializer()
+        self.fields = [
+            field for field in Recipe._meta.concrete_fields
+            if field.name not in SKIPPED_COLUMNS
+        ]
+
+    def run(self, records):
+        """Import every row of records and return an ImportResult"""
+        result = ImportResult()
+        started = time.perf_counter()
+        batch = []
+
+        for row_number, record in enumerate(records, start=1):
+            data, errors = self.validate(record)
+            if errors:
+                result.reject(row_number, errors)
+                continue
+
+            batch.append(data)
+            if len(batch) >= self.batch_size:
+                result.imported += self.load(batch)
+                batch = []
+
+        if batch:
+            result.imported += self.load(batch)
+        if result.imported:
+            cache.invalidate_user_recipes(self.user_id)
+
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def validate(self, record):
+        """Return validated data of row and errors, if any"""
+        if record is None:
+            return None, {"non_field_errors": ["Invalid JSON"]}
+
+        try:
+            return self.serializer.run_validation(record), None
+        except ValidationError as exc:
+            return None, exc.detail
+
+    def load(self, batch):
+        """Insert validated rows in a single transaction"""
+        connection = connections[self.using]
+        with transaction.atomic(using=self.using):
+            if connection.vendor == "postgresql":
+                self.copy(connection, batch)
+            else:
+                Recipe.objects.using(self.using).bulk_create(
+                    [Recipe(user_id=self.user_id, **data) for data in batch],
+                    batch_size=settings.RECIPE_BULK_BATCH_SIZE,
+                )
+
+        return len(batch)
+
+    def copy(self, connection, batch):
+        """Stream rows to COPY FROM STDIN as CSV"""
+        now = timezone.now()
+        buffer = io.StringIO()
+        # Quoting every value keeps empty strings apart from NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        for data in batch:
+            writer.writerow([
+                self.column_value(connection, field, data, now)
+                for field in self.fields
+            ])
+        buffer.seek(0)
+
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(field.column) for field in self.fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote_name(Recipe._meta.db_table)} ({columns}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+
+    def column_value(self, connection, field, data, now):
+        """Return value of field as bulk_create would save it"""
+        if field.attname == "user_id":
+            value = self.user_id
+        elif getattr(field, "auto_now_add", False):
+            value = now
+        elif field.name in data:
+            value = data[field.name]
+        else:
+            value = field.get_default()
+
+        return field.get_db_prep_save(value, connection)
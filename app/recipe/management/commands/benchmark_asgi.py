@@ -0,0 +1,131 @@
+"""
+Django command to compare recipe endpoints served by WSGI and ASGI
+"""
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from core.models import Recipe
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+BENCHMARK_EMAIL = "benchmark-asgi@example.com"
+
+
+class Command(BaseCommand):
+    """Django Command to load sync and async recipe views concurrently"""
+    help = (
+        "Send concurrent requests to the WSGI recipe viewset and to the "
+        "async recipe views through in-process test clients, and report "
+        "requests per second and latency percentiles of both"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=500,
+            help="Requests sent to each endpoint",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=50,
+            help="Requests in flight at once",
+        )
+        parser.add_argument(
+            "--sample", type=int, default=0,
+            help="Create this many recipes for the run, deleted afterwards",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        user = None
+        if options["sample"]:
+            user = self.create_sample(options["sample"])
+
+        # Test clients send requests for host "testserver"
+        allowed_hosts = ["testserver", *settings.ALLOWED_HOSTS]
+        try:
+            with override_settings(ALLOWED_HOSTS=allowed_hosts):
+                self.run(options["requests"], options["concurrency"])
+        finally:
+            if user is not None:
+                user.delete()
+
+    def create_sample(self, count):
+        get_user_model().objects.filter(email=BENCHMARK_EMAIL).delete()
+        user = get_user_model().objects.create_user(email=BENCHMARK_EMAIL)
+        Recipe.objects.bulk_create(
+            Recipe(
+                user=user,
+                title=f"Benchmark recipe {index}",
+                time_needed=index % 120,
+                cost=Decimal(index % 10000) / 100,
+            )
+            for index in range(count)
+        )
+
+        return user
+
+    def run(self, requests, concurrency):
+        for name, path, run in [
+            ("WSGI", reverse("recipe:recipe-list"), self.run_sync),
+            ("ASGI", reverse("recipe:async-recipe-list"), self.run_async),
+        ]:
+            start = time.perf_counter()
+            latencies = run(path, requests, concurrency)
+            self.report(name, latencies, time.perf_counter() - start)
+
+    def run_sync(self, path, requests, concurrency):
+        """Send requests from a pool of threads, like WSGI workers"""
+        def send(_):
+            client = Client()
+            start = time.perf_counter()
+            response = client.get(path)
+            elapsed = time.perf_counter() - start
+            # Worker threads are not reused by the next run
+            connections.close_all()
+            self.check_response(response)
+            return elapsed
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(send, range(requests)))
+
+    def run_async(self, path, requests, concurrency):
+        """Send requests as coroutines on a single event loop"""
+        async def send(client, semaphore):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                elapsed = time.perf_counter() - start
+            self.check_response(response)
+            return elapsed
+
+        async def main():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*[
+                send(client, semaphore) for _ in range(requests)
+            ])
+
+        return asyncio.run(main())
+
+    def check_response(self, response):
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Unexpected status {response.status_code}"
+            )
+
+    def report(self, name, latencies, seconds):
+        latencies = sorted(latencies)
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{name}: {len(latencies)} requests in {seconds:.2f} s, "
+            f"{len(latencies) / seconds:.0f} requests/s, "
+            f"p50 {percentiles[49] * 1000:.1f} ms, "
+            f"p95 {percentiles[94] * 1000:.1f} ms, "
+            f"p99 {percentiles[98] * 1000:.1f} ms"
+        )
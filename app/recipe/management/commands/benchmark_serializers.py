@@ -0,0 +1,105 @@
+"""
+Django command to compare speed of recipe serializers
+"""
+import time
+from decimal import Decimal
+
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipe.serializers import (
+    RecipeDetailSerializer,
+    RecipeSerializer,
+    RowSerializer,
+)
+
+
+class Rollback(Exception):
+    """Raised to discard sample recipes after benchmarking"""
+
+
+class Command(BaseCommand):
+    """Django Command to time ModelSerializer against RowSerializer"""
+    help = (
+        "Serialize recipes with ModelSerializer and with RowSerializer "
+        "and report objects per second of both"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sample", type=int, default=0,
+            help="Create this many recipes for the run and roll them back",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=10000,
+            help="Serialize at most this many recipes",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3,
+            help="Keep the best of this many runs",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        try:
+            with transaction.atomic():
+                if options["sample"]:
+                    self.create_sample(options["sample"])
+                self.run(options["limit"], options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_sample(self, count):
+        user = get_user_model().objects.create_user(
+            email="benchmark@example.com"
+        )
+        Recipe.objects.bulk_create(
+            Recipe(
+                user=user,
+                title=f"Benchmark recipe {index}",
+                time_needed=index % 120,
+                cost=Decimal(index % 10000) / 100,
+                description="Benchmark description " * 10,
+                link="http://example.com",
+            )
+            for index in range(count)
+        )
+
+    def run(self, limit, repeat):
+        queryset = Recipe.objects.defer("search_vector").order_by("id")
+        for serializer_class in [RecipeSerializer, RecipeDetailSerializer]:
+            row_serializer = RowSerializer(serializer_class)
+            columns = row_serializer.columns()
+
+            def model_serializer():
+                recipes = queryset.only(*columns)[:limit]
+                return serializer_class(recipes, many=True).data
+
+            def values_list_serializer():
+                rows = queryset.values_list(*columns)[:limit]
+                return row_serializer.many(rows)
+
+            for name, serialize in [
+                ("ModelSerializer", model_serializer),
+                ("RowSerializer", values_list_serializer),
+            ]:
+                count, seconds = self.measure(serialize, repeat)
+                rate = count / seconds if seconds else 0
+                self.stdout.write(
+                    f"{serializer_class.__name__:24} {name:16} "
+                    f"{count:8} objects {seconds * 1000:9.1f} ms "
+                    f"{rate:12.0f} objects/s"
+                )
+
+    def measure(self, serialize, repeat):
+        """Return object count and best time of serializing"""
+        best = None
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            count = len(serialize())
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        return count, best
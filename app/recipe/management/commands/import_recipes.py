@@ -0,0 +1,86 @@
+"""
+Django command to bulk import recipes of a user from a file
+"""
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from recipe import importing, tasks
+
+
+class Command(BaseCommand):
+    """Django Command to load CSV or NDJSON recipes with COPY"""
+    help = (
+        "Import recipes from a CSV file with a header or an NDJSON file "
+        "for the user with the given email. Rows failing validation are "
+        "reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file, - for stdin")
+        parser.add_argument(
+            "--user", required=True, help="Email of the owner of recipes",
+        )
+        parser.add_argument(
+            "--format", dest="import_format",
+            choices=importing.IMPORT_FORMATS,
+            help="Format of the file, guessed from its extension by default",
+        )
+        parser.add_argument(
+            "--batch-size", type=int,
+            help="Rows loaded per transaction",
+        )
+        parser.add_argument(
+            "--background", action="store_true",
+            help="Queue a job for run_worker instead of importing now",
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        try:
+            import_format = importing.get_import_format(
+                options["path"], options["import_format"]
+            )
+        except ValueError as exc:
+            raise CommandError(f"{exc}, use --format")
+
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+
+        if options["background"]:
+            return self.enqueue(user, options["path"], import_format)
+
+        importer = importing.RecipeImporter(user.id, options["batch_size"])
+        if options["path"] == "-":
+            result = importer.run(
+                importing.iter_records(sys.stdin, import_format)
+            )
+        else:
+            with open(
+                options["path"], encoding="utf-8-sig", newline=""
+            ) as stream:
+                result = importer.run(
+                    importing.iter_records(stream, import_format)
+                )
+
+        for row_number, errors in result.errors:
+            self.stderr.write(f"Row {row_number} rejected: {errors}")
+        if result.rejected > len(result.errors):
+            self.stderr.write(
+                f"{result.rejected - len(result.errors)} more rows rejected"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.imported} recipes, rejected "
+            f"{result.rejected} rows in {result.seconds:.2f}s "
+            f"({result.rows_per_second:.0f} rows/s)"
+        ))
+
+    def enqueue(self, user, path, import_format):
+        if path == "-":
+            raise CommandError("Background imports need a file path")
+
+        job = tasks.enqueue_import(user, path, import_format)
+        self.stdout.write(self.style.SUCCESS(f"Queued job {job.id}"))
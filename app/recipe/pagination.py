@@ -0,0 +1,391 @@
+"""
+Keyset (cursor) pagination for Recipe API
+"""
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from functools import reduce
+from operator import or_
+
+from core.paginator import estimate_count
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import BooleanField, Expression, F, Q, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class RowComparison(Expression):
+    """SQL row value comparison such as ``(created_at, id) > (%s, %s)``
+
+    Unlike the equivalent chain of OR conditions, PostgreSQL turns it into
+    an index range starting at the given row.
+    """
+    output_field = BooleanField()
+    conditional = True
+
+    def __init__(self, lhs, operator, rhs):
+        super().__init__()
+        self.lhs = list(lhs)
+        self.operator = operator
+        self.rhs = list(rhs)
+
+    def get_source_expressions(self):
+        return [*self.lhs, *self.rhs]
+
+    def set_source_expressions(self, exprs):
+        self.lhs, self.rhs = exprs[:len(self.lhs)], exprs[len(self.lhs):]
+
+    def as_sql(self, compiler, connection):
+        sides = []
+        params = []
+        for expressions in [self.lhs, self.rhs]:
+            sqls = []
+            for expression in expressions:
+                sql, expression_params = compiler.compile(expression)
+                sqls.append(sql)
+                params.extend(expression_params)
+            sides.append(f"({', '.join(sqls)})")
+
+        return f"{sides[0]} {self.operator} {sides[1]}", params
+
+
+class RecipeCursorPagination(BasePagination):
+    """Paginate recipes by seeking past the last row of the previous page
+
+    The cursor stores the ordering values of the boundary row, so every page
+    is fetched with a ``WHERE (created_at, id) > (...) LIMIT n`` style query
+    that can walk an index. No ``OFFSET`` is ever issued, and ``COUNT(*)``
+    only when the client asks for a total with ``?count=true``. Totals of
+    querysets the planner estimates at ESTIMATED_COUNT_MIN_ROWS rows or
+    more are estimates, flagged by ``count_estimated``.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+    # Used when the queryset has not been ordered explicitly
+    ordering = ("created_at", "id")
+    # Last ordering column must be unique so that every row has one position
+    unique_field = "id"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        """Return page size requested by the client, capped at maximum"""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def count_requested(self, request):
+        """Return True if the client asked for the total number of rows"""
+        value = request.query_params.get(self.count_query_param, "")
+        return value.lower() in ("true", "1")
+
+    def get_count(self, queryset):
+        """Return total rows of queryset and whether it is an estimate"""
+        estimate = estimate_count(queryset, explain=True)
+        if (
+            estimate is not None
+            and estimate >= settings.ESTIMATED_COUNT_MIN_ROWS
+        ):
+            return estimate, True
+
+        return queryset.count(), False
+
+    def get_ordering(self, queryset):
+        """Return ordering of queryset with a unique tie-breaker appended"""
+        ordering = tuple(queryset.query.order_by) or self.ordering
+        field_names = [field.lstrip("-") for field in ordering]
+
+        if self.unique_field not in field_names:
+            # Tie-breaker follows direction of the last ordering column
+            descending = ordering[-1].startswith("-")
+            ordering += (
+                ("-" if descending else "") + self.unique_field,
+            )
+
+        return ordering
+
+    def get_ordering_names(self, queryset):
+        """Return names of columns and annotations used for ordering"""
+        return [field.lstrip("-") for field in self.get_ordering(queryset)]
+
+    def get_window(self, queryset, request):
+        """Return unevaluated queryset of rows needed to build the page
+
+        The window holds the page plus one extra row used to find out
+        whether another page follows.
+        """
+        return self.seek(queryset, request)[:self.page_size + 1]
+
+    def get_stream_window(self, queryset, request, max_rows):
+        """Return queryset streaming at most max_rows rows, and next link
+
+        Headers are sent before the rows, so the boundary row is looked up
+        first. Rows up to and including it are then selected instead of
+        using LIMIT, so rows inserted in between are not skipped by the
+        next page.
+        """
+        queryset = self.seek(queryset, request, max_rows)
+        if self.reverse:
+            # Streams only move forward
+            raise NotFound(self.invalid_cursor_message)
+
+        names = [field.lstrip("-") for field in self.ordering]
+        boundary = list(
+            queryset.values_list(*names, named=True)[max_rows - 1:max_rows + 1]
+        )
+        if len(boundary) < 2:
+            return queryset, None
+
+        position = [getattr(boundary[0], name) for name in names]
+        queryset = queryset.exclude(self._seek_filter(self.ordering, position))
+
+        return queryset, self.encode_cursor(boundary[0], reverse=False)
+
+    def seek(self, queryset, request, page_size=None):
+        """Return queryset ordered and filtered to start at the cursor"""
+        self.request = request
+        self.page_size = page_size or self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.model = queryset.model
+        self.annotations = queryset.query.annotations
+        self.position, self.reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        field_names, deferred = queryset.query.deferred_loading
+        if not deferred:
+            # Cursor links read the ordering columns of boundary rows, make
+            # sure a projection made with only() still loads them
+            queryset = queryset.only(*field_names, *self._model_fields())
+
+        if self.position is not None:
+            queryset = queryset.filter(
+                self._seek_filter(ordering, self.position)
+            )
+
+        return queryset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if self.count_requested(request):
+            self.count = self.get_count(queryset)
+        self.window_rows = list(self.get_window(queryset, request))
+        has_more = len(self.window_rows) > self.page_size
+        self.page = self.window_rows[:self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response["count"], response["count_estimated"] = self.count
+
+        return Response({
+            **response,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer"},
+                "count_estimated": {"type": "boolean"},
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, item, reverse):
+        """Return URL pointing to the page next to ``item``"""
+        position = [
+            self._to_cursor_value(getattr(item, field.lstrip("-")))
+            for field in self.ordering
+        ]
+        payload = {"o": self.ordering, "p": position}
+        if reverse:
+            payload["r"] = 1
+
+        cursor = b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+        url = self.request.build_absolute_uri()
+
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """Return (position, reverse) stored in cursor of the request"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(b64decode(encoded.encode("ascii")))
+            ordering = tuple(payload["o"])
+            position = payload["p"]
+            reverse = bool(payload.get("r"))
+        except (
+            BinasciiError, KeyError, TypeError, UnicodeError, ValueError
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        # Cursor is only valid for the ordering it was generated from
+        if (
+            ordering != self.ordering
+            or not isinstance(position, list)
+            or len(position) != len(ordering)
+            or not all(map(self._is_cursor_value, position))
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        try:
+            position = [
+                self._from_cursor_value(field.lstrip("-"), value)
+                for field, value in zip(ordering, position)
+            ]
+        except (TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Include the total number of results, estimated for "
+                    "large result sets."
+                ),
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+    def _seek_filter(self, ordering, position):
+        """Build filter selecting rows after ``position`` in ``ordering``
+
+        When every column sorts the same way this is the row comparison
+        ``(a, b, c) > (x, y, z)``, ``<`` if they are descending. Mixed
+        directions expand to
+        ``a > x OR (a = x AND b < y) OR (a = x AND b = y AND c > z)``,
+        with a redundant ``a >= x`` so the first column still bounds an
+        index range.
+        """
+        names = [field.lstrip("-") for field in ordering]
+        descending = [field.startswith("-") for field in ordering]
+        if len(set(descending)) == 1:
+            return RowComparison(
+                [F(name) for name in names],
+                "<" if descending[0] else ">",
+                [Value(value) for value in position],
+            )
+
+        conditions = []
+        for index, name in enumerate(names):
+            lookup = "lt" if descending[index] else "gt"
+            equal = dict(zip(names[:index], position[:index]))
+            conditions.append(
+                Q(**equal, **{f"{name}__{lookup}": position[index]})
+            )
+        leading = "lte" if descending[0] else "gte"
+
+        return Q(**{f"{names[0]}__{leading}": position[0]}) & reduce(
+            or_, conditions
+        )
+
+    def _model_fields(self):
+        """Return names of ordering columns that are model fields"""
+        names = []
+        for field in self.ordering:
+            try:
+                self.model._meta.get_field(field.lstrip("-"))
+            except FieldDoesNotExist:
+                continue
+            names.append(field.lstrip("-"))
+
+        return names
+
+    def _from_cursor_value(self, name, value):
+        """Convert JSON value from cursor back into python value"""
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations are stored using plain JSON types
+            field = self.annotations[name].output_field
+
+        return field.to_python(value)
+
+    @staticmethod
+    def _is_cursor_value(value):
+        """Return True if value may be a position written by encode_cursor"""
+        return value is None or (
+            isinstance(value, (int, float, str))
+            and not isinstance(value, bool)
+        )
+
+    @staticmethod
+    def _to_cursor_value(value):
+        if isinstance(value, (int, float, str)) or value is None:
+            return value
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+
+        return str(value)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else "-" + field
@@ -1,17 +1,64 @@
 """
 Recipe's Serializer
 """
+from functools import lru_cache
+
 from core.models import Recipe
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Allow limiting serialized fields with ?fields= and ?exclude="""
+    fields_query_param = "fields"
+    exclude_query_param = "exclude"
+
+    def __init__(self, *args, **kwargs):
+        # Names of fields to keep, every declared field if None
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def fields_from_request(cls, request):
+        """Return names of fields selected by request, or None for all"""
+        selected = cls._parse_field_names(request, cls.fields_query_param)
+        excluded = cls._parse_field_names(request, cls.exclude_query_param)
+        if selected is None and excluded is None:
+            return None
+
+        fields = selected or list(cls.Meta.fields)
+        return [name for name in fields if name not in (excluded or [])]
+
+    @classmethod
+    def _parse_field_names(cls, request, query_param):
+        value = request.query_params.get(query_param)
+        if value is None:
+            return None
+
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in names if name not in cls.Meta.fields]
+        if unknown:
+            raise serializers.ValidationError({
+                query_param: (
+                    f"Unknown fields {', '.join(unknown)}. Must be any of: "
+                    f"{', '.join(cls.Meta.fields)}"
+                )
+            })
+
+        return names
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Recipe"""
 
     class Meta:
         model = Recipe
-        fields = ["id", "title", "time_needed", "cost", "link"]
-        read_only_fields = ["id"]
+        fields = ["id", "title", "time_needed", "cost", "link", "version"]
+        read_only_fields = ["id", "version"]
 
 
 # Inherit functionality from RecipeSerializer
@@ -21,3 +68,83 @@ class RecipeDetailSerializer(RecipeSerializer):
     # Inherit Meta used in Base RecipeSerializer
     class Meta(RecipeSerializer.Meta):
         fields = RecipeSerializer.Meta.fields + ["description"]
+
+
+class RowSerializer:
+    """Read only serializer for rows of ``values_list()`` querysets
+
+    Renders the same data as ``serializer_class`` but skips building model
+    instances. Each field is converted by a function compiled once from
+    the serializer field. Fields whose database value already is their
+    representation, like strings and integers, are copied unchanged.
+    """
+    # Fields whose to_representation() is a no-op for database values
+    passthrough_fields = (
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.BooleanField,
+    )
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class(fields=fields)
+        model = serializer_class.Meta.model
+        self.names = []
+        self.sources = []
+        self.converters = []
+
+        for field in serializer._readable_fields:
+            try:
+                model._meta.get_field(field.source)
+                if isinstance(field, serializers.RelatedField):
+                    raise FieldDoesNotExist
+            except FieldDoesNotExist:
+                raise ValueError(
+                    f"{field.field_name} is not a model field and cannot be "
+                    "read from values_list() rows"
+                )
+
+            self.names.append(field.field_name)
+            self.sources.append(field.source)
+            self.converters.append(self._compile(field))
+
+    def _compile(self, field):
+        """Return function converting a column value into representation"""
+        if isinstance(field, self.passthrough_fields):
+            return None
+
+        to_representation = field.to_representation
+
+        def convert(value):
+            return None if value is None else to_representation(value)
+
+        return convert
+
+    def columns(self, *extra):
+        """Return columns to select, the rendered ones first"""
+        columns = list(self.sources)
+        columns.extend(name for name in extra if name not in columns)
+
+        return columns
+
+    def to_representation(self, row):
+        """Return representation of one row selected with columns()"""
+        return {
+            name: value if convert is None else convert(value)
+            for name, convert, value in zip(
+                self.names, self.converters, row
+            )
+        }
+
+    def many(self, rows):
+        """Return representations of many rows"""
+        to_representation = self.to_representation
+
+        return [to_representation(row) for row in rows]
+
+
+@lru_cache(maxsize=64)
+def get_row_serializer(serializer_class, fields=None):
+    """Return compiled RowSerializer, shared between requests"""
+    return RowSerializer(
+        serializer_class, list(fields) if fields is not None else None
+    )
@@ -0,0 +1,14 @@
+"""
+Signal handlers for Recipe
+"""
+from core.models import Recipe
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from recipe import cache
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_owner_cache(sender, instance, **kwargs):
+    """Drop cached recipe listings of owner whenever a recipe changes"""
+    cache.invalidate_user_recipes(instance.user_id)
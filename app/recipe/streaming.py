@@ -0,0 +1,186 @@
+"""
+Streaming responses for large Recipe listings
+"""
+import csv
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_QUERY_PARAM = "stream"
+JSON = "json"
+NDJSON = "ndjson"
+CSV = "csv"
+CONTENT_TYPES = {
+    JSON: "application/json",
+    NDJSON: "application/x-ndjson",
+}
+# ?format= is taken by DRF to pick a renderer
+EXPORT_QUERY_PARAM = "type"
+EXPORT_CONTENT_TYPES = {
+    NDJSON: "application/x-ndjson",
+    CSV: "text/csv; charset=utf-8",
+}
+AFTER_ID_QUERY_PARAM = "after_id"
+
+
+def get_stream_format(request):
+    """Return streaming format requested by the client or None"""
+    stream_format = request.query_params.get(STREAM_QUERY_PARAM)
+    if not stream_format:
+        return None
+
+    if stream_format not in CONTENT_TYPES:
+        raise ValidationError({
+            STREAM_QUERY_PARAM: f"Must be one of: {', '.join(CONTENT_TYPES)}"
+        })
+
+    return stream_format
+
+
+def get_export_format(request):
+    """Return export format requested by the client, NDJSON by default"""
+    export_format = request.query_params.get(EXPORT_QUERY_PARAM, NDJSON)
+    if export_format not in EXPORT_CONTENT_TYPES:
+        raise ValidationError({
+            EXPORT_QUERY_PARAM: (
+                f"Must be one of: {', '.join(EXPORT_CONTENT_TYPES)}"
+            )
+        })
+
+    return export_format
+
+
+def get_after_id(request):
+    """Return id after which a resumed export starts, 0 to start over"""
+    value = request.query_params.get(AFTER_ID_QUERY_PARAM, "0")
+    try:
+        after_id = int(value)
+    except ValueError:
+        after_id = -1
+
+    if after_id < 0:
+        raise ValidationError({
+            AFTER_ID_QUERY_PARAM: "Must be a recipe id"
+        })
+
+    return after_id
+
+
+def get_encoder():
+    """Return JSON encoder producing the same output as JSONRenderer"""
+    return JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_representations(serializer, queryset, chunk_size):
+    """Serialize rows one by one while reading them with a DB cursor"""
+    # Server side cursor keeps at most chunk_size rows in memory
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(instance)
+
+
+def iter_rows(row_serializer, queryset, chunk_size):
+    """Convert values_list() rows one by one while reading them"""
+    to_representation = row_serializer.to_representation
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield to_representation(row)
+
+
+def iter_json_array(representations, chunk_size):
+    """Encode representations as one JSON array, yielding in chunks"""
+    encoder = get_encoder()
+    buffer = ["["]
+    separator = ""
+
+    for index, data in enumerate(representations, start=1):
+        buffer.append(separator + encoder.encode(data))
+        separator = ","
+        if index % chunk_size == 0:
+            yield "".join(buffer)
+            buffer = []
+
+    buffer.append("]")
+    yield "".join(buffer)
+
+
+def iter_ndjson(representations, chunk_size):
+    """Encode representations as newline delimited JSON"""
+    encoder = get_encoder()
+    buffer = []
+
+    for index, data in enumerate(representations, start=1):
+        buffer.append(encoder.encode(data) + "\n")
+        if index % chunk_size == 0:
+            yield "".join(buffer)
+            buffer = []
+
+    if buffer:
+        yield "".join(buffer)
+
+
+class Echo:
+    """File-like object returning what is written, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(names, representations, chunk_size):
+    """Encode representations as CSV rows with a header, in chunks"""
+    writer = csv.writer(Echo())
+    buffer = [writer.writerow(names)]
+
+    for index, data in enumerate(representations, start=1):
+        buffer.append(writer.writerow([data[name] for name in names]))
+        if index % chunk_size == 0:
+            yield "".join(buffer)
+            buffer = []
+
+    if buffer:
+        yield "".join(buffer)
+
+
+def streaming_response(serializer, queryset, stream_format, next_link=None):
+    """Return response streaming every row of queryset
+
+    ``next_link`` pointing to the rest of the listing goes into a ``Link``
+    header, as the body is already on its way when the last row is read.
+    """
+    chunk_size = settings.RECIPE_STREAM_CHUNK_SIZE
+    representations = iter_representations(serializer, queryset, chunk_size)
+
+    if stream_format == NDJSON:
+        content = iter_ndjson(representations, chunk_size)
+    else:
+        content = iter_json_array(representations, chunk_size)
+
+    response = StreamingHttpResponse(
+        content,
+        content_type=CONTENT_TYPES[stream_format],
+    )
+    if next_link is not None:
+        response["Link"] = f'<{next_link}>; rel="next"'
+
+    return response
+
+
+def export_response(row_serializer, queryset, export_format, filename):
+    """Return attachment streaming rows of values_list() queryset"""
+    chunk_size = settings.RECIPE_STREAM_CHUNK_SIZE
+    representations = iter_rows(row_serializer, queryset, chunk_size)
+
+    if export_format == CSV:
+        content = iter_csv(row_serializer.names, representations, chunk_size)
+    else:
+        content = iter_ndjson(representations, chunk_size)
+
+    response = StreamingHttpResponse(
+        content,
+        content_type=EXPORT_CONTENT_TYPES[export_format],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+
+    return response
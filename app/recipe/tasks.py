@@ -0,0 +1,45 @@
+"""
+Background tasks for Recipe, run by the run_worker command
+"""
+import os
+
+from core import jobs
+from core.jobs import task
+from recipe import importing
+
+
+@task("recipe.import_recipes")
+def import_recipes(user_id, path, import_format, remove=False):
+    """Import recipes of user from a file readable by the worker
+
+    With remove, the file is deleted once read, as done for uploads.
+    """
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            result = importing.RecipeImporter(user_id).run(
+                importing.iter_records(stream, import_format)
+            )
+    finally:
+        if remove:
+            os.remove(path)
+
+    return result.as_dict()
+
+
+def enqueue_import(user, path, import_format, remove=False):
+    """Queue a job importing the file at path for user
+
+    Batches loaded before a failure are kept, so the job is attempted
+    once instead of importing them again.
+    """
+    return jobs.enqueue(
+        "recipe.import_recipes",
+        {
+            "user_id": user.id,
+            "path": os.path.abspath(path),
+            "import_format": import_format,
+            "remove": remove,
+        },
+        user=user,
+        max_attempts=1,
+    )
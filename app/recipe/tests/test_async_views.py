@@ -0,0 +1,173 @@
+"""
+Tests for async views of Recipe API
+"""
+
+from asgiref.sync import sync_to_async
+from core.models import Recipe
+from core.tests.helpers import create_recipe
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+ASYNC_RECIPE_URL = reverse("recipe:async-recipe-list")
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def async_recipe_detail_url(recipe_id):
+    """Create dynamic async recipe detail URL"""
+    return reverse("recipe:async-recipe-detail", args=[recipe_id])
+
+
+class AsyncRecipeAPITest(TestCase):
+    """Test async recipe endpoints"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="test2@example.com",
+            password="testpassword",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.recipe = create_recipe(self.user)
+        self.url = async_recipe_detail_url(self.recipe.id)
+
+    def auth(self):
+        # AsyncClient of Django 3.2 takes header names, not META keys
+        return {"Authorization": f"Token {self.token.key}"}
+
+    async def test_list_matches_sync_view(self):
+        """Test async list renders the same page as the viewset"""
+        await sync_to_async(create_recipe)(self.other_user, title="Other")
+
+        res = await self.async_client.get(ASYNC_RECIPE_URL + "?page_size=1")
+        expected = await sync_to_async(self.client.get)(
+            RECIPE_URL, {"page_size": 1}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["results"], expected.json()["results"])
+        self.assertIn("cursor=", res.json()["next"])
+
+    async def test_list_not_modified(self):
+        """Test async list honours If-None-Match"""
+        etag = (await self.async_client.get(ASYNC_RECIPE_URL))["ETag"]
+
+        res = await self.async_client.get(
+            ASYNC_RECIPE_URL, **{"If-None-Match": etag}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_retrieve(self):
+        """Test retrieving a recipe"""
+        res = await self.async_client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["title"], "Sample Recipe")
+        self.assertIn("ETag", res)
+
+    async def test_retrieve_missing(self):
+        """Test missing recipes return 404"""
+        res = await self.async_client.get(async_recipe_detail_url(0))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_create(self):
+        """Test creating a recipe with token authentication"""
+        res = await self.async_client.post(
+            ASYNC_RECIPE_URL,
+            {"title": "Async", "time_needed": 5, "cost": "1.50"},
+            content_type="application/json",
+            **self.auth()
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = await sync_to_async(Recipe.objects.get)(id=res.json()["id"])
+        self.assertEqual(recipe.user_id, self.user.id)
+
+    async def test_create_anonymous(self):
+        """Test anonymous users cannot create recipes"""
+        res = await self.async_client.post(
+            ASYNC_RECIPE_URL,
+            {"title": "Async", "cost": "1.50"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_create_invalid(self):
+        """Test invalid recipes are rejected with field errors"""
+        res = await self.async_client.post(
+            ASYNC_RECIPE_URL,
+            {"title": "Async"},
+            content_type="application/json",
+            **self.auth()
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cost", res.json())
+
+    async def test_invalid_token(self):
+        """Test invalid tokens are rejected"""
+        res = await self.async_client.get(
+            ASYNC_RECIPE_URL, Authorization="Token invalid"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_partial_update(self):
+        """Test updating a recipe checks If-Match"""
+        etag = (await self.async_client.get(self.url))["ETag"]
+
+        res = await self.async_client.patch(
+            self.url,
+            {"title": "Updated"},
+            content_type="application/json",
+            **{"If-Match": etag},
+            **self.auth()
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["title"], "Updated")
+
+        res = await self.async_client.patch(
+            self.url,
+            {"title": "Stale"},
+            content_type="application/json",
+            **{"If-Match": etag},
+            **self.auth()
+        )
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    async def test_update_other_user(self):
+        """Test users cannot update recipes of others"""
+        recipe = await sync_to_async(create_recipe)(self.other_user)
+
+        res = await self.async_client.patch(
+            async_recipe_detail_url(recipe.id),
+            {"title": "Updated"},
+            content_type="application/json",
+            **self.auth()
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_delete(self):
+        """Test deleting a recipe"""
+        res = await self.async_client.delete(self.url, **self.auth())
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        exists = await sync_to_async(
+            Recipe.objects.filter(id=self.recipe.id).exists
+        )()
+        self.assertFalse(exists)
+
+    async def test_method_not_allowed(self):
+        """Test unsupported methods are rejected"""
+        res = await self.async_client.delete(ASYNC_RECIPE_URL, **self.auth())
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,143 @@
+"""
+Tests for query plans of Recipe API queries
+"""
+from decimal import Decimal
+from unittest import skipUnless
+
+from core.models import Recipe
+from core.tests.helpers import create_recipes, create_users, explain
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+
+
+def capture_recipe_queries(client, url, params=None):
+    """Request url and return SQL of SELECT queries made on core_recipe"""
+    with CaptureQueriesContext(connection) as context:
+        client.get(url, params)
+
+    return [
+        query["sql"] for query in context.captured_queries
+        if query["sql"].startswith("SELECT")
+        and 'FROM "core_recipe"' in query["sql"]
+    ]
+
+
+@skipUnless(connection.vendor == "postgresql", "Requires PostgreSQL")
+@override_settings(API_PAGE_SIZE=2)
+class RecipeQueryPlanTest(TestCase):
+    """Test hot recipe queries are answered using an index"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for index in range(5):
+            Recipe.objects.create(
+                user=self.user,
+                title=f"Recipe {index}",
+                cost=Decimal("5.00"),
+            )
+        # Recipes of other users, so that filtering by user is selective
+        create_recipes(create_users(3, prefix="other"), 300)
+        with connection.cursor() as cursor:
+            # Plan with statistics of these rows, not with whatever
+            # autoanalyze last gathered while other tests ran
+            cursor.execute(f"ANALYZE {Recipe._meta.db_table}")
+
+    def assertUsesIndex(self, sql, index_name, sort=True):
+        """Assert query plan of sql scans the given index"""
+        plan = explain(sql, sort)
+
+        self.assertNotIn("Seq Scan", plan)
+        self.assertIn(index_name, plan)
+
+    def test_list_first_page(self):
+        """Test first page of recipe list uses created_at index"""
+        sql, = capture_recipe_queries(self.client, RECIPE_URL)
+
+        self.assertUsesIndex(sql, "recipe_created_id_idx")
+
+    def test_list_next_page(self):
+        """Test following a cursor still uses created_at index"""
+        res = self.client.get(RECIPE_URL)
+        sql, = capture_recipe_queries(self.client, res.data["next"])
+
+        self.assertUsesIndex(sql, "recipe_created_id_idx")
+        # The cursor bounds the index range instead of filtering rows
+        self.assertRegex(
+            explain(sql), r"Index Cond: \(ROW\(created_at, id\) > ROW\("
+        )
+
+    def test_user_recipes(self):
+        """Test user specific recipes use the (user, id) index"""
+        sql, = capture_recipe_queries(self.client, USER_SPECIFIC_RECIPE_URL)
+
+        self.assertUsesIndex(sql, "recipe_user_id_idx", sort=False)
+
+    def test_user_recipes_next_page(self):
+        """Test following a cursor of user recipes uses (user, id) index"""
+        res = self.client.get(USER_SPECIFIC_RECIPE_URL)
+        sql, = capture_recipe_queries(self.client, res.data["next"])
+
+        self.assertUsesIndex(sql, "recipe_user_id_idx", sort=False)
+
+    def test_user_recipes_by_last_modified(self):
+        """Test user recipes ordered by last modified use an index"""
+        queryset = Recipe.objects.filter(
+            user=self.user
+        ).order_by("-last_modified")[:10]
+
+        self.assertUsesIndex(
+            str(queryset.query), "recipe_user_modified_idx", sort=False
+        )
+
+    def test_search(self):
+        """Test full text search uses the GIN index"""
+        sql, = capture_recipe_queries(
+            self.client, RECIPE_URL, {"search": "recipe"}
+        )
+
+        self.assertUsesIndex(sql, "recipe_search_vector_idx")
+
+    def test_cost_and_time_needed_range(self):
+        """Test range filter ordered by cost uses the cost index"""
+        sql, = capture_recipe_queries(self.client, RECIPE_URL, {
+            "cost_max": "10", "time_needed_max": 30, "ordering": "cost"
+        })
+
+        self.assertUsesIndex(sql, "recipe_cost_id_idx")
+
+    def test_time_needed_range(self):
+        """Test range filter on time needed uses the time needed index"""
+        sql, = capture_recipe_queries(self.client, RECIPE_URL, {
+            "time_needed_max": 30, "ordering": "-time_needed"
+        })
+
+        self.assertUsesIndex(sql, "recipe_time_needed_id_idx")
+
+    def test_order_by_last_modified(self):
+        """Test ordering by last modified uses the last modified index"""
+        sql, = capture_recipe_queries(
+            self.client, RECIPE_URL, {"ordering": "-last_modified"}
+        )
+
+        self.assertUsesIndex(sql, "recipe_modified_id_idx")
+
+    def test_modified_window(self):
+        """Test filtering a modified window uses the last modified index"""
+        sql, = capture_recipe_queries(self.client, RECIPE_URL, {
+            "modified_after": "2023-01-01T00:00:00Z",
+            "ordering": "last_modified",
+        })
+
+        self.assertUsesIndex(sql, "recipe_modified_id_idx")
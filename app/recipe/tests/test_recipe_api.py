@@ -6,23 +6,20 @@ from datetime import timedelta
 from decimal import Decimal
 
 from core.models import Recipe
+from core.tests.helpers import recipe_detail_url
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
 from recipe.serializers import RecipeDetailSerializer, RecipeSerializer
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
 RECIPE_URL = reverse("recipe:recipe-list")
 USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
 
 
-def recipe_detail_url(recipe_id):
-    """Create dynamic recipe detail URL"""
-    return reverse("recipe:recipe-detail", args=[recipe_id])
-
-
 def create_recipe(user, **params):
     """Create and return a recipe for testing"""
     default_recipe = {
@@ -145,7 +142,7 @@ class PrivateRecipeAPITest(TestCase):
         recipes = Recipe.objects.all().order_by("id")
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_retrieving_user_recipes(self):
         """Test retrieving specific user's recipes"""
@@ -166,7 +163,7 @@ class PrivateRecipeAPITest(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_retrieving_recipe_details(self):
         """Test retrieving specific recipe's details"""
@@ -287,6 +284,23 @@ class PrivateRecipeAPITest(TestCase):
         recipe.refresh_from_db()
         self.assertEqual(recipe.user, self.user)
 
+    def test_token_authentication(self):
+        """Test recipes can be created and edited with a token"""
+        token = Token.objects.create(user=self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        res = client.post(RECIPE_URL, {
+            "title": "Token recipe", "time_needed": 5, "cost": "1.00",
+        })
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = client.patch(
+            recipe_detail_url(res.data["id"]), {"title": "Edited"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Recipe.objects.get().title, "Edited")
+
     def test_delete_recipe(self):
         """Test successfully delete recipes"""
         recipe = create_recipe(self.user)
@@ -0,0 +1,289 @@
+"""
+Tests for bulk Recipe API
+"""
+from decimal import Decimal
+from unittest import mock
+
+from core.models import Recipe
+from core.tests.helpers import LOCMEM_CACHES, create_recipe
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipe.views import RecipeViewSets
+from rest_framework import status
+from rest_framework.test import APIClient
+
+BULK_RECIPE_URL = reverse("recipe:recipe-bulk-create")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+
+
+def recipe_payload(index):
+    return {
+        "title": f"Recipe {index}",
+        "time_needed": index,
+        "cost": "2.50",
+        "description": "Bulk recipe",
+    }
+
+
+class PublicBulkRecipeAPITest(TestCase):
+    """Test bulk recipe API without authentication"""
+
+    def test_authentication_required(self):
+        """Test bulk create requires authentication"""
+        res = APIClient().post(
+            BULK_RECIPE_URL, [recipe_payload(1)], format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateBulkRecipeAPITest(TestCase):
+    """Test bulk recipe API with authentication"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="test2@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create(self):
+        """Test creating many recipes with a constant number of queries"""
+        payload = [recipe_payload(index) for index in range(50)]
+
+        with self.assertNumQueries(3):
+            res = self.client.post(BULK_RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 50)
+        recipes = Recipe.objects.filter(user=self.user).order_by("id")
+        self.assertEqual(
+            [recipe.title for recipe in recipes],
+            [item["title"] for item in payload],
+        )
+        self.assertEqual([item["id"] for item in res.data],
+                         [recipe.id for recipe in recipes])
+        self.assertIsNotNone(recipes[0].last_modified)
+
+    def test_bulk_create_invalid_item(self):
+        """Test one invalid item rejects the whole batch"""
+        payload = [recipe_payload(1), {"title": "No cost"}]
+
+        res = self.client.post(BULK_RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("cost", res.data[1])
+        self.assertFalse(Recipe.objects.exists())
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_create_limit(self):
+        """Test batches larger than the limit are rejected"""
+        payload = [recipe_payload(index) for index in range(3)]
+
+        res = self.client.post(BULK_RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_bulk_create_invalidates_cache(self):
+        """Test bulk created recipes show up in cached user recipes"""
+        self.client.get(USER_SPECIFIC_RECIPE_URL)
+        self.client.post(BULK_RECIPE_URL, [recipe_payload(1)], format="json")
+
+        res = self.client.get(USER_SPECIFIC_RECIPE_URL)
+
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_bulk_update(self):
+        """Test partially updating many recipes"""
+        recipes = [create_recipe(self.user) for _ in range(3)]
+        payload = [
+            {
+                "id": recipe.id,
+                "version": recipe.version,
+                "title": f"Updated {recipe.id}",
+            }
+            for recipe in recipes
+        ]
+
+        res = self.client.patch(BULK_RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["version"] for item in res.data], [2, 2, 2])
+        for recipe in recipes:
+            original_modified = recipe.last_modified
+            recipe.refresh_from_db()
+            self.assertEqual(recipe.title, f"Updated {recipe.id}")
+            self.assertEqual(recipe.cost, Decimal("5.99"))
+            self.assertGreater(recipe.last_modified, original_modified)
+
+    def test_bulk_update_errors(self):
+        """Test missing and other users' recipes are reported per item"""
+        own_recipe = create_recipe(self.user)
+        other_recipe = create_recipe(self.other_user)
+        payload = [
+            {"id": own_recipe.id, "version": 1, "title": "Updated"},
+            {"id": other_recipe.id, "version": 1, "title": "Updated"},
+            {"id": other_recipe.id + 100, "version": 1, "title": "Updated"},
+            {"id": own_recipe.id, "version": 1, "cost": "not a number"},
+        ]
+
+        res = self.client.patch(BULK_RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("id", res.data[1])
+        self.assertIn("id", res.data[2])
+        self.assertIn("id", res.data[3])
+        own_recipe.refresh_from_db()
+        self.assertEqual(own_recipe.title, "Sample Recipe")
+
+    def test_bulk_update_version_required(self):
+        """Test items without the version they were read at are rejected"""
+        recipe = create_recipe(self.user)
+        payload = [
+            {"id": recipe.id, "title": "Updated"},
+            {"id": recipe.id, "version": "1", "title": "Updated"},
+        ]
+
+        for item in payload:
+            res = self.client.patch(BULK_RECIPE_URL, [item], format="json")
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("version", res.data[0])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Sample Recipe")
+
+    def test_bulk_update_stale_version(self):
+        """Test recipes modified since they were read reject the request"""
+        recipes = [create_recipe(self.user) for _ in range(2)]
+        payload = [
+            {"id": recipe.id, "version": recipe.version, "title": "Updated"}
+            for recipe in recipes
+        ]
+        recipes[1].title = "Other editor"
+        recipes[1].save()
+
+        res = self.client.patch(BULK_RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("version", res.data[1])
+        titles = Recipe.objects.order_by("id").values_list("title", flat=True)
+        self.assertEqual(list(titles), ["Sample Recipe", "Other editor"])
+
+    @override_settings(RECIPE_BULK_BATCH_SIZE=2)
+    def test_bulk_update_changed_after_validation(self):
+        """Test a recipe changed while the request runs rolls back all"""
+        recipes = [create_recipe(self.user) for _ in range(3)]
+        payload = [
+            {"id": recipe.id, "version": recipe.version, "title": "Updated"}
+            for recipe in recipes
+        ]
+        validate = RecipeViewSets.validate_bulk_update
+
+        def validate_then_edit(view, items, instances):
+            serializers_list = validate(view, items, instances)
+            Recipe.objects.filter(id=recipes[2].id).update(
+                title="Other editor", version=F("version") + 1
+            )
+            return serializers_list
+
+        with mock.patch.object(
+            RecipeViewSets, "validate_bulk_update", validate_then_edit
+        ):
+            res = self.client.patch(BULK_RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        rows = Recipe.objects.order_by("id").values_list("title", "version")
+        self.assertEqual(list(rows), [
+            ("Sample Recipe", 1), ("Sample Recipe", 1), ("Other editor", 2),
+        ])
+
+    def test_bulk_update_invalid_ids(self):
+        """Test ids that are not integers are rejected per item"""
+        recipe = create_recipe(self.user)
+        payload = [
+            {"id": [recipe.id], "title": "Updated"},
+            {"id": {"id": recipe.id}, "title": "Updated"},
+            {"id": True, "title": "Updated"},
+            {"title": "Updated"},
+        ]
+
+        res = self.client.patch(BULK_RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        for error in res.data:
+            self.assertIn("id", error)
+
+    def test_bulk_delete_invalid_ids(self):
+        """Test ids that are not integers are rejected"""
+        recipe = create_recipe(self.user)
+
+        res = self.client.delete(
+            BULK_RECIPE_URL, {"ids": [[recipe.id], recipe.id]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("id", res.data["ids"][0])
+        self.assertEqual(res.data["ids"][1], {})
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_bulk_delete(self):
+        """Test deleting many recipes with a single DELETE"""
+        recipes = [create_recipe(self.user) for _ in range(3)]
+        ids = [recipe.id for recipe in recipes[:2]]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.delete(
+                BULK_RECIPE_URL, {"ids": ids}, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        deletes = [
+            query["sql"] for query in queries
+            if query["sql"].startswith("DELETE")
+        ]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(
+            list(Recipe.objects.values_list("id", flat=True)),
+            [recipes[2].id],
+        )
+
+    def test_bulk_delete_other_users_recipe(self):
+        """Test deleting other users' recipes rejects the whole batch"""
+        own_recipe = create_recipe(self.user)
+        other_recipe = create_recipe(self.other_user)
+
+        res = self.client.delete(
+            BULK_RECIPE_URL,
+            {"ids": [own_recipe.id, other_recipe.id]},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Recipe.objects.count(), 2)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_bulk_delete_invalidates_cache(self):
+        """Test bulk deleted recipes disappear from cached user recipes"""
+        recipe = create_recipe(self.user)
+        self.client.get(USER_SPECIFIC_RECIPE_URL)
+        self.client.delete(
+            BULK_RECIPE_URL, {"ids": [recipe.id]}, format="json"
+        )
+
+        res = self.client.get(USER_SPECIFIC_RECIPE_URL)
+
+        self.assertEqual(res.data["results"], [])
@@ -0,0 +1,175 @@
+"""
+Tests for caching of user specific recipes
+"""
+
+from core.tests.helpers import (
+    LOCMEM_CACHES,
+    create_recipe,
+    recipe_detail_url,
+)
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+
+
+def recipe_titles(res):
+    return [recipe["title"] for recipe in res.data["results"]]
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UserRecipesCacheTest(TestCase):
+    """Test caching and invalidation of fetch_user_recipes"""
+
+    def setUp(self):
+        caches["default"].clear()
+        caches["local"].clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipe = create_recipe(self.user, title="First")
+
+    def test_cached_response(self):
+        """Test repeated request is served without database queries"""
+        first = self.client.get(USER_SPECIFIC_RECIPE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(USER_SPECIFIC_RECIPE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, first.data)
+        self.assertEqual(res["ETag"], first["ETag"])
+
+    def test_cached_not_modified(self):
+        """Test conditional request is answered from cache"""
+        etag = self.client.get(USER_SPECIFIC_RECIPE_URL)["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                USER_SPECIFIC_RECIPE_URL, HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_shared_tier_fills_local_tier(self):
+        """Test entry found only in shared tier is served"""
+        self.client.get(USER_SPECIFIC_RECIPE_URL)
+        caches["local"].clear()
+
+        with self.assertNumQueries(0):
+            res = self.client.get(USER_SPECIFIC_RECIPE_URL)
+
+        self.assertEqual(recipe_titles(res), ["First"])
+
+    def test_invalidated_by_create(self):
+        """Test creating a recipe invalidates cached recipes"""
+        self.client.get(USER_SPECIFIC_RECIPE_URL)
+        self.client.post(RECIPE_URL, {
+            "title": "Second", "time_needed": 5, "cost": "1.00"
+        })
+
+        res = self.client.get(USER_SPECIFIC_RECIPE_URL)
+
+        self.assertEqual(recipe_titles(res), ["First", "Second"])
+
+    def test_invalidated_by_update(self):
+        """Test updating a recipe invalidates cached recipes"""
+        self.client.get(USER_SPECIFIC_RECIPE_URL)
+        self.client.patch(
+            recipe_detail_url(self.recipe.id), {"title": "Updated"}
+        )
+
+        res = self.client.get(USER_SPECIFIC_RECIPE_URL)
+
+        self.assertEqual(recipe_titles(res), ["Updated"])
+
+    def test_invalidated_by_delete(self):
+        """Test deleting a recipe invalidates cached recipes"""
+        self.client.get(USER_SPECIFIC_RECIPE_URL)
+        self.client.delete(recipe_detail_url(self.recipe.id))
+
+        res = self.client.get(USER_SPECIFIC_RECIPE_URL)
+
+        self.assertEqual(recipe_titles(res), [])
+
+    def test_cache_per_user(self):
+        """Test users do not see each other's cached recipes"""
+        self.client.get(USER_SPECIFIC_RECIPE_URL)
+        other_user = get_user_model().objects.create_user(
+            email="test2@example.com",
+            password="testpassword",
+        )
+        create_recipe(other_user, title="Other")
+        client = APIClient()
+        client.force_authenticate(user=other_user)
+
+        res = client.get(USER_SPECIFIC_RECIPE_URL)
+
+        self.assertEqual(recipe_titles(res), ["Other"])
+
+
+class AdminRecipeCacheTest(TestCase):
+    """Test admin edits invalidate cached recipes"""
+
+    def setUp(self):
+        caches["default"].clear()
+        caches["local"].clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.new_owner = get_user_model().objects.create_user(
+            email="test2@example.com",
+            password="testpassword",
+        )
+        admin_user = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="testpassword",
+        )
+        self.admin_client = APIClient()
+        self.admin_client.force_login(admin_user)
+        self.recipe = create_recipe(self.user, title="First")
+
+    def change_recipe(self, **params):
+        """Submit recipe change form in admin"""
+        data = {
+            "user": self.recipe.user_id,
+            "title": self.recipe.title,
+            "time_needed": self.recipe.time_needed,
+            "cost": self.recipe.cost,
+            "description": "",
+            "link": "",
+        }
+        data.update(params)
+        url = reverse("admin:core_recipe_change", args=[self.recipe.id])
+        res = self.admin_client.post(url, data)
+        self.assertEqual(res.status_code, status.HTTP_302_FOUND)
+
+    def fetch_titles(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return recipe_titles(client.get(USER_SPECIFIC_RECIPE_URL))
+
+    def test_admin_edit(self):
+        """Test editing recipe in admin invalidates owner's cache"""
+        self.fetch_titles(self.user)
+        self.change_recipe(title="Edited")
+
+        self.assertEqual(self.fetch_titles(self.user), ["Edited"])
+
+    def test_admin_transfer(self):
+        """Test changing owner in admin invalidates both users' caches"""
+        self.fetch_titles(self.user)
+        self.fetch_titles(self.new_owner)
+        self.change_recipe(user=self.new_owner.id)
+
+        self.assertEqual(self.fetch_titles(self.user), [])
+        self.assertEqual(self.fetch_titles(self.new_owner), ["First"])
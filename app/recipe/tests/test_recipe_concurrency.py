@@ -0,0 +1,126 @@
+"""
+Tests for single write updates and optimistic concurrency of Recipe API
+"""
+from decimal import Decimal
+from unittest import mock
+
+from core.models import Recipe
+from core.tests.helpers import create_recipe, recipe_detail_url
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+BULK_RECIPE_URL = reverse("recipe:recipe-bulk-create")
+
+
+class RecipeUpdateTest(TestCase):
+    """Test updates are written once and checked against If-Match"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipe = create_recipe(self.user)
+        self.url = recipe_detail_url(self.recipe.id)
+
+    def test_single_update_query(self):
+        """Test only changed fields are written, in one UPDATE"""
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.patch(self.url, {"title": "Updated"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        updates = [
+            query["sql"] for query in context.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title"', updates[0])
+        self.assertNotIn('"cost"', updates[0])
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, "Updated")
+        self.assertEqual(self.recipe.version, 2)
+
+    def test_update_returns_new_etag(self):
+        """Test response carries the ETag of the updated recipe"""
+        res = self.client.patch(self.url, {"title": "Updated"})
+
+        self.assertEqual(res["ETag"], self.client.get(self.url)["ETag"])
+
+    def test_if_match_current(self):
+        """Test update with the current ETag succeeds"""
+        etag = self.client.get(self.url)["ETag"]
+
+        res = self.client.patch(
+            self.url, {"title": "Updated"}, HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_if_match_stale(self):
+        """Test update with an outdated ETag is rejected with 412"""
+        etag = self.client.get(self.url)["ETag"]
+        self.client.patch(self.url, {"title": "First editor"})
+
+        res = self.client.put(self.url, {
+            "title": "Second editor",
+            "time_needed": 10,
+            "cost": "1.00",
+        }, HTTP_IF_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, "First editor")
+
+    def test_if_match_any(self):
+        """Test If-Match: * only requires the recipe to exist"""
+        res = self.client.patch(
+            self.url, {"title": "Updated"}, HTTP_IF_MATCH="*"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_concurrent_update(self):
+        """Test recipe changed between read and write is not overwritten"""
+        stale = Recipe.objects.get(id=self.recipe.id)
+        Recipe.objects.filter(id=self.recipe.id).update(
+            title="Other editor", version=F("version") + 1
+        )
+
+        with mock.patch(
+            "recipe.views.RecipeViewSets.get_object", return_value=stale
+        ):
+            res = self.client.patch(self.url, {"cost": "1.00"})
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, "Other editor")
+        self.assertEqual(self.recipe.cost, Decimal("5.99"))
+
+    def test_save_bumps_version(self):
+        """Test saving an existing recipe moves it to the next version"""
+        self.recipe.title = "Saved"
+        self.recipe.save(update_fields=["title"])
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.version, 2)
+
+    def test_bulk_update_bumps_version(self):
+        """Test bulk updates move recipes to their next version"""
+        res = self.client.patch(
+            BULK_RECIPE_URL,
+            [{"id": self.recipe.id, "version": 1, "title": "Bulk"}],
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.version, 2)
@@ -0,0 +1,147 @@
+"""
+Tests for conditional GET requests on Recipe API
+"""
+from datetime import timedelta
+
+from core.models import Recipe
+from core.tests.helpers import create_recipe, recipe_detail_url
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+
+
+class RecipeDetailConditionalTest(TestCase):
+    """Test ETag and Last-Modified on recipe details"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.recipe = create_recipe(self.user)
+        self.url = recipe_detail_url(self.recipe.id)
+
+    def test_validators_in_response(self):
+        """Test recipe details include ETag and Last-Modified"""
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", res)
+        self.assertEqual(
+            res["Last-Modified"],
+            http_date(self.recipe.last_modified.timestamp()),
+        )
+
+    def test_if_none_match_not_modified(self):
+        """Test matching ETag returns 304 with a single query"""
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        self.assertEqual(res.content, b"")
+
+    def test_if_none_match_after_update(self):
+        """Test ETag changes once the recipe is modified"""
+        etag = self.client.get(self.url)["ETag"]
+        Recipe.objects.filter(id=self.recipe.id).update(
+            last_modified=timezone.now() + timedelta(seconds=1)
+        )
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_if_modified_since(self):
+        """Test If-Modified-Since returns 304 until recipe changes"""
+        last_modified = self.client.get(self.url)["Last-Modified"]
+
+        res = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Recipe.objects.filter(id=self.recipe.id).update(
+            last_modified=timezone.now() + timedelta(seconds=5)
+        )
+        res = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_conditional_missing_recipe(self):
+        """Test conditional request for unknown recipe returns 404"""
+        res = self.client.get(
+            recipe_detail_url(self.recipe.id + 1),
+            HTTP_IF_NONE_MATCH='"abc"',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(API_PAGE_SIZE=2)
+class RecipeListConditionalTest(TestCase):
+    """Test collection ETags on recipe listings"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipes = [create_recipe(self.user) for _ in range(3)]
+
+    def test_list_not_modified(self):
+        """Test unchanged page of recipes returns 304"""
+        etag = self.client.get(RECIPE_URL)["ETag"]
+
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_modified_by_update(self):
+        """Test editing a recipe on the page changes the ETag"""
+        etag = self.client.get(RECIPE_URL)["ETag"]
+        Recipe.objects.filter(id=self.recipes[0].id).update(
+            last_modified=timezone.now() + timedelta(seconds=1)
+        )
+
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_modified_by_delete(self):
+        """Test deleting a recipe on the page changes the ETag"""
+        etag = self.client.get(RECIPE_URL)["ETag"]
+        self.recipes[1].delete()
+
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_differs_per_page(self):
+        """Test pages of the same collection have different ETags"""
+        first = self.client.get(RECIPE_URL)
+        second = self.client.get(first.data["next"])
+
+        self.assertNotEqual(first["ETag"], second["ETag"])
+
+    def test_user_recipes_not_modified(self):
+        """Test unchanged user recipes return 304 until a recipe is added"""
+        url = USER_SPECIFIC_RECIPE_URL + "?page_size=10"
+        etag = self.client.get(url)["ETag"]
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        create_recipe(self.user)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
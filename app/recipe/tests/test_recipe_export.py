@@ -0,0 +1,136 @@
+"""
+Tests for streaming export of user recipes
+"""
+import csv
+import io
+import json
+
+from core.tests.helpers import asgi_request, create_recipe, run_asgi
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe.serializers import RecipeDetailSerializer
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+EXPORT_URL = reverse("recipe:recipe-export")
+
+
+def read_content(response):
+    """Return body of streaming response as text"""
+    return b"".join(response.streaming_content).decode("utf-8")
+
+
+class PublicRecipeExportTest(TestCase):
+    """Test export without authentication"""
+
+    def test_authentication_required(self):
+        res = APIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(RECIPE_STREAM_CHUNK_SIZE=2)
+class RecipeExportTest(TestCase):
+    """Test export of the recipes of the authenticated user"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        other_user = get_user_model().objects.create_user(
+            email="test2@example.com",
+            password="testpassword",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {self.token.key}"
+        )
+        self.recipes = [
+            create_recipe(
+                self.user,
+                title=f"Recipe {index} é",
+                description=f'Line one\nLine "two", {index}',
+            )
+            for index in range(5)
+        ]
+        create_recipe(other_user, title="Other")
+
+    def expected_data(self, recipes):
+        """Return recipes rendered by the detail serializer"""
+        return json.loads(json.dumps(
+            RecipeDetailSerializer(recipes, many=True).data
+        ))
+
+    def test_export_ndjson(self):
+        """Test NDJSON export has one detailed recipe per line"""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertIn('filename="recipes.ndjson"', res["Content-Disposition"])
+        lines = read_content(res).splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            self.expected_data(self.recipes),
+        )
+
+    def test_export_csv(self):
+        """Test CSV export has a header and quotes multi-line values"""
+        res = self.client.get(EXPORT_URL, {"type": "csv"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.DictReader(io.StringIO(read_content(res))))
+        self.assertEqual(
+            rows,
+            [
+                {name: str(value) for name, value in recipe.items()}
+                for recipe in self.expected_data(self.recipes)
+            ],
+        )
+        self.assertEqual(rows[0]["description"], 'Line one\nLine "two", 0')
+
+    def test_export_asgi(self):
+        """Test export reads rows off the event loop under ASGI"""
+        res, = run_asgi(asgi_request(
+            EXPORT_URL,
+            query_string="type=csv",
+            headers={"Authorization": f"Token {self.token.key}"},
+        ))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(io.StringIO(res.content.decode("utf-8"))))
+        self.assertEqual(
+            [int(row["id"]) for row in rows],
+            [recipe.id for recipe in self.recipes],
+        )
+
+    def test_resume_after_id(self):
+        """Test export resumes after the last id received"""
+        res = self.client.get(EXPORT_URL, {"after_id": self.recipes[2].id})
+
+        lines = read_content(res).splitlines()
+        ids = [json.loads(line)["id"] for line in lines]
+        self.assertEqual(ids, [recipe.id for recipe in self.recipes[3:]])
+
+    def test_invalid_parameters(self):
+        """Test unknown types and ids are rejected"""
+        for params in [{"type": "xml"}, {"after_id": "x"}, {"after_id": -1}]:
+            res = self.client.get(EXPORT_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_server_side_cursor(self):
+        """Test rows are fetched in chunks while streaming"""
+        res = self.client.get(EXPORT_URL)
+
+        with self.assertNumQueries(1) as context:
+            read_content(res)
+
+        # Named cursors fetch chunk_size rows per round trip
+        self.assertIn('FROM "core_recipe"', context.captured_queries[0]["sql"])
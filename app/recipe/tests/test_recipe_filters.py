@@ -0,0 +1,161 @@
+"""
+Tests for filtering and ordering of Recipe API
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from core.models import Recipe
+from core.tests.helpers import create_recipe
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def result_ids(res):
+    return [recipe["id"] for recipe in res.data["results"]]
+
+
+class RecipeFilterTest(TestCase):
+    """Test filter query parameters of recipe listing"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="test2@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.quick_cheap = create_recipe(
+            self.user, time_needed=20, cost=Decimal("8.00")
+        )
+        self.quick_expensive = create_recipe(
+            self.user, time_needed=25, cost=Decimal("25.00")
+        )
+        self.slow_cheap = create_recipe(
+            self.other_user, time_needed=90, cost=Decimal("4.00")
+        )
+
+    def test_filter_cost_and_time_needed(self):
+        """Test filtering recipes under 30 minutes and under $10"""
+        res = self.client.get(
+            RECIPE_URL, {"time_needed_max": 30, "cost_max": "10"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(result_ids(res), [self.quick_cheap.id])
+
+    def test_filter_min_bounds(self):
+        """Test lower bounds are inclusive"""
+        res = self.client.get(
+            RECIPE_URL, {"time_needed_min": 25, "cost_min": "4.00"}
+        )
+
+        self.assertEqual(
+            result_ids(res), [self.quick_expensive.id, self.slow_cheap.id]
+        )
+
+    def test_filter_user(self):
+        """Test filtering recipes of a user"""
+        res = self.client.get(RECIPE_URL, {"user": self.other_user.id})
+
+        self.assertEqual(result_ids(res), [self.slow_cheap.id])
+
+    def test_filter_modified_window(self):
+        """Test filtering recipes modified within a time window"""
+        now = timezone.now()
+        Recipe.objects.filter(id=self.quick_cheap.id).update(
+            last_modified=now - timedelta(days=2)
+        )
+
+        res = self.client.get(RECIPE_URL, {
+            "modified_after": (now - timedelta(days=3)).isoformat(),
+            "modified_before": (now - timedelta(days=1)).isoformat(),
+        })
+
+        self.assertEqual(result_ids(res), [self.quick_cheap.id])
+
+    def test_filter_created_window(self):
+        """Test filtering recipes created after a point in time"""
+        res = self.client.get(RECIPE_URL, {
+            "created_after": self.slow_cheap.created_at.isoformat(),
+        })
+
+        self.assertEqual(result_ids(res), [self.slow_cheap.id])
+
+    def test_invalid_filter_value(self):
+        """Test malformed filter values are rejected"""
+        res = self.client.get(RECIPE_URL, {"cost_max": "cheap"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cost_max", res.data)
+
+    def test_invalid_range(self):
+        """Test ranges with lower bound above upper bound are rejected"""
+        res = self.client.get(
+            RECIPE_URL, {"time_needed_min": 50, "time_needed_max": 10}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(API_PAGE_SIZE=2)
+class RecipeOrderingTest(TestCase):
+    """Test ordering query parameter of recipe listing"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.recipes = [
+            create_recipe(self.user, cost=Decimal(cost))
+            for cost in ["3.00", "1.00", "2.00", "1.00"]
+        ]
+
+    def test_order_by_cost(self):
+        """Test ordering by cost pages through ties in id order"""
+        ids = []
+        url = RECIPE_URL + "?ordering=cost"
+        while url:
+            res = self.client.get(url)
+            ids.extend(result_ids(res))
+            url = res.data["next"]
+
+        self.assertEqual(ids, [
+            self.recipes[1].id,
+            self.recipes[3].id,
+            self.recipes[2].id,
+            self.recipes[0].id,
+        ])
+
+    def test_order_by_cost_descending(self):
+        """Test descending ordering"""
+        res = self.client.get(RECIPE_URL, {"ordering": "-cost"})
+
+        self.assertEqual(
+            result_ids(res), [self.recipes[0].id, self.recipes[2].id]
+        )
+
+    def test_invalid_ordering(self):
+        """Test ordering by a field outside the whitelist is rejected"""
+        res = self.client.get(RECIPE_URL, {"ordering": "description"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_bound_to_ordering(self):
+        """Test cursor of one ordering is rejected for another ordering"""
+        res = self.client.get(RECIPE_URL, {"ordering": "cost"})
+        next_url = res.data["next"].replace("ordering=cost", "ordering=-cost")
+
+        res = self.client.get(next_url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
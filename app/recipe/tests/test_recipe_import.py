@@ -0,0 +1,320 @@
+"""
+Tests for bulk import of recipes from CSV and NDJSON files
+"""
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+
+from core import jobs
+from core.models import Job, Recipe
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe import importing
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+IMPORT_URL = reverse("recipe:recipe-import")
+EXPORT_URL = reverse("recipe:recipe-export")
+
+CSV_FILE = (
+    "title,time_needed,cost,description,link\n"
+    'Soup,10,1.50,"Line one\nLine ""two""",\n'
+    ",5,1.00,,\n"
+    "Stew,,3.25,,http://example.com\n"
+    "Cake,x,1000.00,,\n"
+)
+NDJSON_FILE = (
+    '{"title": "Soup", "time_needed": 10, "cost": "1.50"}\n'
+    "\n"
+    "not json\n"
+    '{"title": "Stew", "cost": "3.25", "description": "Slow é"}\n'
+    '["Cake"]\n'
+)
+
+
+def job_detail_url(job_id):
+    return reverse("core:job-detail", args=[job_id])
+
+
+class RecipeImporterTests(TestCase):
+    """Test validation and loading of rows"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+
+    def run_import(self, content, import_format, **kwargs):
+        importer = importing.RecipeImporter(self.user.id, **kwargs)
+        return importer.run(
+            importing.iter_records(io.StringIO(content), import_format)
+        )
+
+    def test_import_csv(self):
+        """Test valid CSV rows are loaded and invalid ones reported"""
+        result = self.run_import(CSV_FILE, importing.CSV)
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(result.rejected, 2)
+        self.assertEqual([row for row, _ in result.errors], [2, 4])
+        self.assertIn("title", result.errors[0][1])
+        self.assertEqual(
+            set(result.errors[1][1]), {"time_needed", "cost"}
+        )
+        soup, stew = Recipe.objects.filter(user=self.user).order_by("id")
+        self.assertEqual(soup.description, 'Line one\nLine "two"')
+        self.assertEqual(soup.link, "")
+        self.assertEqual(soup.cost, Decimal("1.50"))
+        self.assertEqual(stew.time_needed, 0)
+        self.assertEqual(stew.link, "http://example.com")
+        self.assertEqual(stew.version, 1)
+        self.assertIsNotNone(stew.created_at)
+        self.assertIsNotNone(stew.search_vector)
+
+    def test_import_csv_short_rows(self):
+        """Test cells missing at the end of a row get default values"""
+        result = self.run_import(
+            "title,time_needed,cost,description,link\nSoup,10,1.50\n",
+            importing.CSV,
+        )
+
+        self.assertEqual(result.imported, 1)
+        soup = Recipe.objects.get(user=self.user)
+        self.assertEqual((soup.description, soup.link), ("", ""))
+
+    def test_import_ndjson(self):
+        """Test blank lines are skipped and bad JSON is rejected"""
+        result = self.run_import(NDJSON_FILE, importing.NDJSON)
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(result.rejected, 2)
+        self.assertEqual(
+            result.errors[0],
+            (2, {"non_field_errors": ["Invalid JSON"]})
+        )
+        self.assertEqual(result.errors[1][0], 4)
+        self.assertEqual(
+            list(Recipe.objects.filter(user=self.user).order_by(
+                "id").values_list("title", "description")),
+            [("Soup", ""), ("Stew", "Slow é")],
+        )
+
+    def test_batches_use_copy(self):
+        """Test every batch is loaded with one COPY statement"""
+        content = "".join(
+            json.dumps({"title": f"Recipe {index}", "cost": "1.00"}) + "\n"
+            for index in range(5)
+        )
+
+        with patch.object(
+            importing.RecipeImporter, "copy",
+            autospec=True, side_effect=importing.RecipeImporter.copy,
+        ) as copy:
+            result = self.run_import(content, importing.NDJSON, batch_size=2)
+
+        self.assertEqual(result.imported, 5)
+        self.assertEqual(
+            [len(call.args[2]) for call in copy.call_args_list], [2, 2, 1]
+        )
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 5)
+
+    def test_bulk_create_fallback(self):
+        """Test other databases load batches with bulk_create"""
+        with patch.object(connection, "vendor", "sqlite"):
+            result = self.run_import(CSV_FILE, importing.CSV)
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(
+            sorted(Recipe.objects.filter(user=self.user).values_list(
+                "title", flat=True)),
+            ["Soup", "Stew"],
+        )
+
+    @override_settings(RECIPE_IMPORT_MAX_ERRORS=1)
+    def test_errors_limited(self):
+        """Test only the first rejected rows are kept in detail"""
+        result = self.run_import(CSV_FILE, importing.CSV)
+
+        self.assertEqual(result.rejected, 2)
+        self.assertEqual(len(result.errors), 1)
+
+    def test_get_import_format(self):
+        """Test format is taken from extension unless requested"""
+        self.assertEqual(importing.get_import_format("a.CSV"), "csv")
+        self.assertEqual(
+            importing.get_import_format("a.txt", "ndjson"), "ndjson"
+        )
+        with self.assertRaises(ValueError):
+            importing.get_import_format("a.txt")
+
+
+class ImportRecipesCommandTests(TestCase):
+    """Test import_recipes management command"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            file.write(CSV_FILE)
+        self.addCleanup(os.remove, self.path)
+
+    def test_import(self):
+        """Test recipes are created and rejected rows reported"""
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        call_command(
+            "import_recipes", self.path, user=self.user.email,
+            stdout=stdout, stderr=stderr,
+        )
+
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
+        self.assertIn("Imported 2 recipes, rejected 2 rows", stdout.getvalue())
+        self.assertIn("rows/s", stdout.getvalue())
+        self.assertIn("Row 2 rejected", stderr.getvalue())
+        self.assertIn("Row 4 rejected", stderr.getvalue())
+
+    def test_background(self):
+        """Test --background queues a job run later by a worker"""
+        call_command(
+            "import_recipes", self.path, user=self.user.email,
+            background=True, stdout=io.StringIO(),
+        )
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+        job = jobs.run(jobs.claim("worker-1"))
+
+        self.assertEqual(job.user, self.user)
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result["imported"], 2)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command("import_recipes", self.path, user="no@example.com")
+
+    def test_unknown_format(self):
+        with self.assertRaises(CommandError):
+            call_command("import_recipes", "-", user=self.user.email)
+
+
+class RecipeImportApiTests(TestCase):
+    """Test upload endpoint of recipe imports"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.import_dir = directory.name
+        import_dir_setting = override_settings(
+            RECIPE_IMPORT_DIR=self.import_dir
+        )
+        import_dir_setting.enable()
+        self.addCleanup(import_dir_setting.disable)
+
+    def upload(self, name, content, params=""):
+        return self.client.post(
+            IMPORT_URL + params,
+            {"file": SimpleUploadedFile(name, content.encode("utf-8"))},
+            format="multipart",
+        )
+
+    def run_job(self):
+        """Run the queued import as run_worker would, return the job"""
+        return jobs.run(jobs.claim("worker-1"))
+
+    def test_authentication_required(self):
+        res = APIClient().post(IMPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_upload_queued(self):
+        """Test uploads are imported by a worker, not by the request"""
+        res = self.upload("recipes.csv", CSV_FILE)
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["status"], Job.QUEUED)
+        self.assertEqual(res["Location"], job_detail_url(res.data["id"]))
+        self.assertFalse(Recipe.objects.exists())
+        self.assertEqual(len(os.listdir(self.import_dir)), 1)
+
+    def test_upload_csv(self):
+        """Test uploaded recipes belong to the user"""
+        self.upload("recipes.csv", CSV_FILE)
+
+        job = self.run_job()
+
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.user, self.user)
+        self.assertEqual(job.result["imported"], 2)
+        self.assertEqual(job.result["rejected"], 2)
+        self.assertEqual(
+            [error["row"] for error in job.result["errors"]], [2, 4]
+        )
+        self.assertIn("rows_per_second", job.result)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(os.listdir(self.import_dir), [])
+
+    def test_type_parameter(self):
+        """Test ?type= overrides the extension of the file"""
+        res = self.upload("recipes.txt", NDJSON_FILE, "?type=ndjson")
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.run_job().result["imported"], 2)
+
+    def test_invalid_upload(self):
+        """Test missing files and unknown formats are rejected"""
+        self.assertEqual(
+            self.client.post(IMPORT_URL, {}, format="multipart").status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.upload("recipes.xml", CSV_FILE).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertFalse(Job.objects.exists())
+
+    def test_unreadable_upload(self):
+        """Test files with a bad encoding fail their job once"""
+        self.client.post(
+            IMPORT_URL,
+            {"file": SimpleUploadedFile("recipes.csv", b"title\n\xff\n")},
+            format="multipart",
+        )
+
+        with self.assertLogs("core.jobs", "ERROR"):
+            job = self.run_job()
+
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("UnicodeDecodeError", job.error)
+        self.assertEqual(os.listdir(self.import_dir), [])
+
+    def test_export_round_trip(self):
+        """Test exported recipes can be imported again"""
+        self.upload("recipes.csv", CSV_FILE)
+        self.run_job()
+        for export_format in importing.IMPORT_FORMATS:
+            res = self.client.get(EXPORT_URL, {"type": export_format})
+            content = b"".join(res.streaming_content).decode("utf-8")
+            exported = Recipe.objects.filter(user=self.user).count()
+
+            self.upload(f"recipes.{export_format}", content)
+            job = self.run_job()
+
+            self.assertEqual(job.result["imported"], exported)
+            self.assertEqual(job.result["rejected"], 0)
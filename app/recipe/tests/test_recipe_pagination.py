@@ -0,0 +1,225 @@
+"""
+Tests for Recipe API pagination
+"""
+import json
+from base64 import b64encode
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.models import Recipe
+from core.tests.helpers import create_recipes
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+
+
+def fetch_all_pages(client, url):
+    """Follow next links and return ids of every recipe in order"""
+    ids = []
+    while url:
+        res = client.get(url)
+        ids.extend(recipe["id"] for recipe in res.data["results"])
+        url = res.data["next"]
+
+    return ids
+
+
+@override_settings(API_PAGE_SIZE=3, API_MAX_PAGE_SIZE=5)
+class RecipePaginationTest(TestCase):
+    """Test keyset pagination of recipe endpoints"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipes = create_recipes([self.user], 8)
+
+    def test_first_page(self):
+        """Test first page is limited to page size"""
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 3)
+        self.assertIsNotNone(res.data["next"])
+        self.assertIsNone(res.data["previous"])
+        self.assertNotIn("count", res.data)
+
+    def test_follow_next_links(self):
+        """Test walking next links returns every recipe exactly once"""
+        ids = fetch_all_pages(self.client, RECIPE_URL)
+
+        self.assertEqual(ids, [recipe.id for recipe in self.recipes])
+
+    def test_follow_next_links_mixed_directions(self):
+        """Test columns sorted in opposite directions page correctly"""
+        for index, recipe in enumerate(self.recipes):
+            recipe.time_needed = index % 3
+            recipe.cost = Decimal(index % 2)
+            recipe.save()
+
+        ids = fetch_all_pages(
+            self.client, RECIPE_URL + "?ordering=time_needed,-cost"
+        )
+
+        self.assertEqual(ids, list(Recipe.objects.order_by(
+            "time_needed", "-cost", "-id"
+        ).values_list("id", flat=True)))
+
+    def test_follow_previous_link(self):
+        """Test previous link returns the page before the current one"""
+        first = self.client.get(RECIPE_URL)
+        second = self.client.get(first.data["next"])
+        res = self.client.get(second.data["previous"])
+
+        self.assertEqual(res.data["results"], first.data["results"])
+        self.assertIsNone(res.data["previous"])
+        self.assertEqual(res.data["next"], first.data["next"])
+
+    def test_deleted_rows_do_not_shift_pages(self):
+        """Test deleting rows before the cursor does not skip any recipe"""
+        first = self.client.get(RECIPE_URL)
+        Recipe.objects.filter(id=self.recipes[0].id).delete()
+        res = self.client.get(first.data["next"])
+
+        self.assertEqual(
+            [recipe["id"] for recipe in res.data["results"]],
+            [recipe.id for recipe in self.recipes[3:6]],
+        )
+
+    def test_page_size_capped(self):
+        """Test requested page size cannot exceed maximum page size"""
+        res = self.client.get(RECIPE_URL, {"page_size": 100})
+
+        self.assertEqual(len(res.data["results"]), 5)
+
+    def test_invalid_cursor(self):
+        """Test malformed cursor returns 404"""
+        res = self.client.get(RECIPE_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_malformed_cursor_position(self):
+        """Test well-formed cursors with positions of wrong shape return 404"""
+        positions = [
+            5, [[1], 2], [{"a": 1}, 2], [True, 1], [5, 1], ["x", 1], [1],
+        ]
+        for position in positions:
+            cursor = b64encode(json.dumps(
+                {"o": ["created_at", "id"], "p": position}
+            ).encode("utf-8")).decode("ascii")
+
+            res = self.client.get(RECIPE_URL, {"cursor": cursor})
+
+            self.assertEqual(
+                res.status_code, status.HTTP_404_NOT_FOUND, position
+            )
+
+    def test_single_query_per_page(self):
+        """Test a page is fetched with one query and without COUNT(*)"""
+        first = self.client.get(RECIPE_URL)
+        client = APIClient()
+
+        with self.assertNumQueries(1):
+            res = client.get(first.data["next"])
+
+        self.assertEqual(len(res.data["results"]), 3)
+
+    def test_user_recipes_paginated(self):
+        """Test user specific recipes are paginated in id order"""
+        other_user = get_user_model().objects.create_user(
+            email="test2@example.com",
+            password="testpassword",
+        )
+        create_recipes([other_user], 2)
+
+        ids = fetch_all_pages(self.client, USER_SPECIFIC_RECIPE_URL)
+
+        self.assertEqual(ids, [recipe.id for recipe in self.recipes])
+
+
+@override_settings(API_PAGE_SIZE=3)
+class RecipeCountTest(TestCase):
+    """Test totals returned with ?count=true"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        create_recipes([self.user], 5)
+
+    def test_count_not_requested(self):
+        """Test totals are only computed when asked for"""
+        res = self.client.get(RECIPE_URL)
+
+        self.assertNotIn("count", res.data)
+        self.assertNotIn("count_estimated", res.data)
+
+    def test_exact_count(self):
+        """Test small result sets are counted exactly"""
+        res = self.client.get(RECIPE_URL, {"count": "true"})
+
+        self.assertEqual(res.data["count"], 5)
+        self.assertFalse(res.data["count_estimated"])
+        self.assertEqual(len(res.data["results"]), 3)
+
+    def test_exact_count_filtered(self):
+        """Test totals count the filtered rows"""
+        Recipe.objects.filter(
+            id=Recipe.objects.order_by("id").first().id
+        ).update(cost=Decimal("1.00"))
+
+        res = self.client.get(RECIPE_URL, {"count": "1", "cost_max": "2"})
+
+        self.assertEqual(res.data["count"], 1)
+        self.assertFalse(res.data["count_estimated"])
+
+    @override_settings(ESTIMATED_COUNT_MIN_ROWS=1000)
+    @patch("core.paginator.estimate_table_rows", return_value=250000)
+    def test_estimated_count(self, patched_estimate):
+        """Test large tables report the planner estimate"""
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(RECIPE_URL, {"count": "true"})
+
+        self.assertEqual(res.data["count"], 250000)
+        self.assertTrue(res.data["count_estimated"])
+        self.assertFalse(any(
+            "COUNT(" in query["sql"] for query in context.captured_queries
+        ))
+
+    @override_settings(ESTIMATED_COUNT_MIN_ROWS=1)
+    def test_estimated_count_filtered(self):
+        """Test filtered result sets are estimated from their query plan"""
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(
+                USER_SPECIFIC_RECIPE_URL, {"count": "true"}
+            )
+
+        self.assertTrue(res.data["count_estimated"])
+        self.assertIsInstance(res.data["count"], int)
+        self.assertTrue(any(
+            query["sql"].startswith("EXPLAIN")
+            for query in context.captured_queries
+        ))
+
+    async def test_async_count(self):
+        """Test async listing returns the same total"""
+        res = await self.async_client.get(
+            reverse("recipe:async-recipe-list") + "?count=true"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["count"], 5)
+        self.assertFalse(res.json()["count_estimated"])
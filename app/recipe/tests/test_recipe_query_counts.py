@@ -0,0 +1,252 @@
+"""
+Query count regression tests for Recipe API
+
+Every endpoint of recipe/urls.py is requested at growing dataset sizes
+and must run the same number of queries each time.
+"""
+import tempfile
+
+from asgiref.sync import async_to_sync
+from core.models import Recipe
+from core.tests.helpers import (
+    QueryCountMixin,
+    create_recipes,
+    create_users,
+    recipe_detail_url,
+)
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+BULK_RECIPE_URL = reverse("recipe:recipe-bulk-create")
+EXPORT_URL = reverse("recipe:recipe-export")
+IMPORT_URL = reverse("recipe:recipe-import")
+ASYNC_RECIPE_URL = reverse("recipe:async-recipe-list")
+# Render every recipe of the largest dataset on one page
+ALL = "?page_size=500"
+
+
+def async_recipe_detail_url(recipe_id):
+    """Create dynamic async recipe detail URL"""
+    return reverse("recipe:async-recipe-detail", args=[recipe_id])
+
+
+def recipe_payload(index=0):
+    return {"title": f"Recipe {index}", "time_needed": 5, "cost": "1.50"}
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class RecipeQueryCountTests(QueryCountMixin, TestCase):
+    """Test recipe endpoints run a constant number of queries"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.token_client = APIClient()
+        self.token_client.credentials(
+            HTTP_AUTHORIZATION=f"Token {self.token.key}"
+        )
+        self.other_users = []
+        self.recipe = create_recipes([self.user], 1)[0]
+
+    def populate(self, size):
+        """Grow other users, their recipes and recipes of user to size"""
+        missing = size - len(self.other_users)
+        self.other_users += create_users(missing, prefix=f"other-{size}-")
+        create_recipes(
+            self.other_users,
+            size - Recipe.objects.exclude(user=self.user).count()
+        )
+        create_recipes(
+            [self.user], size - Recipe.objects.filter(user=self.user).count()
+        )
+        # Recipes of user, largest bulk requests touch all of them
+        self.own_versions = dict(Recipe.objects.filter(
+            user=self.user
+        ).values_list("id", "version")[:size])
+        self.own_ids = list(self.own_versions)
+
+    def populate_target(self, size):
+        """Grow data and create a recipe for the request to delete"""
+        self.populate(size)
+        self.target = create_recipes([self.user], 1)[0]
+
+    def async_request(self, method, path, data=None):
+        """Send request with AsyncClient from synchronous test code"""
+        # AsyncClient of Django 3.2 takes header names, not META keys
+        kwargs = {"Authorization": f"Token {self.token.key}"}
+        if data is not None:
+            kwargs.update(data=data, content_type="application/json")
+
+        async def send():
+            return await getattr(self.async_client, method)(path, **kwargs)
+
+        return async_to_sync(send)()
+
+    def test_api_root(self):
+        self.assertConstantQueries(
+            self.populate, lambda: self.client.get(reverse("recipe:api-root"))
+        )
+
+    def test_list(self):
+        self.assertConstantQueries(
+            self.populate, lambda: self.client.get(RECIPE_URL + ALL)
+        )
+
+    def test_list_sparse_fields(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.client.get(RECIPE_URL + ALL + "&fields=id,title")
+        )
+
+    def test_create(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.client.post(RECIPE_URL, recipe_payload())
+        )
+
+    def test_retrieve(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.client.get(recipe_detail_url(self.recipe.id))
+        )
+
+    def test_update(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.client.put(
+                recipe_detail_url(self.recipe.id), recipe_payload()
+            )
+        )
+
+    def test_partial_update(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.client.patch(
+                recipe_detail_url(self.recipe.id), {"title": "Updated"}
+            )
+        )
+
+    def test_destroy(self):
+        self.assertConstantQueries(
+            self.populate_target,
+            lambda: self.client.delete(recipe_detail_url(self.target.id))
+        )
+
+    def test_fetch_user_recipes(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.token_client.get(USER_SPECIFIC_RECIPE_URL + ALL)
+        )
+
+    def test_export(self):
+        """Test streaming every recipe of user, body included"""
+        def export():
+            response = self.token_client.get(EXPORT_URL, {"type": "csv"})
+            b"".join(response.streaming_content)
+            return response
+
+        self.assertConstantQueries(self.populate, export)
+
+    def test_import(self):
+        content = "title,cost\n" + "".join(
+            f"Imported {index},1.50\n" for index in range(10)
+        )
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            RECIPE_IMPORT_DIR=directory
+        ):
+            self.assertConstantQueries(
+                self.populate,
+                lambda: self.token_client.post(IMPORT_URL, {
+                    "file": SimpleUploadedFile(
+                        "recipes.csv", content.encode("utf-8")
+                    )
+                }, format="multipart")
+            )
+
+    def test_bulk_create(self):
+        """Test bulk creating size recipes"""
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.token_client.post(BULK_RECIPE_URL, [
+                recipe_payload(index) for index in range(len(self.own_ids))
+            ], format="json")
+        )
+
+    def test_bulk_update(self):
+        """Test bulk updating size recipes"""
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.token_client.patch(BULK_RECIPE_URL, [
+                {"id": recipe_id, "version": version, "time_needed": 10}
+                for recipe_id, version in self.own_versions.items()
+            ], format="json")
+        )
+
+    def test_bulk_destroy(self):
+        """Test bulk deleting size recipes"""
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.token_client.delete(
+                BULK_RECIPE_URL, {"ids": self.own_ids}, format="json"
+            )
+        )
+
+    def test_async_list(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.async_request("get", ASYNC_RECIPE_URL + ALL)
+        )
+
+    def test_async_create(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.async_request(
+                "post", ASYNC_RECIPE_URL, recipe_payload()
+            )
+        )
+
+    def test_async_retrieve(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.async_request(
+                "get", async_recipe_detail_url(self.recipe.id)
+            )
+        )
+
+    def test_async_update(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.async_request(
+                "put", async_recipe_detail_url(self.recipe.id),
+                recipe_payload()
+            )
+        )
+
+    def test_async_partial_update(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.async_request(
+                "patch", async_recipe_detail_url(self.recipe.id),
+                {"title": "Updated"}
+            )
+        )
+
+    def test_async_destroy(self):
+        self.assertConstantQueries(
+            self.populate_target,
+            lambda: self.async_request(
+                "delete", async_recipe_detail_url(self.target.id)
+            )
+        )
@@ -0,0 +1,109 @@
+"""
+Tests for full text search of Recipe API
+"""
+import json
+from base64 import b64encode
+
+from core.tests.helpers import create_recipe
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+
+
+def result_ids(res):
+    return [recipe["id"] for recipe in res.data["results"]]
+
+
+class RecipeSearchTest(TestCase):
+    """Test ?search= parameter of recipe listings"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.curry = create_recipe(
+            self.user,
+            title="Chicken curry",
+            description="Spicy dish with rice",
+        )
+        self.soup = create_recipe(
+            self.user,
+            title="Tomato soup",
+            description="Goes well with chicken sandwiches",
+        )
+        self.cake = create_recipe(
+            self.user,
+            title="Chocolate cake",
+            description="Sweet dessert",
+        )
+
+    def test_search_title_and_description(self):
+        """Test search matches title and description, title ranked first"""
+        res = self.client.get(RECIPE_URL, {"search": "chicken"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(result_ids(res), [self.curry.id, self.soup.id])
+
+    def test_search_stemming(self):
+        """Test search matches different forms of a word"""
+        res = self.client.get(RECIPE_URL, {"search": "desserts"})
+
+        self.assertEqual(result_ids(res), [self.cake.id])
+
+    def test_search_no_match(self):
+        """Test search without matches returns no recipes"""
+        res = self.client.get(RECIPE_URL, {"search": "lasagne"})
+
+        self.assertEqual(result_ids(res), [])
+
+    def test_search_follows_updates(self):
+        """Test search vector is updated when title changes"""
+        self.cake.title = "Lasagne"
+        self.cake.save()
+
+        res = self.client.get(RECIPE_URL, {"search": "lasagne"})
+
+        self.assertEqual(result_ids(res), [self.cake.id])
+
+    def test_search_paginated(self):
+        """Test ranked search results can be paged with cursors"""
+        res = self.client.get(
+            RECIPE_URL, {"search": "chicken", "page_size": 1}
+        )
+        self.assertEqual(result_ids(res), [self.curry.id])
+
+        res = self.client.get(res.data["next"])
+        self.assertEqual(result_ids(res), [self.soup.id])
+        self.assertIsNone(res.data["next"])
+
+    def test_search_cursor_invalid_rank(self):
+        """Test a rank that is not a number in the cursor returns 404"""
+        cursor = b64encode(json.dumps(
+            {"o": ["-rank", "-id"], "p": ["x", 1]}
+        ).encode("utf-8")).decode("ascii")
+
+        res = self.client.get(
+            RECIPE_URL, {"search": "chicken", "cursor": cursor}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_user_recipes(self):
+        """Test search applies to user specific recipes"""
+        other_user = get_user_model().objects.create_user(
+            email="test2@example.com",
+            password="testpassword",
+        )
+        create_recipe(other_user, title="Chicken pie")
+
+        res = self.client.get(USER_SPECIFIC_RECIPE_URL, {"search": "chicken"})
+
+        self.assertEqual(result_ids(res), [self.curry.id, self.soup.id])
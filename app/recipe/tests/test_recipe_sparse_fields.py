@@ -0,0 +1,128 @@
+"""
+Tests for sparse fieldsets of Recipe API
+"""
+
+from core.tests.helpers import create_recipe, recipe_detail_url
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+
+
+@override_settings(API_PAGE_SIZE=2)
+class RecipeSparseFieldsTest(TestCase):
+    """Test ?fields= and ?exclude= query parameters"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipes = [
+            create_recipe(
+                self.user,
+                description="Long description",
+                link="http://example.com",
+            )
+            for _ in range(3)
+        ]
+
+    def test_list_fields(self):
+        """Test list only renders requested fields"""
+        res = self.client.get(RECIPE_URL, {"fields": "id,title"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0], {
+            "id": self.recipes[0].id,
+            "title": "Sample Recipe",
+        })
+
+    def test_list_fields_projection(self):
+        """Test unrequested columns are not fetched from the database"""
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(RECIPE_URL, {"fields": "id,title"})
+
+        sql, = [
+            query["sql"] for query in context.captured_queries
+            if 'FROM "core_recipe"' in query["sql"]
+        ]
+        self.assertIn('"core_recipe"."title"', sql)
+        self.assertNotIn('"core_recipe"."cost"', sql)
+        self.assertNotIn('"core_recipe"."link"', sql)
+
+    def test_list_fields_pagination(self):
+        """Test next link keeps working with a projection"""
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPE_URL, {"fields": "title"})
+        res = self.client.get(res.data["next"])
+
+        self.assertEqual(res.data["results"], [{"title": "Sample Recipe"}])
+
+    def test_detail_exclude(self):
+        """Test detail omits excluded fields"""
+        res = self.client.get(
+            recipe_detail_url(self.recipes[0].id), {"exclude": "description"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("description", res.data)
+        self.assertIn("title", res.data)
+
+    def test_detail_fields_and_exclude(self):
+        """Test exclude is applied to the requested fields"""
+        res = self.client.get(
+            recipe_detail_url(self.recipes[0].id),
+            {"fields": "id,title,cost", "exclude": "cost"},
+        )
+
+        self.assertEqual(set(res.data), {"id", "title"})
+
+    def test_user_recipes_fields(self):
+        """Test user specific recipes only render requested fields"""
+        res = self.client.get(USER_SPECIFIC_RECIPE_URL, {"fields": "id"})
+
+        self.assertEqual(
+            res.data["results"],
+            [{"id": recipe.id} for recipe in self.recipes[:2]],
+        )
+
+    def test_unknown_field(self):
+        """Test unknown fields are rejected"""
+        res = self.client.get(RECIPE_URL, {"fields": "id,description"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_etag_same_for_fieldsets(self):
+        """Test ETag of a recipe only depends on its state
+
+        So that the ETag of a sparse read can be sent in If-Match.
+        """
+        url = recipe_detail_url(self.recipes[0].id)
+        full = self.client.get(url)
+        sparse = self.client.get(url, {"fields": "id"})
+
+        self.assertEqual(full["ETag"], sparse["ETag"])
+
+        res = self.client.patch(
+            url, {"title": "Updated"}, HTTP_IF_MATCH=sparse["ETag"]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_update_ignores_fields(self):
+        """Test fieldsets do not restrict writable fields"""
+        res = self.client.patch(
+            recipe_detail_url(self.recipes[0].id) + "?fields=id",
+            {"title": "Updated"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["title"], "Updated")
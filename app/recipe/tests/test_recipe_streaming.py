@@ -0,0 +1,161 @@
+"""
+Tests for streaming Recipe API responses
+"""
+import json
+import re
+
+from core.asgi import StreamingASGIHandler
+from core.models import Recipe
+from core.tests.helpers import asgi_request, create_recipe, run_asgi
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe.serializers import RecipeSerializer
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+
+
+@override_settings(API_PAGE_SIZE=2, RECIPE_STREAM_CHUNK_SIZE=2)
+class RecipeStreamingTest(TestCase):
+    """Test ?stream= mode of recipe listings"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for index in range(5):
+            create_recipe(
+                self.user,
+                title=f"Recipe {index} é",
+                description="Test Recipe Description",
+            )
+
+    def expected_data(self, recipes):
+        """Return recipes rendered by the regular serializer"""
+        return json.loads(json.dumps(
+            RecipeSerializer(recipes, many=True).data
+        ))
+
+    def test_stream_json_array(self):
+        """Test streaming JSON returns recipes past the page size"""
+        res = self.client.get(RECIPE_URL, {"stream": "json"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/json")
+        self.assertFalse(res.has_header("Link"))
+        data = json.loads(b"".join(res.streaming_content))
+        recipes = Recipe.objects.order_by("created_at", "id")
+        self.assertEqual(data, self.expected_data(recipes))
+
+    def test_stream_ndjson(self):
+        """Test streaming NDJSON returns one recipe per line"""
+        res = self.client.get(RECIPE_URL, {"stream": "ndjson"})
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = b"".join(res.streaming_content).decode("utf-8").splitlines()
+        recipes = Recipe.objects.order_by("created_at", "id")
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            self.expected_data(recipes),
+        )
+
+    @override_settings(RECIPE_STREAM_MAX_ROWS=3)
+    def test_stream_max_rows(self):
+        """Test streamed rows are capped, with a link to the rest"""
+        res = self.client.get(RECIPE_URL, {"stream": "ndjson"})
+
+        lines = b"".join(res.streaming_content).splitlines()
+        recipes = Recipe.objects.order_by("created_at", "id")
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            self.expected_data(recipes[:3]),
+        )
+        match = re.fullmatch(r'<(.+)>; rel="next"', res["Link"])
+
+        res = self.client.get(match.group(1))
+
+        lines = b"".join(res.streaming_content).splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            self.expected_data(recipes[3:]),
+        )
+        self.assertFalse(res.has_header("Link"))
+
+    @override_settings(RECIPE_STREAM_MAX_ROWS=3)
+    def test_stream_includes_rows_inserted_before_boundary(self):
+        """Test a row inserted while streaming is not skipped by next link"""
+        recipes = list(Recipe.objects.order_by("created_at", "id"))
+        res = self.client.get(RECIPE_URL, {"stream": "ndjson"})
+        # Sorts first, written after the boundary row was read
+        inserted = create_recipe(self.user, title="Inserted")
+        Recipe.objects.filter(id=inserted.id).update(
+            created_at=recipes[0].created_at, id=recipes[0].id - 1000
+        )
+
+        lines = b"".join(res.streaming_content).splitlines()
+
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(json.loads(lines[-1])["id"], recipes[2].id)
+
+    def test_stream_previous_cursor_rejected(self):
+        """Test streams only follow next links"""
+        res = self.client.get(RECIPE_URL)
+        res = self.client.get(res.data["next"])
+
+        res = self.client.get(res.data["previous"] + "&stream=json")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stream_asgi(self):
+        """Test streamed listings read the database off the event loop"""
+        recipes = Recipe.objects.order_by("created_at", "id")
+
+        res, = run_asgi(
+            asgi_request(RECIPE_URL, query_string="stream=ndjson")
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line) for line in res.content.splitlines()],
+            self.expected_data(recipes),
+        )
+
+    def test_project_uses_streaming_handler(self):
+        from app.asgi import application
+
+        self.assertIsInstance(application, StreamingASGIHandler)
+
+    def test_stream_empty(self):
+        """Test streaming empty listing returns empty array"""
+        Recipe.objects.all().delete()
+        res = self.client.get(RECIPE_URL, {"stream": "json"})
+
+        self.assertEqual(json.loads(b"".join(res.streaming_content)), [])
+
+    def test_stream_user_recipes(self):
+        """Test streaming user specific recipes"""
+        other_user = get_user_model().objects.create_user(
+            email="test2@example.com",
+            password="testpassword",
+        )
+        create_recipe(other_user)
+
+        res = self.client.get(USER_SPECIFIC_RECIPE_URL, {"stream": "json"})
+
+        data = json.loads(b"".join(res.streaming_content))
+        recipes = Recipe.objects.filter(user=self.user).order_by("id")
+        self.assertEqual(data, self.expected_data(recipes))
+
+    def test_invalid_stream_format(self):
+        """Test unknown streaming format is rejected"""
+        res = self.client.get(RECIPE_URL, {"stream": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
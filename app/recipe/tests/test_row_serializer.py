@@ -0,0 +1,131 @@
+"""
+Tests for serializing Recipe values_list() rows
+"""
+from decimal import Decimal
+
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe.serializers import (
+    RecipeDetailSerializer,
+    RecipeSerializer,
+    RowSerializer,
+)
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse("recipe:recipe-list")
+USER_SPECIFIC_RECIPE_URL = reverse("recipe:recipe-fetch-user-recipes")
+
+
+class RowSerializerTest(TestCase):
+    """Test RowSerializer renders the same JSON as ModelSerializer"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        samples = [
+            ("Plain", 0, Decimal("0.00"), "", ""),
+            ("Ünïcödé ☕", 15, Decimal("5.5"), "Line\nbreak", "http://a.b"),
+            ('Quote " and \\', 999, Decimal("999.99"), "x" * 500, ""),
+        ]
+        for title, time_needed, cost, description, link in samples:
+            Recipe.objects.create(
+                user=self.user,
+                title=title,
+                time_needed=time_needed,
+                cost=cost,
+                description=description,
+                link=link,
+            )
+
+    def assertSameJSON(self, serializer_class, fields=None):
+        """Assert both serializers render identical JSON"""
+        recipes = Recipe.objects.order_by("id")
+        expected = serializer_class(recipes, many=True, fields=fields).data
+
+        row_serializer = RowSerializer(serializer_class, fields)
+        rows = recipes.values_list(*row_serializer.columns())
+        data = row_serializer.many(rows)
+
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(data), renderer.render(expected))
+
+    def test_recipe_serializer_parity(self):
+        """Test rows render like RecipeSerializer"""
+        self.assertSameJSON(RecipeSerializer)
+
+    def test_recipe_detail_serializer_parity(self):
+        """Test rows render like RecipeDetailSerializer"""
+        self.assertSameJSON(RecipeDetailSerializer)
+
+    def test_sparse_fields_parity(self):
+        """Test rows render like serializer limited to some fields"""
+        self.assertSameJSON(RecipeDetailSerializer, ["cost", "title"])
+
+    def test_extra_columns_ignored(self):
+        """Test columns selected for ordering are not rendered"""
+        row_serializer = RowSerializer(RecipeSerializer, ["id"])
+        rows = Recipe.objects.values_list(
+            *row_serializer.columns("created_at", "id")
+        )
+
+        self.assertEqual(row_serializer.columns("created_at", "id"),
+                         ["id", "created_at"])
+        self.assertEqual(set(row_serializer.many(rows)[0]), {"id"})
+
+    def test_non_model_field_rejected(self):
+        """Test serializers with computed fields are not supported"""
+        class ComputedSerializer(RecipeSerializer):
+            summary = serializers.SerializerMethodField()
+
+            class Meta(RecipeSerializer.Meta):
+                fields = RecipeSerializer.Meta.fields + ["summary"]
+
+        with self.assertRaises(ValueError):
+            RowSerializer(ComputedSerializer)
+
+
+class RowSerializerAPITest(TestCase):
+    """Test listings render the same response on both read paths"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for index in range(3):
+            Recipe.objects.create(
+                user=self.user,
+                title=f"Recipe {index}",
+                cost=Decimal(f"{index}.25"),
+            )
+
+    def assertSameResponse(self, url, params=None):
+        with override_settings(RECIPE_FAST_SERIALIZER=False):
+            expected = self.client.get(url, params)
+        with override_settings(RECIPE_FAST_SERIALIZER=True):
+            res = self.client.get(url, params)
+
+        self.assertEqual(res.content, expected.content)
+        self.assertEqual(res["ETag"], expected["ETag"])
+
+    def test_list_parity(self):
+        """Test recipe list is identical on both read paths"""
+        self.assertSameResponse(RECIPE_URL, {"page_size": 2})
+
+    def test_list_ordering_parity(self):
+        """Test ordered recipe list is identical on both read paths"""
+        self.assertSameResponse(RECIPE_URL, {"ordering": "-cost"})
+
+    def test_user_recipes_parity(self):
+        """Test user recipes are identical on both read paths"""
+        self.assertSameResponse(
+            USER_SPECIFIC_RECIPE_URL, {"fields": "id,cost"}
+        )
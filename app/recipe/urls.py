@@ -2,7 +2,7 @@
 URL mapping for Recipe
 """
 from django.urls import include, path
-from recipe import views
+from recipe import async_views, views
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -12,4 +12,10 @@ app_name = "recipe"
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("async/", async_views.recipe_list, name="async-recipe-list"),
+    path(
+        "async/<int:pk>/",
+        async_views.recipe_detail,
+        name="async-recipe-detail"
+    ),
 ]
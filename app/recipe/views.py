@@ -1,42 +1,322 @@
 """
 Views for Recipe API
 """
+import uuid
+
 from core.models import Recipe
-from django.utils import timezone
-from recipe import serializers
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from core.serializers import JobSerializer
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.urls import reverse
+from recipe import (
+    cache,
+    conditional,
+    filters,
+    importing,
+    pagination,
+    serializers,
+    streaming,
+    tasks,
+)
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import (
+    SAFE_METHODS,
+    AllowAny,
+    IsAuthenticated,
+)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from user.authentication import CachedTokenAuthentication
+
+
+def can_modify_recipe(user, owner_id):
+    """Return True if user may edit or delete recipes of owner"""
+    return (
+        user.is_superuser
+        or user.is_staff
+        or (user.is_authenticated and owner_id == user.id)
+    )
 
 
 class RecipeViewSets(viewsets.ModelViewSet):
     """View for Recipe API"""
     serializer_class = serializers.RecipeDetailSerializer
-    # Fetch all recipe data
-    queryset = Recipe.objects.all()
+    # Fetch all recipe data, search vector is only needed inside queries
+    queryset = Recipe.objects.defer("search_vector")
     permission_classes = [AllowAny]
+    # Tokens as well, so writes need not hash a password on every request
+    authentication_classes = [
+        *api_settings.DEFAULT_AUTHENTICATION_CLASSES,
+        CachedTokenAuthentication,
+    ]
+    pagination_class = pagination.RecipeCursorPagination
+    filter_backends = [
+        filters.RecipeRangeFilter,
+        filters.RecipeSearchFilter,
+        filters.RecipeOrderingFilter,
+    ]
 
     @action(
         methods=["get"],
         detail=False,
         permission_classes=[IsAuthenticated],
-        authentication_classes=[TokenAuthentication]
+        authentication_classes=[CachedTokenAuthentication]
         )
     def fetch_user_recipes(self, request):
-        user_recipes = self.queryset.filter(
-            user=self.request.user).order_by('id')
-        serializer = serializers.RecipeSerializer(user_recipes, many=True)
-        return Response(serializer.data)
+        user_recipes = self.filter_queryset(self.get_queryset().filter(
+            user=self.request.user).order_by('id'))
+        if streaming.get_stream_format(request):
+            return self.list_response(user_recipes)
+
+        cache_key = cache.user_recipes_key(request, request.user.id)
+        cached = cache.get_entry(cache_key)
+        if cached is not None:
+            not_modified = conditional.not_modified_response(
+                request, cached["etag"]
+            )
+            if not_modified is not None:
+                return not_modified
+
+            return conditional.set_validators(
+                Response(cached["data"]), cached["etag"]
+            )
+
+        response = self.list_response(user_recipes)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set_entry(
+                cache_key, {"data": response.data, "etag": response["ETag"]}
+            )
+
+        return response
+
+    @action(
+        methods=["get"],
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        authentication_classes=[CachedTokenAuthentication]
+        )
+    def export(self, request):
+        """Download every recipe of the user as NDJSON or CSV (?type=csv)
+
+        Rows are read with a server side cursor and encoded as they
+        arrive, so memory use does not depend on the number of recipes.
+        Recipes are sent in id order, an interrupted download resumes
+        with ?after_id= set to the last id received. Under ASGI, rows are
+        read off the event loop by core.asgi.StreamingASGIHandler.
+        """
+        export_format = streaming.get_export_format(request)
+        after_id = streaming.get_after_id(request)
+        row_serializer = serializers.get_row_serializer(
+            serializers.RecipeDetailSerializer
+        )
+        queryset = Recipe.objects.filter(
+            user=request.user, id__gt=after_id
+        ).order_by("id").values_list(*row_serializer.columns())
+
+        return streaming.export_response(
+            row_serializer, queryset, export_format, "recipes"
+        )
+
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path="import",
+        url_name="import",
+        permission_classes=[IsAuthenticated],
+        authentication_classes=[CachedTokenAuthentication],
+        parser_classes=[MultiPartParser]
+        )
+    def import_recipes(self, request):
+        """Queue import of recipes of the user from an uploaded CSV or NDJSON
+
+        The format is taken from ?type= or the file extension. The file is
+        saved to RECIPE_IMPORT_DIR and imported by run_worker, the response
+        is the queued job, whose status and result are polled at the URL
+        in the Location header. Rows are validated like POSTed recipes and
+        loaded in batches, invalid rows are skipped and reported in the
+        result of the job.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "No file was submitted"})
+
+        try:
+            import_format = importing.get_import_format(
+                upload.name,
+                request.query_params.get(streaming.EXPORT_QUERY_PARAM)
+            )
+        except ValueError as exc:
+            raise ValidationError({streaming.EXPORT_QUERY_PARAM: str(exc)})
+
+        storage = FileSystemStorage(location=settings.RECIPE_IMPORT_DIR)
+        name = storage.save(f"{uuid.uuid4().hex}.{import_format}", upload)
+        job = tasks.enqueue_import(
+            request.user, storage.path(name), import_format, remove=True
+        )
+
+        return Response(
+            JobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": reverse("core:job-detail", args=[job.id])},
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def list_response(self, queryset):
+        """Return page of recipes, or a large streamed page if requested"""
+        stream_format = streaming.get_stream_format(self.request)
+        if stream_format:
+            queryset, next_link = self.paginator.get_stream_window(
+                queryset, self.request, settings.RECIPE_STREAM_MAX_ROWS
+            )
+            return streaming.streaming_response(
+                self.get_serializer(), queryset, stream_format, next_link
+            )
+
+        row_serializer = self.get_row_serializer()
+        if row_serializer is not None:
+            # Select plain rows, with the columns needed by cursor and ETag
+            queryset = queryset.values_list(
+                *row_serializer.columns(
+                    *self.paginator.get_ordering_names(queryset),
+                    "id",
+                    "last_modified"
+                ),
+                named=True
+            )
+
+        if conditional.is_conditional(self.request):
+            # Compare validators using an aggregate over the page window
+            etag = conditional.collection_etag_for_queryset(
+                self.request,
+                self.paginator.get_window(queryset, self.request)
+            )
+            not_modified = conditional.not_modified_response(
+                self.request, etag
+            )
+            if not_modified is not None:
+                return not_modified
+
+        page = self.paginate_queryset(queryset)
+        if row_serializer is not None:
+            data = row_serializer.many(page)
+        else:
+            data = self.get_serializer(page, many=True).data
+        response = self.get_paginated_response(data)
+        # Collections only get an ETag, as Last-Modified misses deletions
+        etag = conditional.collection_etag_for_rows(
+            self.request, self.paginator.window_rows
+        )
+        return conditional.set_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        if conditional.is_conditional(request):
+            not_modified = self.not_modified_recipe_response(kwargs)
+            if not_modified is not None:
+                return not_modified
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return self.recipe_response(instance, serializer.data)
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        instance = self.get_object()
+        serializer = self.get_serializer(
+            instance, data=request.data, partial=partial
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+
+        return self.recipe_response(instance, serializer.data)
+
+    def recipe_response(self, instance, data):
+        """Return response of a single recipe with its validators"""
+        etag, timestamp = conditional.recipe_validators(
+            instance.pk,
+            instance.version,
+            instance.last_modified
+        )
+        return conditional.set_validators(Response(data), etag, timestamp)
+
+    def not_modified_recipe_response(self, kwargs):
+        """Return 304 response if requested recipe has not changed
+
+        Only last_modified is read, so fresh copies are confirmed without
+        fetching and serializing the whole recipe.
+        """
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            row = self.get_queryset().filter(
+                **{self.lookup_field: lookup}
+            ).values_list("pk", "version", "last_modified").first()
+        except (TypeError, ValueError):
+            return None
+
+        if row is None:
+            return None
+
+        etag, timestamp = conditional.recipe_validators(*row)
+        return conditional.not_modified_response(
+            self.request, etag, timestamp
+        )
 
     def get_serializer_class(self):
-        if self.action == "list":
+        if self.action in ["list", "fetch_user_recipes"]:
             return serializers.RecipeSerializer
 
         return self.serializer_class
 
+    def get_sparse_fields(self):
+        """Return names of fields selected by ?fields= / ?exclude= on reads"""
+        if self.request.method not in SAFE_METHODS:
+            return None
+
+        return self.get_serializer_class().fields_from_request(self.request)
+
+    def get_row_serializer(self):
+        """Return serializer of values_list() rows for listings, if enabled
+
+        Produces the same data as the regular serializer without building
+        a model instance per recipe.
+        """
+        if not settings.RECIPE_FAST_SERIALIZER:
+            return None
+
+        fields = self.get_sparse_fields()
+        try:
+            return serializers.get_row_serializer(
+                self.get_serializer_class(),
+                tuple(fields) if fields is not None else None
+            )
+        except ValueError:
+            return None
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            # Only fetch rendered columns, plus the ones used by ETags
+            queryset = queryset.only(*fields, "version", "last_modified")
+
+        return queryset
+
+    def can_modify(self, owner_id):
+        """Return True if request user may edit or delete owner's recipes"""
+        return can_modify_recipe(self.request.user, owner_id)
+
     def perform_create(self, serializer):
         """When new object is created this method will execute"""
         if self.request.user.is_authenticated:
@@ -47,34 +327,234 @@ class RecipeViewSets(viewsets.ModelViewSet):
             )
 
     def perform_update(self, serializer):
-        """Execute when updating recipe"""
+        """Execute when updating recipe
+
+        Changed fields are written with a single UPDATE conditional on the
+        version that was read, so concurrent edits are rejected with 412
+        instead of overwriting each other. Clients can also send the ETag
+        they last saw in If-Match.
+        """
         recipe_details = serializer.instance
 
-        if (
-            self.request.user.is_superuser
-            or self.request.user.is_staff
-            or (self.request.user.is_authenticated
-                and recipe_details.user == self.request.user)
-        ):
-            recipe_details.last_modified = timezone.now()
-            recipe_details.save()
-            serializer.save()
-        else:
+        if not self.can_modify(recipe_details.user_id):
             raise PermissionDenied(
                 "You do not have permission to edit the recipe"
             )
 
+        etag, timestamp = conditional.recipe_validators(
+            recipe_details.pk,
+            recipe_details.version,
+            recipe_details.last_modified
+        )
+        conditional.check_precondition(self.request, etag, timestamp)
+
+        if not recipe_details.save_changes(serializer.validated_data):
+            raise conditional.PreconditionFailed()
+        # UPDATE queries do not send post_save signals
+        cache.invalidate_user_recipes(recipe_details.user_id)
+
     def perform_destroy(self, instance):
         """Execute when deleting recipe"""
 
-        if (
-            self.request.user.is_superuser
-            or self.request.user.is_staff
-            or (self.request.user.is_authenticated
-                and instance.user == self.request.user)
-        ):
+        if self.can_modify(instance.user_id):
             instance.delete()
         else:
             raise PermissionDenied(
                 "You do not have permission to delete the recipe"
             )
+
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path="bulk",
+        permission_classes=[IsAuthenticated],
+        authentication_classes=[CachedTokenAuthentication]
+        )
+    def bulk_create(self, request):
+        """Create a list of recipes in a single transaction"""
+        self.check_bulk_size(request.data)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        recipes = [
+            Recipe(user=request.user, **item)
+            for item in serializer.validated_data
+        ]
+        with transaction.atomic():
+            Recipe.objects.bulk_create(
+                recipes, batch_size=settings.RECIPE_BULK_BATCH_SIZE
+            )
+            # bulk_create does not send post_save signals
+            cache.invalidate_user_recipes(request.user.id)
+
+        return Response(
+            self.get_serializer(recipes, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Partially update a list of recipes in a single transaction
+
+        Every item must contain the id of the recipe to update and the
+        version it was read at. Rows are written with conditional UPDATEs
+        instead of being locked, and the whole request is rejected with
+        412 if any of them was modified by another request since it was
+        read.
+        """
+        self.check_bulk_size(request.data)
+        recipes = self.get_bulk_recipes([
+            item.get("id") for item in request.data if isinstance(item, dict)
+        ])
+        serializers_list = self.validate_bulk_update(request.data, recipes)
+
+        instances = [serializer.instance for serializer in serializers_list]
+        with transaction.atomic():
+            updated = Recipe.bulk_save_changes(
+                {
+                    serializer.instance: serializer.validated_data
+                    for serializer in serializers_list
+                },
+                batch_size=settings.RECIPE_BULK_BATCH_SIZE
+            )
+            if updated < len(instances):
+                # Changed between validation and update, undo the others
+                transaction.set_rollback(True)
+            else:
+                # Queryset updates do not send post_save signals
+                for owner_id in {instance.user_id for instance in instances}:
+                    cache.invalidate_user_recipes(owner_id)
+
+        if updated < len(instances):
+            raise conditional.PreconditionFailed()
+
+        return Response(self.get_serializer(instances, many=True).data)
+
+    def validate_bulk_update(self, items, recipes):
+        """Return a serializer per item of a bulk update
+
+        Raises ValidationError with the errors of every item if any is
+        invalid, then PreconditionFailed if any recipe is not at the
+        version sent by the client.
+        """
+        errors = []
+        stale = []
+        serializers_list = []
+        seen_ids = set()
+        for item in items:
+            if not isinstance(item, dict):
+                errors.append({"non_field_errors": ["Expected a recipe"]})
+                continue
+
+            error = self.get_bulk_item_error(
+                recipes,
+                item.get("id"),
+                "You do not have permission to edit the recipe"
+            )
+            recipe = None if error else recipes[item["id"]]
+            if not error and recipe.id in seen_ids:
+                error = {"id": ["Duplicate recipe"]}
+            if not error and not self.is_recipe_id(item.get("version")):
+                error = {"version": ["A valid integer is required."]}
+            if error:
+                errors.append(error)
+                continue
+
+            seen_ids.add(recipe.id)
+            if item["version"] == recipe.version:
+                stale.append({})
+            else:
+                stale.append({
+                    "version": [conditional.PreconditionFailed.default_detail]
+                })
+
+            serializer = self.get_serializer(recipe, data=item, partial=True)
+            if serializer.is_valid():
+                errors.append({})
+                serializers_list.append(serializer)
+            else:
+                errors.append(serializer.errors)
+
+        if any(errors):
+            raise ValidationError(errors)
+        if any(stale):
+            raise conditional.PreconditionFailed(stale)
+
+        return serializers_list
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        """Delete a list of recipes given as {"ids": [...]}"""
+        ids = request.data.get("ids") if isinstance(
+            request.data, dict) else None
+        if not isinstance(ids, list):
+            raise ValidationError({"ids": "Expected a list of recipe ids"})
+        self.check_bulk_size(ids)
+        recipes = self.get_bulk_recipes(ids, "id", "user_id")
+
+        errors = [
+            self.get_bulk_item_error(
+                recipes,
+                recipe_id,
+                "You do not have permission to delete the recipe"
+            )
+            for recipe_id in ids
+        ]
+        if any(errors):
+            raise ValidationError({"ids": errors})
+
+        with transaction.atomic():
+            # Nothing references recipes, so skip the deletion collector
+            # and its post_delete signals for a single DELETE ... WHERE IN
+            queryset = Recipe.objects.filter(id__in=ids)
+            queryset._raw_delete(queryset.db)
+            for owner_id in {recipe.user_id for recipe in recipes.values()}:
+                cache.invalidate_user_recipes(owner_id)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def check_bulk_size(self, items):
+        """Reject bulk requests that are not a list or are too large"""
+        if not isinstance(items, list):
+            raise ValidationError("Expected a list of recipes")
+
+        if len(items) > settings.RECIPE_BULK_MAX_ITEMS:
+            raise ValidationError(
+                "Bulk requests are limited to "
+                f"{settings.RECIPE_BULK_MAX_ITEMS} recipes"
+            )
+
+    def get_bulk_recipes(self, ids, *fields):
+        """Return recipes with the given ids in a dict keyed by id
+
+        Only the given fields are loaded, every field but search_vector
+        if none is given.
+        """
+        ids = [recipe_id for recipe_id in ids if self.is_recipe_id(recipe_id)]
+        if fields:
+            queryset = Recipe.objects.only(*fields)
+        else:
+            queryset = Recipe.objects.defer("search_vector")
+
+        return queryset.in_bulk(ids)
+
+    @staticmethod
+    def is_recipe_id(value):
+        """Return True if value sent by the client may be a recipe id"""
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    def get_bulk_item_error(self, recipes, recipe_id, permission_message):
+        """Return error of bulk item if recipe is missing or not editable
+
+        recipes is the dict returned by get_bulk_recipes().
+        """
+        if not self.is_recipe_id(recipe_id):
+            return {"id": ["A valid integer is required."]}
+
+        recipe = recipes.get(recipe_id)
+        if recipe is None:
+            return {"id": ["Recipe not found"]}
+        if not self.can_modify(recipe.user_id):
+            return {"id": [permission_message]}
+
+        return {}
@@ -0,0 +1,32 @@
+"""
+Async views for USER API
+"""
+from asgiref.sync import sync_to_async
+from core.async_api import async_api_view, json_response
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import NotAuthenticated
+from user.serializers import UserSerializer
+
+
+@async_api_view(["GET", "PUT", "PATCH"])
+async def manage_user(request):
+    """Manage authenticated users, like ManageUserView"""
+    if not request.user.is_authenticated:
+        raise NotAuthenticated()
+
+    if request.method == "GET":
+        return json_response(UserSerializer(request.user).data)
+
+    # Authentication may return a copy cached before the last change,
+    # saving it would write stale columns back
+    user = await sync_to_async(get_user_model().objects.get)(
+        pk=request.user.pk
+    )
+    serializer = UserSerializer(
+        user, data=request.data, partial=request.method == "PATCH"
+    )
+    # Validation queries the database for email uniqueness
+    await sync_to_async(serializer.is_valid)(raise_exception=True)
+    await sync_to_async(serializer.save)()
+
+    return json_response(serializer.data)
@@ -0,0 +1,107 @@
+"""
+Authentication for USER API
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from core.cache import SHARED_CACHE, bump_version, get_version
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+# Holds the user id of tokens and the version of users, nothing secret
+TOKEN_CACHE = SHARED_CACHE
+# Per process, holds user instances, password hash included
+USER_CACHE = "local"
+
+
+def token_cache_key(key):
+    """Return cache key of token, without storing the token itself"""
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return f"auth:token:{digest}"
+
+
+def _user_version_key(user_id):
+    return f"auth:user:{user_id}:version"
+
+
+def get_user_version(user_id):
+    """Return current version of user's cached authentication state"""
+    return get_version(_user_version_key(user_id))
+
+
+def user_cache_key(user_id, version):
+    return f"auth:user:{user_id}:{version}"
+
+
+def revoke_cached_token(key):
+    """Drop cached authentication state of token"""
+    caches[TOKEN_CACHE].delete(token_cache_key(key))
+
+
+def invalidate_cached_user(user_id):
+    """Make cached copies of user stale in every process
+
+    Called when a user is saved, so deactivation and password changes
+    take effect on the next request.
+    """
+    bump_version(_user_version_key(user_id))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication caching the token and its user
+
+    The shared cache maps tokens to user ids only. Users are kept in a
+    per process cache under a version number bumped whenever the user is
+    saved, so only the first request after a change reads the database
+    and the password hash never leaves the process.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        user_id = caches[TOKEN_CACHE].get(cache_key)
+
+        if user_id is None:
+            user_id = self.get_model().objects.filter(
+                key=key
+            ).values_list("user_id", flat=True).first()
+            if user_id is None:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            caches[TOKEN_CACHE].set(
+                cache_key, user_id, settings.AUTH_TOKEN_CACHE_TIMEOUT
+            )
+
+        user = self.get_cached_user(user_id)
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+
+        token = self.get_model()(key=key, user_id=user.id)
+        token.user = user
+        return (user, token)
+
+    def get_cached_user(self, user_id):
+        """Return user from per process cache, loading it if stale"""
+        # Read the version first, so a user saved meanwhile is not cached
+        # under the version that makes it current
+        key = user_cache_key(user_id, get_user_version(user_id))
+        user = caches[USER_CACHE].get(key)
+        if user is None:
+            user = get_user_model().objects.filter(pk=user_id).first()
+            if user is not None:
+                caches[USER_CACHE].set(
+                    key, user, settings.AUTH_TOKEN_CACHE_TIMEOUT
+                )
+
+        return user
+
+    async def authenticate_async(self, request):
+        """Async authenticate() for plain Django requests of async views
+
+        Only the cache and database lookups run in a worker thread.
+        """
+        return await sync_to_async(self.authenticate)(request)
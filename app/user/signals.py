@@ -0,0 +1,28 @@
+"""
+Signal handlers for USER API
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from user.authentication import invalidate_cached_user, revoke_cached_token
+
+
+@receiver(post_delete, sender=Token)
+def revoke_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a token as soon as it is deleted"""
+    revoke_cached_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user(sender, instance, created=False, **kwargs):
+    """Drop cached copies of user whenever the user changes
+
+    Covers deactivation and password changes, and keeps the user details
+    returned by authenticated views up to date.
+    """
+    if created:
+        return
+
+    invalidate_cached_user(instance.id)
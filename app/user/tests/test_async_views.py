@@ -0,0 +1,102 @@
+"""
+Tests for async views of USER API
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+ASYNC_ACCOUNT_URL = reverse("user:async-account")
+
+
+class AsyncManageUserTest(TestCase):
+    """Test async account endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+            first_name="Test",
+        )
+        self.token = Token.objects.create(user=self.user)
+
+    def auth(self):
+        # AsyncClient of Django 3.2 takes header names, not META keys
+        return {"Authorization": f"Token {self.token.key}"}
+
+    async def test_retrieve(self):
+        """Test retrieving account of authenticated user"""
+        res = await self.async_client.get(ASYNC_ACCOUNT_URL, **self.auth())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {
+            "email": "test@example.com",
+            "first_name": "Test",
+            "last_name": "",
+        })
+
+    async def test_unauthenticated(self):
+        """Test anonymous requests are rejected with 401"""
+        res = await self.async_client.get(ASYNC_ACCOUNT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res["WWW-Authenticate"], "Token")
+
+    async def test_update(self):
+        """Test updating name and password of authenticated user"""
+        res = await self.async_client.patch(
+            ASYNC_ACCOUNT_URL,
+            {"first_name": "Updated", "password": "newpassword"},
+            content_type="application/json",
+            **self.auth()
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        await sync_to_async(self.user.refresh_from_db)()
+        self.assertEqual(self.user.first_name, "Updated")
+        self.assertTrue(self.user.check_password("newpassword"))
+
+    async def test_update_does_not_save_cached_copy(self):
+        """Test updates write to the current row, not the cached user"""
+        await self.async_client.get(ASYNC_ACCOUNT_URL, **self.auth())
+        # Changed without a save, the cached copy is now stale
+        await sync_to_async(
+            get_user_model().objects.filter(pk=self.user.pk).update
+        )(last_name="Changed")
+
+        await self.async_client.patch(
+            ASYNC_ACCOUNT_URL,
+            {"first_name": "Updated"},
+            content_type="application/json",
+            **self.auth()
+        )
+
+        await sync_to_async(self.user.refresh_from_db)()
+        self.assertEqual(self.user.first_name, "Updated")
+        self.assertEqual(self.user.last_name, "Changed")
+
+    async def test_update_duplicate_email(self):
+        """Test email uniqueness is validated"""
+        await sync_to_async(get_user_model().objects.create_user)(
+            email="taken@example.com", password="testpassword"
+        )
+
+        res = await self.async_client.patch(
+            ASYNC_ACCOUNT_URL,
+            {"email": "taken@example.com"},
+            content_type="application/json",
+            **self.auth()
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_post_not_allowed(self):
+        """Test POST is not allowed on account endpoint"""
+        res = await self.async_client.post(
+            ASYNC_ACCOUNT_URL, {}, content_type="application/json",
+            **self.auth()
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,125 @@
+"""
+Test cached token authentication
+"""
+from core.tests.helpers import LOCMEM_CACHES
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from user.authentication import token_cache_key
+
+ACCOUNT_URL = reverse("user:account")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedTokenAuthenticationTest(TestCase):
+    """Test token authentication served from cache"""
+
+    def setUp(self):
+        caches["default"].clear()
+        caches["local"].clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+            first_name="test first",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_authenticated_without_queries(self):
+        """Test repeated requests do not query token or user"""
+        self.client.get(ACCOUNT_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ACCOUNT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_shared_cache_holds_no_secrets(self):
+        """Test only ids and versions are stored in the shared cache"""
+        self.client.get(ACCOUNT_URL)
+        shared = caches["default"]
+
+        self.assertEqual(
+            shared.get(token_cache_key(self.token.key)), self.user.id
+        )
+        # LocMemCache keeps pickled values, look for the hash in all of them
+        for value in shared._cache.values():
+            self.assertNotIn(self.user.password.encode("utf-8"), value)
+            self.assertNotIn(self.token.key.encode("utf-8"), value)
+
+    def test_other_process_loads_user(self):
+        """Test a process without the user cached loads it by id only"""
+        self.client.get(ACCOUNT_URL)
+        caches["local"].clear()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ACCOUNT_URL)
+
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_invalid_token(self):
+        """Test unknown token is rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        res = self.client.get(ACCOUNT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_deleted(self):
+        """Test deleted token is rejected although it was cached"""
+        self.client.get(ACCOUNT_URL)
+        self.token.delete()
+
+        res = self.client.get(ACCOUNT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_deactivated(self):
+        """Test token of deactivated user is rejected"""
+        self.client.get(ACCOUNT_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ACCOUNT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_drops_cache(self):
+        """Test password change forces token to be checked again"""
+        self.client.get(ACCOUNT_URL)
+        self.user.set_password("newpassword")
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ACCOUNT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_updated_details_returned(self):
+        """Test user details are not served stale after an update"""
+        self.client.get(ACCOUNT_URL)
+        self.client.patch(ACCOUNT_URL, {"first_name": "new first"})
+
+        res = self.client.get(ACCOUNT_URL)
+
+        self.assertEqual(res.data["first_name"], "new first")
+
+    def test_update_does_not_save_cached_copy(self):
+        """Test updates write to the current row, not the cached user"""
+        self.client.get(ACCOUNT_URL)
+        # Changed without a save, the cached copy is now stale
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            last_name="changed last"
+        )
+
+        self.client.patch(ACCOUNT_URL, {"first_name": "new first"})
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "new first")
+        self.assertEqual(self.user.last_name, "changed last")
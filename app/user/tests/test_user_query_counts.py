@@ -0,0 +1,87 @@
+"""
+Query count regression tests for User API
+
+Every endpoint of user/urls.py is requested at growing dataset sizes
+and must run the same number of queries each time.
+"""
+from itertools import count
+
+from asgiref.sync import async_to_sync
+from core.tests.helpers import QueryCountMixin, create_recipes, create_users
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+CREATE_USER_URL = reverse("user:create")
+TOKEN_URL = reverse("user:token")
+ACCOUNT_URL = reverse("user:account")
+ASYNC_ACCOUNT_URL = reverse("user:async-account")
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class UserQueryCountTests(QueryCountMixin, TestCase):
+    """Test user endpoints run a constant number of queries"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.other_users = []
+        self.emails = (f"new{index}@example.com" for index in count())
+
+    def populate(self, size):
+        """Grow other users, their tokens and recipes to size"""
+        users = create_users(
+            size - len(self.other_users), prefix=f"other-{size}-"
+        )
+        Token.objects.bulk_create([
+            Token(key=Token.generate_key(), user=user) for user in users
+        ])
+        create_recipes(users + [self.user], size)
+        self.other_users += users
+
+    def test_create(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: APIClient().post(CREATE_USER_URL, {
+                "email": next(self.emails),
+                "password": "testpass123",
+                "first_name": "First",
+                "last_name": "Last",
+            })
+        )
+
+    def test_token(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: APIClient().post(TOKEN_URL, {
+                "email": self.user.email, "password": "testpass123",
+            })
+        )
+
+    def test_retrieve_account(self):
+        self.assertConstantQueries(
+            self.populate, lambda: self.client.get(ACCOUNT_URL)
+        )
+
+    def test_update_account(self):
+        self.assertConstantQueries(
+            self.populate,
+            lambda: self.client.patch(ACCOUNT_URL, {"first_name": "Updated"})
+        )
+
+    def test_async_account(self):
+        async def send():
+            # AsyncClient of Django 3.2 takes header names, not META keys
+            return await self.async_client.get(
+                ASYNC_ACCOUNT_URL, Authorization=f"Token {self.token.key}"
+            )
+
+        self.assertConstantQueries(self.populate, async_to_sync(send))
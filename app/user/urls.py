@@ -3,7 +3,7 @@ URL mapping for USER API
 """
 
 from django.urls import path
-from user import views
+from user import async_views, views
 
 app_name = "user"
 
@@ -11,4 +11,5 @@ urlpatterns = [
     path("create/", views.CreateUserView.as_view(), name="create"),
     path("token/", views.CreateTokenView.as_view(), name="token"),
     path("account/", views.ManageUserView.as_view(), name="account"),
+    path("async/account/", async_views.manage_user, name="async-account"),
 ]
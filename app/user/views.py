@@ -1,11 +1,12 @@
 """
 Views for USER API
 """
+from django.contrib.auth import get_user_model
 from rest_framework import generics
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.settings import api_settings
+from user.authentication import CachedTokenAuthentication
 from user.serializers import AuthTokenSerializer, UserSerializer
 
 
@@ -24,9 +25,14 @@ class CreateTokenView(ObtainAuthToken):
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage authenticated users"""
     serializer_class = UserSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return authenticated user details"""
-        return self.request.user
+        if self.request.method in SAFE_METHODS:
+            return self.request.user
+
+        # Authentication may return a copy cached before the last change,
+        # saving it would write stale columns back
+        return get_user_model().objects.get(pk=self.request.user.pk)